@@ -4,6 +4,8 @@ from pathlib import Path
 
 current_dir = Path(__file__).parent
 assets_dir = current_dir / 'assets' / 'icons'
+sounds_dir = current_dir / 'assets' / 'sounds'
+exercises_file = current_dir / 'assets' / 'exercises.json'
 
 # Ensure assets directory exists
 assets_dir.mkdir(parents=True, exist_ok=True)
@@ -18,6 +20,8 @@ args = [
     '--noconfirm',  # Overwrite existing
     '--clean',      # Clean cache
     f'--add-data={assets_dir};assets/icons/',  # Include assets
+    f'--add-data={sounds_dir};assets/sounds/',  # Reminder sounds
+    f'--add-data={exercises_file};assets/',  # Exercise catalog
     '--hidden-import=PIL._tkinter_finder',
 ]
 
@@ -5,25 +5,461 @@ from typing import Optional
 import psutil
 from win10toast import ToastNotifier
 import random
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
+from abc import ABC, abstractmethod
 import json
 from pathlib import Path
 import ttkbootstrap as ttk
-from PIL import Image, ImageTk
-from datetime import datetime
+from PIL import Image, ImageTk, ImageDraw
+from datetime import datetime, date, timedelta
 from tkinter import messagebox
 from tkinter import simpledialog
+from tkinter import filedialog
 import pystray
 import win32com.client
 import pythoncom
+import win32api
+import win32process
+import winsound
 import requests
 import sys
 from packaging import version  # Add this import
 import winreg  # Add this import at the top
 import webbrowser  # Add this import at the top
+import os
+import lzma
+import zlib
+import struct
+import argparse
+import bisect
+import functools
+import itertools
+import re
+import math
+import types
+import queue
+import csv
+import hashlib
+import hmac
+import secrets
+import pickle
+import tempfile
+import shutil
+import socket
+import uuid
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from collections import OrderedDict, deque
+from array import array
+import multiprocessing
+import logging
+import logging.handlers
+import atexit
+import weakref
+import gc
+import tracemalloc
+import http.server
+import urllib.request
 
 App_Version = "Pushup Reminder Pro v2.0"
+PUSHUPS_ID = 1  # Exercise id of push-ups in assets/exercises.json
+
+def default_log_dir() -> Path:
+    # Resolved on each call so a redirected home (tests, the memory soak) is honoured
+    return Path.home() / '.pushup_reminder' / 'logs'
+
+# One logger per area; levels can be set per area with the log_levels setting
+logger = logging.getLogger("pushup_reminder")
+catalog_log = logger.getChild("catalog")
+history_log = logger.getChild("history")
+integrity_log = logger.getChild("integrity")
+stats_log = logger.getChild("stats")
+sync_log = logger.getChild("sync")
+backup_log = logger.getChild("backup")
+sound_log = logger.getChild("sound")
+media_log = logger.getChild("media")
+notify_log = logger.getChild("notify")
+scheduler_log = logger.getChild("scheduler")
+update_log = logger.getChild("update")
+ui_log = logger.getChild("ui")
+metrics_log = logger.getChild("metrics")
+
+class JsonLineFormatter(logging.Formatter):
+    """One JSON object per line, for the rotating log files"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'thread': record.threadName,
+            'msg': record.getMessage(),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exc'] = record.exc_text
+        if getattr(record, 'suppressed', 0):
+            entry['suppressed'] = record.suppressed
+        return json.dumps(entry, ensure_ascii=False)
+
+class SamplingFilter(logging.Filter):
+    """Rate-limits repeated messages from the same call site.
+
+    Up to ``burst`` records per call site pass in each ``window`` seconds;
+    the rest are dropped and counted, and the first record of the next
+    window carries the number skipped.
+    """
+
+    def __init__(self, burst: int = 10, window: float = 60.0):
+        super().__init__()
+        self.burst = burst
+        self.window = window
+        self.sites = {}  # (logger, line) -> [window start, passed, dropped]
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = (record.name, record.lineno)
+        site = self.sites.get(key)
+        if site is None or record.created - site[0] >= self.window:
+            if site and site[2]:
+                record.suppressed = site[2]
+            self.sites[key] = [record.created, 1, 0]
+            return True
+        if site[1] < self.burst:
+            site[1] += 1
+            return True
+        site[2] += 1
+        return False
+
+class LogQueueHandler(logging.handlers.QueueHandler):
+    """Hands records to the writer thread with as little work as possible.
+
+    The message and traceback are rendered here, since their arguments may
+    change once the caller moves on, but the base class's full format and
+    record copy are skipped.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+_log_listener = None
+
+def setup_logging(log_dir: Optional[Path] = None, console: bool = True,
+                  max_bytes: int = 1024 * 1024, backups: int = 5):
+    """Route the app's loggers through a queue to a single writer thread.
+
+    Callers only pay for enqueueing a record; the background listener does
+    the JSON formatting and the disk I/O for the size-rotated log files.
+    """
+    global _log_listener
+    stop_logging()
+    log_dir = log_dir or default_log_dir()
+    log_dir.mkdir(parents=True, exist_ok=True)
+    file_handler = logging.handlers.RotatingFileHandler(
+        log_dir / 'pushup_reminder.log', maxBytes=max_bytes, backupCount=backups,
+        encoding='utf-8', delay=True
+    )
+    file_handler.setFormatter(JsonLineFormatter())
+    handlers = [file_handler]
+    # The --windowed build has no console at all
+    if console and sys.stderr is not None:
+        console_handler = logging.StreamHandler()
+        console_handler.setLevel(logging.WARNING)
+        console_handler.setFormatter(logging.Formatter("%(levelname)s %(name)s: %(message)s"))
+        handlers.append(console_handler)
+
+    # Records don't need process details; skipping them makes each call cheaper
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+    log_queue = queue.SimpleQueue()
+    queue_handler = LogQueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter())
+    for handler in logger.handlers[:]:
+        logger.removeHandler(handler)
+    logger.addHandler(queue_handler)
+    logger.propagate = False
+    if logger.level == logging.NOTSET:
+        logger.setLevel(logging.INFO)
+    _log_listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _log_listener.start()
+    return _log_listener
+
+@atexit.register
+def stop_logging():
+    """Flush queued records and stop the writer thread"""
+    global _log_listener
+    if _log_listener:
+        _log_listener.stop()
+        _log_listener = None
+
+def set_log_levels(level: str, levels: Optional[dict] = None):
+    """Apply the log_level setting, and log_levels overrides such as {"sync": "DEBUG"}"""
+    try:
+        logger.setLevel(level.upper())
+        for area, area_level in (levels or {}).items():
+            logger.getChild(area).setLevel(area_level.upper())
+    except (ValueError, AttributeError) as e:
+        logger.error("Invalid log level setting: %s", e)
+
+def format_metric_value(value) -> str:
+    if isinstance(value, int):
+        return str(value)
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    return repr(float(value))
+
+class Metric:
+    """One metric family in the Prometheus text exposition format.
+
+    Updating is a dict lookup and an addition under a lock; nothing is
+    formatted until a scrape. Metrics with ``fn`` are read at scrape time.
+    """
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, labels: tuple = (), fn=None):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = labels
+        self.fn = fn
+        self.lock = threading.Lock()
+        self.values = {} if labels or fn else {(): 0}  # plain series start at zero
+
+    def _key(self, labels: dict) -> tuple:
+        if not self.label_names:
+            return ()
+        return tuple(str(labels.get(name, '')) for name in self.label_names)
+
+    def label_text(self, key: tuple) -> str:
+        if not key:
+            return ''
+        pairs = (
+            '{}="{}"'.format(name, value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+            for name, value in zip(self.label_names, key)
+        )
+        return '{' + ','.join(pairs) + '}'
+
+    def samples(self):
+        """Yield (suffix, label text, value) for each series"""
+        if self.fn is not None:
+            yield '', '', self.fn()
+            return
+        with self.lock:
+            items = list(self.values.items())
+        for key, value in items:
+            yield '', self.label_text(key), value
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, labels, value in self.samples():
+            lines.append(f"{self.name}{suffix}{labels} {format_metric_value(value)}")
+        return lines
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        with self.lock:
+            self.values[self._key(labels)] = value
+
+class Histogram(Metric):
+    """Fixed-bucket histogram; observing is a bisect and two additions"""
+    kind = "histogram"
+    DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+    def __init__(self, name: str, help_text: str, buckets: tuple = DEFAULT_BUCKETS):
+        super().__init__(name, help_text)
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)  # the last slot is +Inf
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    def samples(self):
+        with self.lock:
+            counts = list(self.counts)
+            total = self.sum
+        cumulative = 0
+        for bound, count in zip(self.buckets + (math.inf,), counts):
+            cumulative += count
+            yield '_bucket', f'{{le="{format_metric_value(bound)}"}}', cumulative
+        yield '_sum', '', total
+        yield '_count', '', cumulative
+
+class MetricsRegistry:
+    """The app's metrics, rendered on demand for the exporter"""
+
+    def __init__(self, namespace: str = "pushup_reminder"):
+        self.namespace = namespace
+        self.metrics = {}
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help_text: str, labels: tuple = (), fn=None) -> Counter:
+        return self.register(Counter(f"{self.namespace}_{name}", help_text, labels, fn))
+
+    def gauge(self, name: str, help_text: str, labels: tuple = (), fn=None) -> Gauge:
+        return self.register(Gauge(f"{self.namespace}_{name}", help_text, labels, fn))
+
+    def histogram(self, name: str, help_text: str, buckets: tuple = Histogram.DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(f"{self.namespace}_{name}", help_text, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in list(self.metrics.values()):
+            try:
+                lines.extend(metric.render())
+            except Exception as e:
+                metrics_log.warning("Failed to collect %s: %s", metric.name, e)
+        return '\n'.join(lines) + '\n'
+
+@functools.lru_cache(maxsize=None)
+def current_process():
+    return psutil.Process()
+
+def process_cpu_seconds() -> float:
+    times = current_process().cpu_times()
+    return times.user + times.system
+
+METRICS = MetricsRegistry()
+# Process metrics use the standard unprefixed names and are only sampled when scraped
+METRICS.register(Gauge("process_resident_memory_bytes", "Resident memory size in bytes.",
+                       fn=lambda: current_process().memory_info().rss))
+METRICS.register(Counter("process_cpu_seconds_total", "Total user and system CPU time in seconds.",
+                         fn=process_cpu_seconds))
+METRICS.register(Gauge("process_start_time_seconds", "Start time of the process since the epoch.",
+                       fn=lambda: current_process().create_time()))
+METRICS.register(Gauge("process_threads", "Number of threads.", fn=threading.active_count))
+scheduler_wakeups = METRICS.counter("scheduler_wakeups_total", "Reminder loop wakeups.")
+scheduler_fires = METRICS.counter("scheduler_reminders_total", "Reminders fired.")
+scheduler_fire_lag = METRICS.histogram(
+    "scheduler_fire_lag_seconds", "Delay between a reminder's deadline and when it fired.",
+    buckets=(0.1, 0.25, 0.5, 1.0, 1.5, 2.0, 5.0, 30.0, 60.0, 300.0)
+)
+stats_save_seconds = METRICS.histogram("stats_save_seconds", "Time to save statistics.")
+stats_save_failures = METRICS.counter("stats_save_failures_total", "Failed statistics saves.")
+notification_dispatch_seconds = METRICS.histogram(
+    "notification_dispatch_seconds",
+    "Time to hand a reminder to the sound engine and toast thread, not until it is shown."
+)
+notification_failures = METRICS.counter(
+    "notification_failures_total", "Notifications that could not be delivered.", labels=("kind",)
+)
+ui_loop_lag = METRICS.histogram(
+    "ui_loop_lag_seconds", "How late the once-a-second UI timer ran.",
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+)
+update_checks = METRICS.counter("update_checks_total", "Update checks by outcome.", labels=("outcome",))
+METRICS.counter("animation_frames_total", "Animation frames shown.",
+                fn=lambda: FrameAnimator.totals['frames'])
+METRICS.counter("animation_frames_dropped_total", "Animation frames skipped because the UI fell behind.",
+                fn=lambda: FrameAnimator.totals['dropped'])
+
+class MetricsExporter:
+    """Serves the registry on a localhost port and/or writes it to a textfile.
+
+    Nothing is sampled in the background: the HTTP thread blocks in select
+    until a scrape arrives (stop() wakes it with a connection of its own),
+    and the textfile is rewritten every ``interval`` seconds.
+    """
+
+    def __init__(self, registry: MetricsRegistry, port: Optional[int] = None, textfile: str = "",
+                 interval: float = 15.0):
+        self.registry = registry
+        self.port = port  # None = no HTTP server, 0 = any free port
+        self.textfile = Path(textfile) if textfile else None
+        self.interval = interval
+        self.server = None
+        self.stop_event = threading.Event()
+        self.threads = []
+
+    def start(self):
+        if self.port is not None:
+            registry = self.registry
+
+            class Handler(http.server.BaseHTTPRequestHandler):
+                def do_GET(self):
+                    if self.path.split('?')[0] not in ('/', '/metrics'):
+                        self.send_error(404)
+                        return
+                    body = registry.render().encode('utf-8')
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                    self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+                def log_message(self, format, *args):
+                    metrics_log.debug("%s " + format, self.address_string(), *args)
+
+            # Only reachable from this machine
+            self.server = http.server.HTTPServer(('127.0.0.1', self.port), Handler)
+            self.server.timeout = None  # handle_request() waits for a connection, no polling
+            self.port = self.server.server_address[1]
+            self.threads.append(threading.Thread(target=self._serve_loop, daemon=True))
+        if self.textfile:
+            self.threads.append(threading.Thread(target=self._write_loop, daemon=True))
+        for thread in self.threads:
+            thread.start()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}/metrics"
+
+    def write_textfile(self):
+        """Replace the textfile atomically so a collector never reads half a file"""
+        self.textfile.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.textfile.with_name(self.textfile.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.registry.render())
+        os.replace(tmp_path, self.textfile)
+
+    def _serve_loop(self):
+        while not self.stop_event.is_set():
+            self.server.handle_request()
+
+    def _write_loop(self):
+        while not self.stop_event.is_set():
+            try:
+                self.write_textfile()
+            except OSError as e:
+                metrics_log.warning("Failed to write metrics to %s: %s", self.textfile, e)
+            self.stop_event.wait(self.interval)
+
+    def stop(self):
+        self.stop_event.set()
+        if self.server:
+            # Wake the HTTP thread so it sees stop_event
+            try:
+                socket.create_connection(('127.0.0.1', self.port), timeout=1.0).close()
+            except OSError:
+                pass
+        for thread in self.threads:
+            thread.join(timeout=2.0)
+        self.threads = []
+        if self.server:
+            self.server.server_close()
+            self.server = None
 
 # Valid themes for ttkbootstrap
 class Theme(Enum):
@@ -36,110 +472,3103 @@ class Theme(Enum):
     MINTY = "minty"
     PULSE = "pulse"
 
-@dataclass
-class AppSettings:
-    pushups: int = 10
-    interval_hours: int = 0
-    interval_minutes: int = 45
-    interval_seconds: int = 0
-    theme: str = "darkly"
-    auto_start: bool = False
-    minimize_to_tray: bool = True
-    show_progress: bool = True
-    daily_goal: int = 100
-    rest_duration: int = 60
-    pushup_animation: bool = True
-    auto_update: bool = True
-    start_with_windows: bool = False  # Add this field
+@dataclass
+class AppSettings:
+    pushups: int = 10
+    interval_hours: int = 0
+    interval_minutes: int = 45
+    interval_seconds: int = 0
+    theme: str = "darkly"
+    auto_start: bool = False
+    minimize_to_tray: bool = True
+    show_progress: bool = True
+    daily_goal: int = 100
+    rest_duration: int = 60
+    pushup_animation: bool = True
+    auto_update: bool = True
+    start_with_windows: bool = False  # Add this field
+    profile: str = "default"
+    auto_backup: bool = True
+    backup_interval_hours: int = 24
+    backup_keep: int = 7
+    reminder_sound: str = "Default"
+    exercise_id: int = PUSHUPS_ID
+    custom_schedule: str = ""
+    sync_port: int = 0  # 0 = don't accept sync connections
+    sync_peers: str = ""  # comma-separated host[:port] list
+    sync_secret: str = ""  # shared by all the user's machines; sync is off without it
+    sync_interval_minutes: int = 15
+    catch_up_policy: str = "once"  # after missed reminders: "once" (remind now) or "skip"
+    log_level: str = "INFO"
+    log_levels: dict = field(default_factory=dict)  # per-area overrides, e.g. {"sync": "DEBUG"}
+    metrics_port: int = 0  # 0 = off; otherwise serve http://127.0.0.1:<port>/metrics
+    metrics_textfile: str = ""  # .prom file for a textfile collector, "" = off
+    metrics_interval_seconds: int = 15
+
+    @classmethod
+    def load(cls) -> 'AppSettings':
+        config_path = Path.home() / '.pushup_reminder' / 'config.json'
+        if config_path.exists():
+            try:
+                with open(config_path, 'r') as f:
+                    data = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.error("Failed to load settings, using defaults: %s", e)
+                return cls()
+            # Remove old sound-related settings if they exist
+            data.pop('notification_sound', None)
+            data.pop('custom_sound_path', None)
+            # Only keep known settings
+            valid_fields = cls.__dataclass_fields__.keys()
+            filtered_data = {k: v for k, v in data.items() if k in valid_fields}
+            return cls(**filtered_data)
+        return cls()
+    
+    def save(self):
+        config_path = Path.home() / '.pushup_reminder' / 'config.json'
+        config_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(config_path, 'w') as f:
+            json.dump(self.__dict__, f)
+
+@dataclass
+class Exercise:
+    id: int
+    key: str
+    name: str
+    muscles: tuple
+    difficulty: str
+    equipment: str
+    reps: int
+    media: str = ""
+    description: str = ""
+
+class ExerciseCatalog:
+    """Exercises from exercises.json with in-memory lookup indexes.
+
+    Parsing and validation happen only when the JSON file changes: the built
+    catalog is pickled to a cache keyed by the file's hash, so later startups
+    just unpickle it. Filter queries are set intersections over the indexes.
+    """
+    CACHE_VERSION = 2  # bump whenever parse() output changes (2: interned names)
+    DIFFICULTIES = ('beginner', 'intermediate', 'advanced')
+    REQUIRED_FIELDS = ('id', 'key', 'name', 'muscles', 'difficulty', 'equipment', 'reps')
+    _default = None
+
+    def __init__(self, exercises: list):
+        self.exercises = exercises
+        self.by_id = {}
+        self.by_key = {}
+        self.by_muscle = {}
+        self.by_difficulty = {}
+        self.by_equipment = {}
+        for exercise in exercises:
+            self.by_id[exercise.id] = exercise
+            self.by_key[exercise.key] = exercise.id
+            self.by_key[exercise.name.lower()] = exercise.id
+            for muscle in exercise.muscles:
+                self.by_muscle.setdefault(muscle, set()).add(exercise.id)
+            self.by_difficulty.setdefault(exercise.difficulty, set()).add(exercise.id)
+            self.by_equipment.setdefault(exercise.equipment, set()).add(exercise.id)
+        for index in (self.by_muscle, self.by_difficulty, self.by_equipment):
+            for name, ids in index.items():
+                index[name] = frozenset(ids)
+        self._all_ids = frozenset(self.by_id)
+
+    @classmethod
+    def parse(cls, data: dict) -> 'ExerciseCatalog':
+        """Validate the exercises.json structure and build the catalog"""
+        exercises = []
+        seen_ids = set()
+        seen_keys = set()
+        for entry in data.get('exercises', []):
+            missing = [field for field in cls.REQUIRED_FIELDS if field not in entry]
+            if missing:
+                raise ValueError(f"Exercise {entry.get('key', '?')} is missing {', '.join(missing)}")
+            if entry['difficulty'] not in cls.DIFFICULTIES:
+                raise ValueError(f"Exercise {entry['key']} has unknown difficulty {entry['difficulty']}")
+            if not isinstance(entry['reps'], int) or entry['reps'] <= 0:
+                raise ValueError(f"Exercise {entry['key']} needs a positive rep count")
+            if entry['key'] in seen_keys or entry['id'] in seen_ids:
+                raise ValueError(f"Duplicate exercise {entry['key']}")
+            seen_ids.add(entry['id'])
+            seen_keys.add(entry['key'])
+            exercises.append(Exercise(
+                id=int(entry['id']),
+                key=sys.intern(entry['key']),
+                name=sys.intern(entry['name']),
+                muscles=tuple(sys.intern(m.lower()) for m in entry['muscles']),
+                difficulty=sys.intern(entry['difficulty']),
+                equipment=sys.intern(entry['equipment'].lower()),
+                reps=entry['reps'],
+                media=entry.get('media', ""),
+                description=entry.get('description', ""),
+            ))
+        return cls(exercises)
+
+    @classmethod
+    def load(cls, path: Optional[Path] = None, cache_dir: Optional[Path] = None) -> 'ExerciseCatalog':
+        """Load the catalog, using the compiled cache when the JSON is unchanged"""
+        path = path or Path(__file__).parent / 'assets' / 'exercises.json'
+        cache_dir = cache_dir or Path.home() / '.pushup_reminder' / 'cache'
+        with open(path, 'rb') as f:
+            raw = f.read()
+        digest = hashlib.sha256(raw).hexdigest()[:16]
+        cache_path = cache_dir / f'exercises-v{cls.CACHE_VERSION}-{digest}.pickle'
+        if cache_path.exists():
+            try:
+                with open(cache_path, 'rb') as f:
+                    return pickle.load(f)
+            except Exception as e:
+                catalog_log.warning("Ignoring unreadable exercise cache: %s", e)
+
+        catalog = cls.parse(json.loads(raw))
+        try:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            for stale in cache_dir.glob('exercises-*.pickle'):
+                stale.unlink()
+            tmp_path = cache_path.with_suffix('.tmp')
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(catalog, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, cache_path)
+        except Exception as e:
+            catalog_log.warning("Failed to write exercise cache: %s", e)
+        return catalog
+
+    @classmethod
+    def default(cls) -> 'ExerciseCatalog':
+        """Shared catalog instance, loaded on first use"""
+        if cls._default is None:
+            try:
+                cls._default = cls.load()
+            except Exception as e:
+                catalog_log.error("Failed to load exercise catalog: %s", e)
+                cls._default = cls([Exercise(PUSHUPS_ID, "pushups", "Push-ups",
+                                             ("chest", "triceps"), "beginner", "none", 10)])
+        return cls._default
+
+    def get(self, exercise_id: int) -> Optional[Exercise]:
+        return self.by_id.get(exercise_id)
+
+    def id_for(self, name: str) -> Optional[int]:
+        """Exercise id for a key ("pushups") or display name ("Push-ups")"""
+        return self.by_key.get(name) or self.by_key.get(name.lower())
+
+    def key_for(self, exercise_id: int) -> str:
+        exercise = self.by_id.get(exercise_id)
+        return exercise.key if exercise else str(exercise_id)
+
+    def query(self, muscle: Optional[str] = None, difficulty: Optional[str] = None,
+              equipment: Optional[str] = None) -> list[Exercise]:
+        """Exercises matching every given filter, in catalog order"""
+        sets = []
+        if muscle:
+            sets.append(self.by_muscle.get(muscle.lower(), frozenset()))
+        if difficulty:
+            sets.append(self.by_difficulty.get(difficulty, frozenset()))
+        if equipment:
+            sets.append(self.by_equipment.get(equipment.lower(), frozenset()))
+        if not sets:
+            return list(self.exercises)
+        sets.sort(key=len)
+        ids = sets[0].intersection(*sets[1:])
+        return [self.by_id[i] for i in sorted(ids)]
+
+CHECKSUM_KEY = 'c'
+
+def record_checksum(record: dict) -> int:
+    """CRC32 of a record's canonical JSON form, ignoring any stored checksum"""
+    body = {k: v for k, v in record.items() if k != CHECKSUM_KEY}
+    return zlib.crc32(json.dumps(body, sort_keys=True, separators=(',', ':')).encode())
+
+def seal_record(record: dict) -> dict:
+    """Return a copy of record carrying its checksum"""
+    sealed = dict(record)
+    sealed[CHECKSUM_KEY] = record_checksum(record)
+    return sealed
+
+def verify_record(record: dict, required: bool = False) -> bool:
+    """Check a record's checksum.
+
+    Records without one pass only when ``required`` is false, i.e. for files
+    that may predate checksums; otherwise stripping the checksum would hide
+    any corruption.
+    """
+    if not isinstance(record, dict):
+        return False  # e.g. a damaged line that still parses as a number or string
+    if CHECKSUM_KEY not in record:
+        return not required
+    return record[CHECKSUM_KEY] == record_checksum(record)
+
+class WorkoutEvent:
+    """A single completed set in the workout history.
+
+    Events are created by the million when streaming history, so this is a
+    plain ``__slots__`` class (no per-instance dict) and profile names are
+    interned.
+    """
+    __slots__ = ('timestamp', 'count', 'exercise', 'profile')
+
+    def __init__(self, timestamp: float, count: int, exercise: int = PUSHUPS_ID,
+                 profile: str = "default"):
+        self.timestamp = timestamp
+        self.count = count
+        self.exercise = exercise
+        self.profile = sys.intern(profile)
+
+    def __repr__(self) -> str:
+        return (f"WorkoutEvent(timestamp={self.timestamp!r}, count={self.count!r}, "
+                f"exercise={self.exercise!r}, profile={self.profile!r})")
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, WorkoutEvent):
+            return NotImplemented
+        return (self.timestamp, self.count, self.exercise, self.profile) == \
+            (other.timestamp, other.count, other.exercise, other.profile)
+
+    @property
+    def month(self) -> str:
+        return datetime.fromtimestamp(self.timestamp).strftime('%Y-%m')
+
+    def to_record(self) -> dict:
+        record = {'t': round(self.timestamp, 3), 'n': self.count}
+        # Defaults are left out to keep history lines short
+        if self.exercise != PUSHUPS_ID:
+            record['ex'] = self.exercise
+        if self.profile != "default":
+            record['p'] = self.profile
+        return record
+
+    @classmethod
+    def from_record(cls, data: dict) -> 'WorkoutEvent':
+        exercise = data.get('ex', PUSHUPS_ID)
+        if isinstance(exercise, str):
+            # Early history lines stored exercise names instead of ids
+            exercise = ExerciseCatalog.default().id_for(exercise) or PUSHUPS_ID
+        return cls(data['t'], data['n'], exercise, data.get('p', "default"))
+
+class EventColumns:
+    """Many workout events stored as typed arrays, one per field.
+
+    About 16 bytes per event instead of a few hundred for a list of
+    WorkoutEvent objects; profiles are stored as indexes into a short list
+    of names. Iterating yields WorkoutEvents on the fly.
+    """
+
+    def __init__(self):
+        self.timestamps = array('d')
+        self.counts = array('I')
+        self.exercises = array('H')
+        self.profile_ids = array('H')
+        self.profiles = []
+        self._profile_index = {}
+
+    @classmethod
+    def from_events(cls, events) -> 'EventColumns':
+        columns = cls()
+        for event in events:
+            columns.append(event)
+        return columns
+
+    def append(self, event: WorkoutEvent):
+        profile_id = self._profile_index.get(event.profile)
+        if profile_id is None:
+            profile_id = self._profile_index[event.profile] = len(self.profiles)
+            self.profiles.append(event.profile)
+        self.timestamps.append(event.timestamp)
+        self.counts.append(event.count)
+        self.exercises.append(event.exercise)
+        self.profile_ids.append(profile_id)
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def __getitem__(self, i: int) -> WorkoutEvent:
+        return WorkoutEvent(self.timestamps[i], self.counts[i], self.exercises[i],
+                            self.profiles[self.profile_ids[i]])
+
+    def __iter__(self):
+        profiles = self.profiles
+        for t, n, ex, p in zip(self.timestamps, self.counts, self.exercises, self.profile_ids):
+            yield WorkoutEvent(t, n, ex, profiles[p])
+
+    def sort_by_time(self):
+        """Reorder all columns by timestamp, in place"""
+        order = sorted(range(len(self)), key=self.timestamps.__getitem__)
+        for name in ('timestamps', 'counts', 'exercises', 'profile_ids'):
+            column = getattr(self, name)
+            setattr(self, name, array(column.typecode, (column[i] for i in order)))
+
+    def nbytes(self) -> int:
+        return sum(len(c) * c.itemsize for c in (self.timestamps, self.counts, self.exercises, self.profile_ids))
+
+class WorkoutHistory:
+    """Monthly workout history.
+
+    The current month is kept as an append-only ``YYYY-MM.jsonl`` file. Completed
+    months are rolled into compressed ``YYYY-MM.seg`` segments that end with an
+    uncompressed JSON summary footer, so dashboards can read per-day totals
+    without decompressing anything.
+
+    The footer also records how many bytes of the month's log it covers
+    (``log_bytes``, with their CRC), so a log that outlives its segment --
+    a crash before the unlink, or a file held open by another process --
+    is only read past that offset and never counted twice.
+
+    Logs created since checksums were added start with a sealed header
+    line (LOG_HEADER plus a random ``id`` per log file) and segments carry
+    ``sealed`` in their footer; in those, a record without a checksum counts
+    as corrupt. A footer also names the log it folded in (``log_id``) and
+    the segment it replaced (``base_crc``), so readers that track their own
+    position in the logs (the leaderboard) can tell whether they missed any.
+
+    Segment layout: ``payload | footer JSON | footer length (u32) | magic``
+    """
+    SEGMENT_MAGIC = b'PRSEG1'
+    LOG_HEADER = {'format': 'pushup-history', 'sealed': 1}
+    TRAILER = struct.Struct('<I6s')
+    READ_CHUNK = 64 * 1024
+
+    def __init__(self, history_dir: Optional[Path] = None, codec: str = 'lzma'):
+        self.history_dir = history_dir or Path.home() / '.pushup_reminder' / 'history'
+        self.codec = codec
+        self._footers = {}  # segment path -> (mtime, footer)
+        self._lock = self.dir_lock(self.history_dir)
+
+    _dir_locks = {}
+
+    @classmethod
+    def dir_lock(cls, history_dir: Path) -> threading.Lock:
+        """The lock guarding writes to a history folder, shared by every user of it"""
+        return cls._dir_locks.setdefault(Path(history_dir).resolve(), threading.Lock())
+
+    def _log_path(self, month: str) -> Path:
+        return self.history_dir / f'{month}.jsonl'
+
+    def _segment_path(self, month: str) -> Path:
+        return self.history_dir / f'{month}.seg'
+
+    def _open_log(self, month: str):
+        """Open a month's log for appending, starting new logs with the header"""
+        f = open(self._log_path(month), 'a')
+        if f.tell() == 0:
+            header = seal_record(dict(self.LOG_HEADER, id=uuid.uuid4().hex))
+            f.write(json.dumps(header, separators=(',', ':')) + '\n')
+        return f
+
+    @classmethod
+    def _is_header(cls, record) -> bool:
+        return isinstance(record, dict) and record.get('format') == cls.LOG_HEADER['format']
+
+    @classmethod
+    def read_log_header(cls, path: Path) -> Optional[dict]:
+        """The log's header, or None for logs from before checksums (or a damaged header)"""
+        try:
+            with open(path, 'rb') as f:
+                record = json.loads(f.readline())
+        except (OSError, ValueError):
+            return None
+        if cls._is_header(record) and verify_record(record, required=True):
+            return record
+        return None
+
+    @classmethod
+    def log_is_sealed(cls, path: Path) -> bool:
+        """Whether a log starts with the header, so every record must carry a checksum"""
+        return cls.read_log_header(path) is not None
+
+    @classmethod
+    def log_id(cls, path: Path) -> Optional[str]:
+        """Random id written when the log file was created; None for older logs"""
+        header = cls.read_log_header(path)
+        return header.get('id') if header else None
+
+    def read_appended(self, month: str, start: int) -> tuple[list, int]:
+        """Events in the complete lines of a month's log from byte ``start`` on.
+
+        Returns them with the offset just past the last complete line, where
+        the next read should start; a line still being written is left for it.
+        """
+        path = self._log_path(month)
+        sealed = self.log_is_sealed(path)
+        events = []
+        with open(path, 'rb') as f:
+            f.seek(start)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                start += len(line)
+                if line.strip():
+                    event = self._parse_line(line, path.name, sealed)
+                    if event:
+                        events.append(event)
+        return events, start
+
+    def append(self, event: WorkoutEvent):
+        """Append a completed set to its month's log"""
+        self.history_dir.mkdir(parents=True, exist_ok=True)
+        line = json.dumps(seal_record(event.to_record()), separators=(',', ':'))
+        with self._lock:
+            with self._open_log(event.month) as f:
+                f.write(line + '\n')
+
+    def append_many(self, events: list):
+        """Append a batch of sets, opening each month's log once"""
+        by_month = {}
+        for event in events:
+            by_month.setdefault(event.month, []).append(
+                json.dumps(seal_record(event.to_record()), separators=(',', ':')) + '\n'
+            )
+        self.history_dir.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            for month, lines in by_month.items():
+                with self._open_log(month) as f:
+                    f.writelines(lines)
+
+    def months(self) -> list[str]:
+        """All months with history, oldest first"""
+        if not self.history_dir.exists():
+            return []
+        found = {p.stem for p in self.history_dir.glob('*.jsonl')}
+        found.update(p.stem for p in self.history_dir.glob('*.seg'))
+        return sorted(found)
+
+    def read_footer(self, path: Path) -> dict:
+        """Read a segment's summary footer without touching the payload"""
+        mtime = path.stat().st_mtime
+        cached = self._footers.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        with open(path, 'rb') as f:
+            f.seek(-self.TRAILER.size, 2)
+            footer_len, magic = self.TRAILER.unpack(f.read(self.TRAILER.size))
+            if magic != self.SEGMENT_MAGIC:
+                raise ValueError(f"{path.name} is not a history segment")
+            f.seek(-(self.TRAILER.size + footer_len), 2)
+            footer = json.loads(f.read(footer_len))
+        if not verify_record(footer, required=isinstance(footer, dict) and bool(footer.get('sealed'))):
+            raise ValueError(f"{path.name} has a corrupt summary footer")
+        self._footers[path] = (mtime, footer)
+        return footer
+
+    @classmethod
+    def _parse_line(cls, line, source: str, sealed: bool = False) -> Optional[WorkoutEvent]:
+        """Decode one history line, skipping it if it fails its checksum"""
+        try:
+            record = json.loads(line)
+            if verify_record(record, required=sealed):
+                if cls._is_header(record):
+                    return None
+                return WorkoutEvent.from_record(record)
+        except (ValueError, KeyError, TypeError):
+            pass
+        history_log.warning("Skipping corrupt history record in %s", source)
+        return None
+
+    def _iter_log(self, path: Path, start: int = 0, end: Optional[int] = None):
+        """Events of a log, optionally only those in bytes [start, end)"""
+        sealed = self.log_is_sealed(path)
+        with open(path, 'rb') as f:
+            f.seek(start)
+            position = start
+            for line in f:
+                position += len(line)
+                if end is not None and position > end:
+                    break
+                if line.strip():
+                    event = self._parse_line(line, path.name, sealed)
+                    if event:
+                        yield event
+
+    def _iter_segment(self, path: Path):
+        """Lazily decompress a segment's events"""
+        footer = self.read_footer(path)
+        sealed = bool(footer.get('sealed'))
+        if footer['codec'] == 'zlib':
+            decompressor = zlib.decompressobj()
+        else:
+            decompressor = lzma.LZMADecompressor()
+        remaining = footer['payload_bytes']
+        pending = b''
+        crc = 0
+        with open(path, 'rb') as f:
+            while remaining > 0:
+                data = f.read(min(self.READ_CHUNK, remaining))
+                if not data:
+                    break
+                remaining -= len(data)
+                crc = zlib.crc32(data, crc)
+                # Cap each decompression step so memory stays flat however
+                # well the month compressed
+                while True:
+                    if footer['codec'] == 'zlib':
+                        pending += decompressor.decompress(data, self.READ_CHUNK)
+                        data = decompressor.unconsumed_tail
+                        more = bool(data)
+                    else:
+                        pending += decompressor.decompress(data, max_length=self.READ_CHUNK)
+                        data = b''
+                        more = not decompressor.needs_input and not decompressor.eof
+                    *lines, pending = pending.split(b'\n')
+                    for line in lines:
+                        if line:
+                            event = self._parse_line(line, path.name, sealed)
+                            if event:
+                                yield event
+                    if not more:
+                        break
+        if pending.strip():
+            event = self._parse_line(pending, path.name, sealed)
+            if event:
+                yield event
+        if 'payload_crc' in footer and crc != footer['payload_crc']:
+            history_log.error("History segment %s failed its payload checksum", path.name)
+
+    def _covered_log_bytes(self, month: str) -> int:
+        """Bytes at the start of a month's log already folded into its segment"""
+        segment = self._segment_path(month)
+        if not segment.exists():
+            return 0
+        covered = self.read_footer(segment).get('log_bytes', 0)
+        if not covered:
+            return 0
+        with open(self._log_path(month), 'rb') as f:
+            head = f.read(covered)
+        # A log recreated after the archive (e.g. synced old sets) is all new
+        if len(head) == covered and zlib.crc32(head) == self.read_footer(segment).get('log_crc'):
+            return covered
+        return 0
+
+    def iter_month(self, month: str):
+        """Events of one month, decompressing its segment only if needed"""
+        segment = self._segment_path(month)
+        if segment.exists():
+            yield from self._iter_segment(segment)
+        log = self._log_path(month)
+        if log.exists():
+            yield from self._iter_log(log, self._covered_log_bytes(month))
+
+    def iter_events(self, start: Optional[datetime] = None, end: Optional[datetime] = None):
+        """Stream events month by month, optionally limited to [start, end)"""
+        first = start.strftime('%Y-%m') if start else None
+        last = end.strftime('%Y-%m') if end else None
+        start_ts = start.timestamp() if start else None
+        end_ts = end.timestamp() if end else None
+        for month in self.months():
+            if (first and month < first) or (last and month > last):
+                continue
+            for event in self.iter_month(month):
+                if start_ts is not None and event.timestamp < start_ts:
+                    continue
+                if end_ts is not None and event.timestamp >= end_ts:
+                    continue
+                yield event
+
+    @staticmethod
+    def _summarize(events) -> dict:
+        days = {}
+        total = count = 0
+        for event in events:
+            day = datetime.fromtimestamp(event.timestamp).strftime('%d')
+            days[day] = days.get(day, 0) + event.count
+            total += event.count
+            count += 1
+        return {'events': count, 'total': total, 'days': days}
+
+    def month_summary(self, month: str) -> dict:
+        """Per-day totals for a month, read from the footer when archived"""
+        summary = {'events': 0, 'total': 0, 'days': {}}
+        segment = self._segment_path(month)
+        if segment.exists():
+            footer = self.read_footer(segment)
+            summary = {k: footer[k] for k in ('events', 'total')}
+            summary['days'] = dict(footer['days'])
+        log = self._log_path(month)
+        if log.exists():
+            tail = self._summarize(self._iter_log(log, self._covered_log_bytes(month)))
+            summary['events'] += tail['events']
+            summary['total'] += tail['total']
+            for day, total in tail['days'].items():
+                summary['days'][day] = summary['days'].get(day, 0) + total
+        return summary
+
+    def daily_totals(self) -> dict[str, int]:
+        """Map of ISO date -> pushups, built from footers and the open month"""
+        totals = {}
+        for month in self.months():
+            for day, total in self.month_summary(month)['days'].items():
+                totals[f'{month}-{day}'] = total
+        return totals
+
+    def _write_segment(self, month: str, events: EventColumns, log_bytes: int = 0,
+                       log_crc: int = 0, log_id: Optional[str] = None,
+                       base_crc: Optional[int] = None) -> tuple[int, int]:
+        events.sort_by_time()
+        raw = b''.join(
+            json.dumps(seal_record(e.to_record()), separators=(',', ':')).encode() + b'\n'
+            for e in events
+        )
+        if self.codec == 'zlib':
+            payload = zlib.compress(raw, 9)
+        else:
+            payload = lzma.compress(raw, preset=6)
+        footer = self._summarize(events)
+        footer.update({
+            'month': month,
+            'codec': self.codec,
+            'first': events[0].timestamp if events else None,
+            'last': events[-1].timestamp if events else None,
+            'raw_bytes': len(raw),
+            'payload_bytes': len(payload),
+            'payload_crc': zlib.crc32(payload),
+            'log_bytes': log_bytes,
+            'log_crc': log_crc,
+            'log_id': log_id,
+            'base_crc': base_crc,  # payload_crc of the segment this one replaced
+            'sealed': 1,  # every payload record carries a checksum
+        })
+        footer_bytes = json.dumps(seal_record(footer), separators=(',', ':')).encode()
+        segment = self._segment_path(month)
+        tmp_path = segment.with_suffix('.seg.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+            f.write(footer_bytes)
+            f.write(self.TRAILER.pack(len(footer_bytes), self.SEGMENT_MAGIC))
+        os.replace(tmp_path, segment)
+        return len(raw), segment.stat().st_size
+
+    def archive_completed_months(self) -> dict:
+        """Roll every finished month's log into a compressed segment"""
+        current = datetime.now().strftime('%Y-%m')
+        report = {'months': [], 'raw_bytes': 0, 'stored_bytes': 0}
+        for month in self.months():
+            log = self._log_path(month)
+            if month >= current or not log.exists():
+                continue
+            try:
+                # Only the size is taken under the lock; sets appended while
+                # compressing land past log_bytes and stay in the log
+                with self._lock:
+                    log_bytes = log.stat().st_size
+                with open(log, 'rb') as f:
+                    log_crc = zlib.crc32(f.read(log_bytes))
+                segment = self._segment_path(month)
+                base_crc = self.read_footer(segment).get('payload_crc') if segment.exists() else None
+                events = EventColumns.from_events(itertools.chain(
+                    self._iter_segment(segment) if segment.exists() else (),
+                    self._iter_log(log, self._covered_log_bytes(month), log_bytes)
+                ))
+                _, stored = self._write_segment(month, events, log_bytes, log_crc,
+                                                self.log_id(log), base_crc)
+                with self._lock:
+                    if log.stat().st_size == log_bytes:
+                        try:
+                            log.unlink()
+                        except OSError as e:
+                            # Harmless: readers skip the covered bytes
+                            history_log.warning("Archived %s but could not remove its log: %s", month, e)
+                report['months'].append(month)
+                report['raw_bytes'] += log_bytes
+                report['stored_bytes'] += stored
+            except Exception as e:
+                history_log.error("Failed to archive history for %s: %s", month, e)
+        if report['months']:
+            saved = report['raw_bytes'] - report['stored_bytes']
+            history_log.info("Archived %d month(s) of history, saved %d bytes", len(report['months']), saved)
+        return report
+
+    def storage_report(self) -> dict:
+        """Measure disk savings and cold footer/drill-down query latency"""
+        report = {'months': 0, 'raw_bytes': 0, 'stored_bytes': 0,
+                  'footer_ms': 0.0, 'decompress_ms': 0.0}
+        for month in self.months():
+            report['months'] += 1
+            segment = self._segment_path(month)
+            log = self._log_path(month)
+            if log.exists():
+                size = log.stat().st_size
+                report['raw_bytes'] += size
+                report['stored_bytes'] += size
+            if not segment.exists():
+                continue
+            self._footers.pop(segment, None)  # force a cold read
+            started = time.perf_counter()
+            footer = self.read_footer(segment)
+            report['footer_ms'] += (time.perf_counter() - started) * 1000
+            started = time.perf_counter()
+            for _ in self._iter_segment(segment):
+                pass
+            report['decompress_ms'] += (time.perf_counter() - started) * 1000
+            report['raw_bytes'] += footer['raw_bytes']
+            report['stored_bytes'] += segment.stat().st_size
+        if report['raw_bytes']:
+            report['ratio'] = report['stored_bytes'] / report['raw_bytes']
+        return report
+
+class IntegrityVerifier:
+    """Checks the checksums of every persisted stats/history block.
+
+    Files are verified in parallel on a thread pool (CRC32 and file reads
+    release the GIL). Bad history lines are moved to ``quarantine/`` and the
+    file is rewritten without them; a segment or stats file that fails is
+    quarantined whole.
+
+    On a clean exit the current size of each file is recorded, so the next
+    startup only verifies files that changed and, for append-only logs, only
+    the bytes written since.
+    """
+
+    def __init__(self, data_dir: Optional[Path] = None, workers: int = 4):
+        self.data_dir = data_dir or Path.home() / '.pushup_reminder'
+        self.quarantine_dir = self.data_dir / 'quarantine'
+        self.marker_path = self.data_dir / 'clean_shutdown.json'
+        self.workers = workers
+
+    def data_files(self) -> list[Path]:
+        files = []
+        for name in ('stats.json', 'achievements.json'):
+            path = self.data_dir / name
+            if path.exists():
+                files.append(path)
+        history_dir = self.data_dir / 'history'
+        if history_dir.exists():
+            files.extend(sorted(history_dir.glob('*.jsonl')))
+            files.extend(sorted(history_dir.glob('*.seg')))
+        return files
+
+    def _verify_lines(self, path: Path, offset: int) -> dict:
+        report = {'path': path, 'blocks': 0, 'bad': []}
+        sealed = WorkoutHistory.log_is_sealed(path)
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            position = offset
+            for line in f:
+                start = position
+                position += len(line)
+                if not line.strip():
+                    continue
+                report['blocks'] += 1
+                try:
+                    valid = verify_record(json.loads(line), required=sealed)
+                except ValueError:
+                    valid = False
+                if not valid:
+                    report['bad'].append(start)
+        return report
+
+    def _verify_segment(self, path: Path) -> dict:
+        report = {'path': path, 'blocks': 1, 'bad': []}
+        try:
+            with open(path, 'rb') as f:
+                f.seek(-WorkoutHistory.TRAILER.size, 2)
+                footer_len, magic = WorkoutHistory.TRAILER.unpack(f.read(WorkoutHistory.TRAILER.size))
+                if magic != WorkoutHistory.SEGMENT_MAGIC:
+                    raise ValueError("bad magic")
+                f.seek(-(WorkoutHistory.TRAILER.size + footer_len), 2)
+                footer = json.loads(f.read(footer_len))
+                if not verify_record(footer, required=bool(footer.get('sealed'))):
+                    raise ValueError("footer checksum mismatch")
+                f.seek(0)
+                crc = 0
+                remaining = footer['payload_bytes']
+                while remaining > 0:
+                    data = f.read(min(WorkoutHistory.READ_CHUNK, remaining))
+                    if not data:
+                        raise ValueError("truncated payload")
+                    remaining -= len(data)
+                    crc = zlib.crc32(data, crc)
+                if 'payload_crc' in footer and crc != footer['payload_crc']:
+                    raise ValueError("payload checksum mismatch")
+        except (OSError, ValueError, KeyError, struct.error):
+            report['bad'].append(0)
+        return report
+
+    def _verify_stats(self, path: Path) -> dict:
+        report = {'path': path, 'blocks': 1, 'bad': []}
+        # stats.json may predate checksums; achievements.json never does
+        required = path.name != 'stats.json'
+        try:
+            with open(path, 'r') as f:
+                if not verify_record(json.load(f), required=required):
+                    report['bad'].append(0)
+        except ValueError:
+            report['bad'].append(0)
+        return report
+
+    def verify_file(self, path: Path, offset: int = 0) -> dict:
+        """Verify one file. ``offset`` skips already-verified log bytes."""
+        if path.suffix == '.seg':
+            return self._verify_segment(path)
+        if path.suffix == '.jsonl':
+            return self._verify_lines(path, offset)
+        return self._verify_stats(path)
+
+    def verify_all(self, offsets: Optional[dict] = None) -> list[dict]:
+        """Verify files in parallel. ``offsets`` limits the scan to those files."""
+        if offsets is None:
+            offsets = {path: 0 for path in self.data_files()}
+        if not offsets:
+            return []
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            return list(pool.map(lambda item: self.verify_file(*item), offsets.items()))
+
+    def quarantine_file(self, path: Path) -> Optional[Path]:
+        """Move a whole damaged file aside"""
+        if not path.exists():
+            return None
+        self.quarantine_dir.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.now().strftime('%Y%m%dT%H%M%S')
+        dest = self.quarantine_dir / f'{path.name}.{stamp}.bad'
+        os.replace(path, dest)
+        integrity_log.warning("Quarantined %s to %s", path.name, dest)
+        return dest
+
+    def quarantine(self, report: dict):
+        """Move the bad blocks found by a verification report aside"""
+        path = report['path']
+        if not report['bad']:
+            return
+        if path.suffix != '.jsonl':
+            self.quarantine_file(path)
+            return
+        bad_offsets = set(report['bad'])
+        self.quarantine_dir.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.now().strftime('%Y%m%dT%H%M%S')
+        tmp_path = path.with_suffix('.jsonl.tmp')
+        # Hold the history lock so a set appended meanwhile isn't lost in the rewrite
+        with WorkoutHistory.dir_lock(path.parent):
+            with open(path, 'rb') as src, open(tmp_path, 'wb') as good, \
+                    open(self.quarantine_dir / f'{path.name}.{stamp}.bad', 'ab') as bad:
+                position = 0
+                for line in src:
+                    (bad if position in bad_offsets else good).write(line)
+                    position += len(line)
+            os.replace(tmp_path, path)
+        integrity_log.warning("Quarantined %d corrupt record(s) from %s", len(bad_offsets), path.name)
+
+    def mark_clean_shutdown(self):
+        """Record verified file sizes so the next startup can skip them"""
+        files = {}
+        for path in self.data_files():
+            stat = path.stat()
+            files[path.relative_to(self.data_dir).as_posix()] = [stat.st_size, stat.st_mtime_ns]
+        try:
+            with open(self.marker_path, 'w') as f:
+                json.dump({'time': time.time(), 'files': files}, f)
+        except Exception as e:
+            integrity_log.error("Failed to write shutdown marker: %s", e)
+
+    def startup_check(self, repair: bool = True) -> list[dict]:
+        """Verify what changed since the last clean shutdown (everything after a crash)"""
+        marker = None
+        if self.marker_path.exists():
+            try:
+                with open(self.marker_path, 'r') as f:
+                    marker = json.load(f)['files']
+            except Exception:
+                marker = None
+            # Until we exit cleanly again, the next start must verify in full
+            self.marker_path.unlink(missing_ok=True)
+
+        offsets = {}
+        for path in self.data_files():
+            if marker is None:
+                offsets[path] = 0
+                continue
+            stat = path.stat()
+            size, mtime_ns = marker.get(path.relative_to(self.data_dir).as_posix(), (None, None))
+            if size == stat.st_size and mtime_ns == stat.st_mtime_ns:
+                continue
+            if path.suffix == '.jsonl' and size is not None and size < stat.st_size:
+                offsets[path] = size  # appended since the clean shutdown
+            else:
+                offsets[path] = 0
+
+        reports = self.verify_all(offsets)
+        bad = [r for r in reports if r['bad']]
+        for report in bad:
+            integrity_log.error("Integrity check failed for %s: %d of %d block(s) corrupt",
+                                report['path'].name, len(report['bad']), report['blocks'])
+            if repair:
+                self.quarantine(report)
+        return reports
+
+@dataclass(frozen=True)
+class Achievement:
+    """An achievement unlocked when ``metric`` reaches ``threshold``.
+
+    ``exercise`` limits the metric to one exercise id; ``None`` counts all.
+    """
+    key: str
+    title: str
+    metric: str
+    threshold: int
+    exercise: Optional[int] = None
+
+class AchievementMetric(ABC):
+    """A running value updated in O(1) per workout event.
+
+    Achievements on the metric are kept sorted by threshold, so checking
+    for unlocks only compares against the next threshold not yet reached.
+    """
+    __slots__ = ('value', 'day', 'current', 'thresholds', 'next_index')
+
+    def __init__(self):
+        self.value = 0
+        self.day = 0  # proleptic ordinal of the last event's day
+        self.current = 0
+        self.thresholds = []
+        self.next_index = 0
+
+    @abstractmethod
+    def update(self, count: int, day: int):
+        """Fold in one set of ``count`` reps done on day ordinal ``day``"""
+
+    def state(self) -> list:
+        return [self.value, self.day, self.current]
+
+    def restore(self, state: list):
+        self.value, self.day, self.current = state
+
+class TotalMetric(AchievementMetric):
+    """Lifetime repetitions"""
+    __slots__ = ()
+
+    def update(self, count: int, day: int):
+        self.value += count
+
+class BestSetMetric(AchievementMetric):
+    """Largest single set"""
+    __slots__ = ()
+
+    def update(self, count: int, day: int):
+        if count > self.value:
+            self.value = count
+
+class BestDayMetric(AchievementMetric):
+    """Most repetitions in one day"""
+    __slots__ = ()
+
+    def update(self, count: int, day: int):
+        if day != self.day:
+            self.day = day
+            self.current = 0
+        self.current += count
+        if self.current > self.value:
+            self.value = self.current
+
+class SetsInDayMetric(AchievementMetric):
+    """Most sets logged in one day"""
+    __slots__ = ()
+
+    def update(self, count: int, day: int):
+        if day != self.day:
+            self.day = day
+            self.current = 0
+        self.current += 1
+        if self.current > self.value:
+            self.value = self.current
+
+class StreakMetric(AchievementMetric):
+    """Longest run of consecutive active days"""
+    __slots__ = ()
+
+    def update(self, count: int, day: int):
+        if day == self.day:
+            return
+        self.current = self.current + 1 if day == self.day + 1 else 1
+        self.day = day
+        if self.current > self.value:
+            self.value = self.current
+
+class AchievementEngine:
+    """Tracks achievements and personal bests incrementally.
+
+    Every (metric, exercise) pair used by an achievement gets one metric
+    object, so recording an event costs a handful of O(1) updates no matter
+    how many achievements are defined or how long the history is. The state
+    is checkpointed to ``achievements.json`` next to ``stats.json`` and can
+    be rebuilt from the workout history in a single streaming pass.
+    """
+    METRICS = {
+        'total': TotalMetric,
+        'best_set': BestSetMetric,
+        'best_day': BestDayMetric,
+        'sets_in_day': SetsInDayMetric,
+        'streak': StreakMetric,
+    }
+    PERSONAL_BESTS = ('best_set', 'best_day', 'streak')
+
+    def __init__(self, achievements: Optional[list] = None, path: Optional[Path] = None):
+        self.path = path or Path.home() / '.pushup_reminder' / 'achievements.json'
+        self.achievements = {a.key: a for a in (achievements or self.default_achievements())}
+        self.since = 0.0  # events at or before this time were wiped by a reset
+        self.reset()
+
+    @staticmethod
+    def default_achievements() -> list:
+        achievements = []
+        for threshold in (100, 1000, 10000, 100000):
+            achievements.append(Achievement(f'total_{threshold}', f"{threshold:,} Reps", 'total', threshold))
+        for threshold in (20, 50, 100):
+            achievements.append(Achievement(f'set_{threshold}', f"{threshold} in One Set", 'best_set', threshold))
+        for threshold in (100, 250, 500):
+            achievements.append(Achievement(f'day_{threshold}', f"{threshold} in One Day", 'best_day', threshold))
+        achievements.append(Achievement('sets_10', "10 Sets in One Day", 'sets_in_day', 10))
+        for threshold in (7, 30, 100, 365):
+            achievements.append(Achievement(f'streak_{threshold}', f"{threshold}-Day Streak", 'streak', threshold))
+        return achievements
+
+    def reset(self):
+        """Forget all progress (before a rebuild)"""
+        self.metrics = {}
+        self._scoped = {}  # exercise id (None = all) -> metrics to update
+        self._days = {}  # 15-minute bucket -> day ordinal
+        self.unlocked = {}  # achievement key -> unlock timestamp
+        self.events = 0
+        self.last_timestamp = 0.0
+        for achievement in sorted(self.achievements.values(), key=lambda a: a.threshold):
+            self._metrics_for(achievement.exercise)
+            self._metric(achievement.metric, achievement.exercise).thresholds.append(
+                (achievement.threshold, achievement.key)
+            )
+        self._metrics_for(None)
+
+    def _metric(self, kind: str, exercise: Optional[int]) -> AchievementMetric:
+        metric = self.metrics.get((kind, exercise))
+        if metric is None:
+            metric = self.metrics[(kind, exercise)] = self.METRICS[kind]()
+            self._scoped.setdefault(exercise, []).append(metric)
+        return metric
+
+    def _metrics_for(self, exercise: Optional[int]) -> list:
+        """Metrics for one exercise, starting its personal bests on first use"""
+        metrics = self._scoped.get(exercise)
+        if metrics is None:
+            for kind in self.PERSONAL_BESTS:
+                self._metric(kind, exercise)
+            metrics = self._scoped[exercise]
+        return metrics
+
+    def record(self, event: WorkoutEvent) -> list:
+        """Apply one event; returns the achievements it unlocked"""
+        self.events += 1
+        self.last_timestamp = event.timestamp
+        # Time zone offsets are whole quarter hours, so a 15-minute bucket
+        # never spans two local days
+        bucket = int(event.timestamp // 900)
+        day = self._days.get(bucket)
+        if day is None:
+            if len(self._days) > 4096:
+                self._days.clear()
+            day = self._days[bucket] = date.fromtimestamp(event.timestamp).toordinal()
+        unlocked = []
+        count = event.count
+        for metrics in (self._scoped[None], self._metrics_for(event.exercise)):
+            for metric in metrics:
+                metric.update(count, day)
+                thresholds = metric.thresholds
+                while metric.next_index < len(thresholds) and metric.value >= thresholds[metric.next_index][0]:
+                    key = thresholds[metric.next_index][1]
+                    metric.next_index += 1
+                    if key not in self.unlocked:
+                        self.unlocked[key] = event.timestamp
+                        unlocked.append(self.achievements[key])
+        return unlocked
+
+    def personal_bests(self, exercise: Optional[int] = None) -> dict:
+        return {
+            kind: self.metrics[(kind, exercise)].value if (kind, exercise) in self.metrics else 0
+            for kind in self.PERSONAL_BESTS
+        }
+
+    def rebuild(self, events) -> int:
+        """Recompute everything from a chronological event stream"""
+        self.reset()
+        for event in events:
+            self.record(event)
+        return self.events
+
+    def state(self) -> dict:
+        return {
+            'events': self.events,
+            'last_timestamp': self.last_timestamp,
+            'since': self.since,
+            'unlocked': self.unlocked,
+            'metrics': [[kind, exercise, metric.state()]
+                        for (kind, exercise), metric in self.metrics.items()],
+        }
+
+    def restore(self, state: dict):
+        self.reset()
+        for kind, exercise, metric_state in state['metrics']:
+            self._metric(kind, exercise).restore(metric_state)
+        self.unlocked = {key: ts for key, ts in state['unlocked'].items() if key in self.achievements}
+        # Skip thresholds that were already passed, so they are not announced again
+        for metric in self.metrics.values():
+            while (metric.next_index < len(metric.thresholds)
+                   and metric.value >= metric.thresholds[metric.next_index][0]):
+                metric.next_index += 1
+        self.events = state['events']
+        self.last_timestamp = state['last_timestamp']
+        self.since = state.get('since', 0.0)
+
+    def save(self):
+        """Checkpoint the engine state (written with every stats save)"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(seal_record(self.state()), f, separators=(',', ':'))
+        os.replace(tmp_path, self.path)
+
+    def load(self) -> bool:
+        """Restore the checkpoint; False if it is missing or damaged"""
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+            if not verify_record(data, required=True):
+                raise ValueError("checksum mismatch")
+            data.pop(CHECKSUM_KEY, None)
+            self.restore(data)
+            return True
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            stats_log.error("Failed to load achievements: %s", e)
+            self.reset()
+            return False
+
+class Statistics:
+    def __init__(self, profile: str = "default"):
+        self.today_pushups = 0
+        self.total_pushups = 0
+        self.streak_days = 0
+        self.last_completion = None
+        self.version = 0  # bumped on every change, used to key cached charts
+        self.reset_at = 0.0  # sets at or before this time were wiped by "reset all"
+        self.profile = profile
+        self.history = WorkoutHistory()
+        self.sync = None  # created by enable_sync() in the app and sync commands
+        self.achievements = AchievementEngine()
+        self.new_achievements = []  # unlocked but not yet announced
+        self.leaderboard = None  # attached by the app; kept current as sets arrive
+        # The reset watermark is kept in both files, so losing one can't undo a reset
+        achievements_loaded = self.achievements.load()
+        self.reset_at = self.achievements.since
+        self.load_stats()
+        if not achievements_loaded:
+            self.rebuild_achievements()
+
+    def add_pushups(self, count: int, exercise: int = PUSHUPS_ID) -> list:
+        """Record completed pushups, returning any achievements unlocked"""
+        self.today_pushups += count
+        self.total_pushups += count
+        self.last_completion = datetime.now()
+        event = WorkoutEvent(self.last_completion.timestamp(), count, exercise, self.profile)
+        try:
+            self.history.append(event)
+            if self.sync:
+                self.sync.record_local(event)
+        except Exception as e:
+            stats_log.error("Failed to record workout history: %s", e)
+        unlocked = self.achievements.record(event)
+        self.new_achievements.extend(unlocked)
+        if self.leaderboard:
+            self.leaderboard.refresh(save=False)  # reads the set back from the log
+        self.save_stats()
+        return unlocked
+    
+    def enable_sync(self, secret: str = "") -> 'SyncStore':
+        """Open the sync store, so sets added from now on are logged for peers.
+
+        Only called when sync is configured (and by the sync commands), so
+        other runs don't create the sync folder or seed the device log from
+        the history.
+        """
+        if self.sync is None:
+            self.sync = SyncStore(history=self.history, secret=secret)
+        return self.sync
+
+    def merge_remote(self, events: list) -> list:
+        """Count sets synced from another device (already in the history).
+
+        Every profile's sets reach the leaderboard (it reads them from the
+        history); totals and achievements only count this profile's.
+        """
+        today = datetime.now().date()
+        unlocked = []
+        if self.leaderboard:
+            self.leaderboard.refresh(save=False)
+        for event in events:
+            if event.profile != self.profile or event.timestamp <= self.reset_at:
+                continue  # another profile's, or done before "reset all"
+            completed = datetime.fromtimestamp(event.timestamp)
+            self.total_pushups += event.count
+            if completed.date() == today:
+                self.today_pushups += event.count
+            if self.last_completion is None or completed > self.last_completion:
+                self.last_completion = completed
+            unlocked.extend(self.achievements.record(event))
+        self.new_achievements.extend(unlocked)
+        self.save_stats()
+        return unlocked
+
+    def reset_daily(self):
+        """Reset daily statistics"""
+        self.today_pushups = 0
+        self.save_stats()
+    
+    def load_stats(self):
+        """Load statistics from file"""
+        stats_path = Path.home() / '.pushup_reminder' / 'stats.json'
+        if stats_path.exists():
+            try:
+                with open(stats_path, 'r') as f:
+                    data = json.load(f)
+                if not verify_record(data):
+                    raise ValueError("checksum mismatch")
+                self.today_pushups = data.get('today_pushups', 0)
+                self.total_pushups = data.get('total_pushups', 0)
+                self.streak_days = data.get('streak_days', 0)
+                self.reset_at = max(self.reset_at, data.get('reset_at', 0.0))
+                last_completion = data.get('last_completion')
+                if last_completion:
+                    self.last_completion = datetime.fromisoformat(last_completion)
+            except Exception as e:
+                stats_log.error("Failed to load statistics: %s", e)
+                # Keep the damaged file for inspection and recover what we can
+                IntegrityVerifier().quarantine_file(stats_path)
+                self.rebuild_from_history()
+    
+    def rebuild_from_history(self):
+        """Recompute totals from the workout history after stats were lost"""
+        try:
+            if self.reset_at:
+                # Only sets after the last reset count; older months stay untouched
+                totals = {}
+                for event in self.history.iter_events(start=datetime.fromtimestamp(self.reset_at)):
+                    if event.timestamp > self.reset_at:
+                        day = date.fromtimestamp(event.timestamp).isoformat()
+                        totals[day] = totals.get(day, 0) + event.count
+            else:
+                totals = self.history.daily_totals()
+        except Exception as e:
+            stats_log.error("Failed to rebuild statistics from history: %s", e)
+            return
+        self.total_pushups = sum(totals.values())
+        self.today_pushups = totals.get(datetime.now().date().isoformat(), 0)
+        self.streak_days = self.current_streak(totals)
+        months = self.history.months()
+        if months:
+            last = max((e.timestamp for e in self.history.iter_month(months[-1])), default=None)
+            if last:
+                self.last_completion = datetime.fromtimestamp(last)
+        stats_log.info("Rebuilt statistics from history: %d total pushups", self.total_pushups)
+        self.rebuild_achievements()
+        self.save_stats()
+
+    @staticmethod
+    def current_streak(totals: dict, today: Optional[date] = None) -> int:
+        """Consecutive active days ending today, or yesterday if today has no sets yet"""
+        day = today or datetime.now().date()
+        if not totals.get(day.isoformat()):
+            day -= timedelta(days=1)
+        streak = 0
+        while totals.get(day.isoformat()):
+            streak += 1
+            day -= timedelta(days=1)
+        return streak
+
+    def rebuild_achievements(self):
+        """Replay the history through the achievement engine in one pass"""
+        try:
+            start = datetime.fromtimestamp(self.reset_at) if self.reset_at else None
+            self.achievements.rebuild(
+                event for event in self.history.iter_events(start)
+                if event.profile == self.profile and event.timestamp > self.reset_at
+            )
+            self.achievements.since = self.reset_at
+            self.achievements.save()
+        except Exception as e:
+            stats_log.error("Failed to rebuild achievements: %s", e)
+    
+    def save_stats(self):
+        """Save statistics to file"""
+        stats_path = Path.home() / '.pushup_reminder' / 'stats.json'
+        stats_path.parent.mkdir(parents=True, exist_ok=True)
+        self.version += 1
+        started = time.perf_counter()
+        try:
+            data = {
+                'today_pushups': self.today_pushups,
+                'total_pushups': self.total_pushups,
+                'streak_days': self.streak_days,
+                'reset_at': self.reset_at,
+                'last_completion': self.last_completion.isoformat() if self.last_completion else None
+            }
+            # Write a temp file and swap it in, so a crash never leaves half a file
+            tmp_path = stats_path.with_suffix('.json.tmp')
+            with open(tmp_path, 'w') as f:
+                json.dump(seal_record(data), f)
+            os.replace(tmp_path, stats_path)
+            self.achievements.save()
+            if self.leaderboard:
+                self.leaderboard.save()
+            stats_save_seconds.observe(time.perf_counter() - started)
+        except Exception as e:
+            stats_save_failures.inc()
+            stats_log.error("Failed to save statistics: %s", e)
+
+    def reset_all(self):
+        """Reset all statistics.
+
+        The history is kept, but a watermark is recorded so rebuilding stats or
+        achievements from it only counts sets done after the reset.
+        """
+        self.today_pushups = 0
+        self.total_pushups = 0
+        self.streak_days = 0
+        self.last_completion = None
+        self.reset_at = time.time()
+        self.achievements.reset()
+        self.achievements.since = self.reset_at
+        self.save_stats()
+
+class RankIndex:
+    """Profiles sorted by score, kept in order as scores change.
+
+    Entries are ``(-score, profile)`` tuples in a list maintained with
+    bisect, so finding a rank is a binary search and the top K is a slice.
+    An update is a binary search plus a list delete and insert; those move
+    the entries after it, so updates are O(n) in the number of profiles, but
+    a memmove of a few thousand pointers is far cheaper than re-sorting.
+    Ranks use competition ranking: tied profiles share a rank and the next
+    rank is skipped (1, 2, 2, 4).
+    """
+
+    def __init__(self, scores: Optional[dict] = None):
+        self.scores = dict(scores or {})
+        self.entries = sorted((-score, profile) for profile, score in self.scores.items())
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def add(self, profile: str, amount: int):
+        old = self.scores.get(profile)
+        if old is not None:
+            del self.entries[bisect.bisect_left(self.entries, (-old, profile))]
+        score = (old or 0) + amount
+        self.scores[profile] = score
+        bisect.insort(self.entries, (-score, profile))
+
+    def remove(self, profile: str):
+        score = self.scores.pop(profile, None)
+        if score is not None:
+            del self.entries[bisect.bisect_left(self.entries, (-score, profile))]
+
+    def rank_of(self, profile: str) -> Optional[int]:
+        score = self.scores.get(profile)
+        if score is None:
+            return None
+        return bisect.bisect_left(self.entries, (-score,)) + 1
+
+    def top(self, k: int) -> list:
+        """[(rank, profile, score)] for the first k profiles"""
+        rows = []
+        for i, (negative, profile) in enumerate(self.entries[:k]):
+            if rows and rows[-1][2] == -negative:
+                rank = rows[-1][0]
+            else:
+                rank = i + 1
+            rows.append((rank, profile, -negative))
+        return rows
+
+@dataclass
+class Challenge:
+    """A named competition over [start, end), optionally for one exercise"""
+    name: str
+    start: float
+    end: float
+    exercise: Optional[int] = None
+
+class Leaderboard:
+    """Local rankings of every profile in a (possibly shared) history.
+
+    Today, this week, this month and all-time totals each have a RankIndex
+    updated as events arrive (``Statistics`` records every set added or
+    synced), so top-K and "my rank" never re-sort the profiles. Period
+    boards reset when an event from a newer period arrives.
+
+    The boards, challenges and deleted profiles are kept in
+    ``leaderboard.json`` next to the history, with how far each month has
+    been read (``positions``: the log's id and byte offset, and the segment
+    already counted). History logs are append-only in arrival order, so
+    ``refresh()`` reads just the bytes appended since -- including sets
+    synced from a peer with an older clock -- and rebuilds from scratch only
+    when there is no saved state or the history changed under it (a log
+    archived before its tail was read, a log rewritten or removed). A
+    deleted profile's earlier events are ignored, even when rebuilding.
+    """
+    PERIODS = ('today', 'week', 'month', 'all')
+
+    def __init__(self, history: Optional[WorkoutHistory] = None, path: Optional[Path] = None):
+        self.history = history or WorkoutHistory()
+        self.path = path or self.history.history_dir.parent / 'leaderboard.json'
+        self.challenges = {}
+        self.deleted = {}  # profile -> deletion timestamp
+        self.positions = {}  # month -> {'segment', 'log', 'offset'} already counted
+        self.loaded = False  # boards were restored from leaderboard.json
+        self._days = {}
+        self.reset()
+        self.load()
+
+    def reset(self, now: Optional[float] = None):
+        """Empty boards for the periods containing ``now``"""
+        keys = self._period_keys(time.time() if now is None else now)
+        self.boards = {period: [key, RankIndex()] for period, key in zip(self.PERIODS, keys)}
+        self.challenge_boards = {name: RankIndex() for name in self.challenges}
+        self.positions = {}
+        self.loaded = False
+
+    def load(self):
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+            self.challenges = {c['name']: Challenge(**c) for c in data.get('challenges', [])}
+            self.deleted = data.get('deleted', {})
+            self.challenge_boards = {name: RankIndex() for name in self.challenges}
+            if 'positions' in data:  # older files only had a timestamp: rebuild those
+                for period, (key, scores) in data['boards'].items():
+                    self.boards[period] = [key, RankIndex(scores)]
+                for name, scores in data.get('challenge_boards', {}).items():
+                    if name in self.challenges:
+                        self.challenge_boards[name] = RankIndex(scores)
+                self.positions = data['positions']
+                self.loaded = True
+        except Exception as e:
+            stats_log.error("Failed to load leaderboard: %s", e)
+            self.reset()
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump({
+                'challenges': [c.__dict__ for c in self.challenges.values()],
+                'deleted': self.deleted,
+                'positions': self.positions,
+                'boards': {period: [key, board.scores] for period, (key, board) in self.boards.items()},
+                'challenge_boards': {name: board.scores for name, board in self.challenge_boards.items()},
+            }, f, indent=4)
+        os.replace(tmp_path, self.path)
+
+    def refresh(self, save: bool = True) -> int:
+        """Bring the boards up to date with the history (and save them).
+
+        Only bytes appended to the logs since the last refresh are read
+        (usually a line or two of the current month); the full history is
+        read only when there is no saved state or it is out of step with the
+        history. Returns the number of events replayed.
+        """
+        events = self._catch_up() if self.loaded else None
+        if events is None:
+            events = self.build()
+        if save:
+            self.save()
+        return events
+
+    @staticmethod
+    def _fingerprint(footer: dict) -> list:
+        return [footer.get('payload_crc'), footer['payload_bytes']]
+
+    def _catch_up(self) -> Optional[int]:
+        """Count what was added to the history since ``positions``.
+
+        Returns the number of events counted, or None when the boards can't
+        be brought up to date incrementally and need a rebuild.
+        """
+        history = self.history
+        months = history.months()
+        if set(self.positions) - set(months):
+            stats_log.info("Leaderboard: history months were removed; rebuilding")
+            return None
+        events = 0
+        for month in months:
+            position = self.positions.get(month)
+            segment = history._segment_path(month)
+            log = history._log_path(month)
+            footer = history.read_footer(segment) if segment.exists() else None
+            if footer and (position is None or position['segment'] != self._fingerprint(footer)):
+                if position is None:
+                    # A month not seen before: its segment, then the log past what it covers
+                    for event in history._iter_segment(segment):
+                        self.record(event)
+                        events += 1
+                    if log.exists():
+                        position = {'log': history.log_id(log), 'offset': history._covered_log_bytes(month)}
+                    else:
+                        position = {'log': footer.get('log_id'), 'offset': footer.get('log_bytes', 0)}
+                elif (footer.get('base_crc') != (position['segment'] or [None])[0]
+                      or footer.get('log_id') != position['log']
+                      or position['offset'] < footer.get('log_bytes', 0)):
+                    stats_log.info("Leaderboard: %s was archived past what was counted; rebuilding", month)
+                    return None
+                position['segment'] = self._fingerprint(footer)
+            if position is None:
+                position = {'segment': None, 'log': None, 'offset': 0}
+            if log.exists():
+                log_id = history.log_id(log)
+                if log_id != position['log']:
+                    # A new log: the month's first, or one recreated after archiving
+                    position['log'], position['offset'] = log_id, 0
+                if log.stat().st_size < position['offset']:
+                    stats_log.info("Leaderboard: %s was rewritten; rebuilding", log.name)
+                    return None
+                new, position['offset'] = history.read_appended(month, position['offset'])
+                for event in new:
+                    self.record(event)
+                events += len(new)
+            elif position['offset'] and not (footer and footer.get('log_id') == position['log']):
+                stats_log.info("Leaderboard: %s disappeared without being archived; rebuilding", log.name)
+                return None
+            self.positions[month] = position
+        return events
+
+    def _period_keys(self, timestamp: float) -> tuple:
+        # Cached per 15-minute bucket (time zone offsets are quarter hours)
+        bucket = int(timestamp // 900)
+        keys = self._days.get(bucket)
+        if keys is None:
+            if len(self._days) > 4096:
+                self._days.clear()
+            day = date.fromtimestamp(timestamp)
+            ordinal = day.toordinal()
+            keys = self._days[bucket] = (ordinal, ordinal - day.weekday(), day.year * 12 + day.month, 0)
+        return keys
+
+    def record(self, event: WorkoutEvent):
+        """Add one event to every board it counts towards"""
+        deleted_at = self.deleted.get(event.profile)
+        if deleted_at is not None and event.timestamp < deleted_at:
+            return
+        for board, key in zip(self.boards.values(), self._period_keys(event.timestamp)):
+            if key > board[0]:
+                board[0] = key  # a new day/week/month started
+                board[1] = RankIndex()
+            if key == board[0]:
+                board[1].add(event.profile, event.count)
+        for name, challenge in self.challenges.items():
+            if (challenge.start <= event.timestamp < challenge.end
+                    and challenge.exercise in (None, event.exercise)):
+                self.challenge_boards[name].add(event.profile, event.count)
+
+    def build(self, now: Optional[float] = None) -> int:
+        """Rebuild every board from the history, month by month"""
+        self.reset(now)
+        events = self._catch_up()  # with no positions every month is read in full
+        self.loaded = True
+        return events
+
+    def _board(self, period: str) -> RankIndex:
+        if period in self.boards:
+            key = self._period_keys(time.time())[self.PERIODS.index(period)]
+            if key > self.boards[period][0]:
+                return RankIndex()  # nothing logged yet in the current period
+            return self.boards[period][1]
+        if period in self.challenge_boards:
+            return self.challenge_boards[period]
+        raise KeyError(f"Unknown leaderboard: {period}")
+
+    def top(self, period: str, k: int = 10) -> list:
+        return self._board(period).top(k)
+
+    def rank_of(self, period: str, profile: str) -> tuple:
+        """(rank, score, participants); rank is None for a profile with no sets"""
+        board = self._board(period)
+        return board.rank_of(profile), board.scores.get(profile, 0), len(board)
+
+    def add_challenge(self, challenge: Challenge):
+        """Start a challenge, counting history already inside its window"""
+        if challenge.end <= challenge.start:
+            raise ValueError("Challenge must end after it starts")
+        self.challenges[challenge.name] = challenge
+        board = self.challenge_boards[challenge.name] = RankIndex()
+        start = datetime.fromtimestamp(challenge.start)
+        end = datetime.fromtimestamp(challenge.end)
+        for event in self.history.iter_events(start, end):
+            deleted_at = self.deleted.get(event.profile)
+            if (challenge.exercise in (None, event.exercise)
+                    and (deleted_at is None or event.timestamp >= deleted_at)):
+                board.add(event.profile, event.count)
+        self.save()
+
+    def remove_challenge(self, name: str):
+        self.challenges.pop(name, None)
+        self.challenge_boards.pop(name, None)
+        self.save()
+
+    def delete_profile(self, profile: str):
+        """Drop a profile from every board, now and on future rebuilds"""
+        self.deleted[profile] = time.time()
+        for _, board in self.boards.values():
+            board.remove(profile)
+        for board in self.challenge_boards.values():
+            board.remove(profile)
+        self.save()
+
+class DeviceLog:
+    """Append-only log of one device's events, numbered from 1.
+
+    Lines use the history record format. A sparse offset index (``.idx``,
+    one u64 every INDEX_STRIDE events) lets "everything after seq N" seek
+    close to N instead of reading the whole log.
+    """
+    INDEX_STRIDE = 64
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.index_path = path.with_suffix('.idx')
+        self.index = array('Q')
+        self.count = 0
+        self.size = 0
+        self._load()
+
+    def _load(self):
+        """Read the index and catch up on lines written after it (or after a crash)"""
+        if self.index_path.exists():
+            data = self.index_path.read_bytes()
+            self.index.frombytes(data[:len(data) - len(data) % self.index.itemsize])
+        stored = len(self.index)
+        if not self.path.exists():
+            self.index = array('Q')
+            return
+        size = self.path.stat().st_size
+        while self.index and self.index[-1] >= size:
+            self.index.pop()
+        offset = self.index[-1] if self.index else 0
+        count = (len(self.index) - 1) * self.INDEX_STRIDE if self.index else 0
+        with open(self.path, 'r+b') as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break  # torn write; dropped below
+                if count % self.INDEX_STRIDE == 0 and count // self.INDEX_STRIDE >= len(self.index):
+                    self.index.append(offset)
+                count += 1
+                offset += len(line)
+            if offset < size:
+                f.truncate(offset)
+        self.count = count
+        self.size = offset
+        if len(self.index) != stored or not self.index_path.exists():
+            self.index_path.write_bytes(self.index.tobytes())
+
+    def append(self, records: list):
+        lines = []
+        new_index = array('Q')
+        for record in records:
+            if self.count % self.INDEX_STRIDE == 0:
+                new_index.append(self.size)
+            line = (json.dumps(seal_record(record), separators=(',', ':')) + '\n').encode()
+            lines.append(line)
+            self.size += len(line)
+            self.count += 1
+        with open(self.path, 'ab') as f:
+            f.write(b''.join(lines))
+        if new_index:
+            with open(self.index_path, 'ab') as f:
+                f.write(new_index.tobytes())
+            self.index.extend(new_index)
+
+    def read_from(self, seq: int, limit: int) -> list:
+        """Up to ``limit`` records after sequence number ``seq``"""
+        if seq >= self.count:
+            return []
+        block = seq // self.INDEX_STRIDE
+        skip = seq - block * self.INDEX_STRIDE
+        records = []
+        with open(self.path, 'rb') as f:
+            f.seek(self.index[block])
+            for line in f:
+                if skip:
+                    skip -= 1
+                    continue
+                record = json.loads(line)
+                if not verify_record(record, required=True):
+                    raise ValueError(f"Corrupt record in {self.path.name}")
+                record.pop(CHECKSUM_KEY, None)
+                records.append(record)
+                if len(records) >= limit or seq + len(records) >= self.count:
+                    break
+        return records
+
+class SyncStore:
+    """Delta sync of workout events between this device and its peers.
+
+    Every device appends its own sets to ``sync/<device id>.log``; events
+    from peers go into their device's log (and the history). The number of
+    events held per device is a version vector, so a sync exchanges vectors
+    and then only the events the other side is missing. Events never
+    change, which makes merging a union: conflict-free, and idempotent
+    because anything at or below a device's count is skipped.
+
+    Wire format: every message is a u32 length followed by zlib-compressed
+    JSON; events travel in batches of BATCH_SIZE. Before any vector or event
+    is exchanged, each side proves it knows the shared secret with an HMAC
+    of the other side's random nonce.
+    """
+    PROTOCOL = 2
+    DEFAULT_PORT = 47820
+    BATCH_SIZE = 2000
+    FRAME = struct.Struct('<I')
+    MAX_FRAME = 64 * 1024 * 1024
+
+    def __init__(self, data_dir: Optional[Path] = None, history: Optional[WorkoutHistory] = None,
+                 secret: str = ""):
+        self.data_dir = data_dir or Path.home() / '.pushup_reminder'
+        self.secret = secret  # sync_secret; syncs are refused without one
+        self.sync_dir = self.data_dir / 'sync'
+        self.history = history or WorkoutHistory(self.data_dir / 'history')
+        self._lock = threading.RLock()
+        first_run = not self.sync_dir.exists()
+        self.sync_dir.mkdir(parents=True, exist_ok=True)
+        self.device_id = self._load_device_id()
+        self.logs = {path.stem: DeviceLog(path) for path in self.sync_dir.glob('*.log')}
+        if first_run:
+            # Sets logged before sync existed become this device's first events
+            self._log(self.device_id).append(e.to_record() for e in self.history.iter_events())
+        self.bytes_sent = 0  # totals over all syncs, updated under the lock
+        self.bytes_received = 0
+
+    def _load_device_id(self) -> str:
+        path = self.data_dir / 'device.json'
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)['device_id']
+        except (OSError, ValueError, KeyError):
+            device_id = uuid.uuid4().hex
+            with open(path, 'w') as f:
+                json.dump({'device_id': device_id}, f)
+            return device_id
+
+    def _log(self, device: str) -> DeviceLog:
+        log = self.logs.get(device)
+        if log is None:
+            if not re.fullmatch(r'[0-9a-f]{32}', device):
+                raise ValueError(f"Invalid device id: {device!r}")
+            log = self.logs[device] = DeviceLog(self.sync_dir / f'{device}.log')
+        return log
+
+    def vector(self) -> dict:
+        """Device id -> number of that device's events held here"""
+        with self._lock:
+            return {device: log.count for device, log in self.logs.items() if log.count}
+
+    def record_local(self, event: WorkoutEvent):
+        """Log a set made on this device"""
+        with self._lock:
+            self._log(self.device_id).append([event.to_record()])
+
+    @staticmethod
+    def valid_record(record) -> bool:
+        """Whether a peer's record has the field types of a history event"""
+        if not isinstance(record, dict):
+            return False
+        t, n = record.get('t'), record.get('n')
+        if isinstance(t, bool) or not isinstance(t, (int, float)) or not math.isfinite(t):
+            return False
+        if isinstance(n, bool) or not isinstance(n, int) or n <= 0:
+            return False
+        exercise = record.get('ex', PUSHUPS_ID)
+        if isinstance(exercise, bool) or not isinstance(exercise, (int, str)):
+            return False
+        return isinstance(record.get('p', "default"), str)
+
+    def apply(self, device: str, start: int, records: list) -> list:
+        """Merge a batch of a device's events starting at seq ``start``.
+
+        Events already held are skipped, so replaying a batch is harmless.
+        Malformed records are dropped (logged as an empty record so sequence
+        numbers still line up with the sender's). Returns the events that were new.
+        """
+        if isinstance(start, bool) or not isinstance(start, int) or start < 1 \
+                or not isinstance(records, list):
+            raise ValueError(f"Malformed sync batch from {device}")
+        with self._lock:
+            log = self._log(device)
+            if start > log.count + 1:
+                raise ValueError(f"Gap in events from {device}: have {log.count}, got {start}")
+            records = records[log.count - (start - 1):]
+            if not records:
+                return []
+            events = []
+            lines = []
+            for record in records:
+                if self.valid_record(record):
+                    event = WorkoutEvent.from_record(record)
+                    events.append(event)
+                    lines.append(event.to_record())
+                else:
+                    lines.append({})
+            dropped = len(lines) - len(events)
+            if dropped:
+                sync_log.warning("Dropped %d malformed events from %s", dropped, device)
+            log.append(lines)
+            if events:
+                self.history.append_many(events)
+            return events
+
+    def _send(self, sock, message: dict, traffic: dict):
+        payload = zlib.compress(json.dumps(message, separators=(',', ':')).encode(), 6)
+        sock.sendall(self.FRAME.pack(len(payload)) + payload)
+        traffic['bytes_sent'] += self.FRAME.size + len(payload)
+
+    def _recv_exact(self, sock, size: int) -> bytes:
+        data = bytearray()
+        while len(data) < size:
+            chunk = sock.recv(min(size - len(data), 1 << 20))
+            if not chunk:
+                raise ConnectionError("Sync peer closed the connection")
+            data += chunk
+        return bytes(data)
+
+    def _recv(self, sock, traffic: dict) -> dict:
+        size = self.FRAME.unpack(self._recv_exact(sock, self.FRAME.size))[0]
+        if size > self.MAX_FRAME:
+            raise ValueError(f"Sync message too large ({size} bytes)")
+        traffic['bytes_received'] += self.FRAME.size + size
+        # Bounded, so a small compressed frame can't expand without limit
+        decompressor = zlib.decompressobj()
+        data = decompressor.decompress(self._recv_exact(sock, size), self.MAX_FRAME)
+        if decompressor.unconsumed_tail:
+            raise ValueError(f"Sync message too large (over {self.MAX_FRAME} bytes decompressed)")
+        message = json.loads(data)
+        if not isinstance(message, dict):
+            raise ValueError("Malformed sync message")
+        return message
+
+    def _send_missing(self, sock, peer_vector: dict, traffic: dict) -> int:
+        sent = 0
+        for device, count in self.vector().items():
+            have = peer_vector.get(device, 0)
+            while have < count:
+                with self._lock:
+                    records = self.logs[device].read_from(have, self.BATCH_SIZE)
+                if not records:
+                    break
+                self._send(sock, {'type': 'events', 'device': device, 'start': have + 1,
+                                  'records': records}, traffic)
+                have += len(records)
+                sent += len(records)
+        self._send(sock, {'type': 'done'}, traffic)
+        return sent
+
+    def _receive_missing(self, sock, traffic: dict) -> list:
+        received = []
+        while True:
+            message = self._recv(sock, traffic)
+            if message.get('type') == 'done':
+                return received
+            if message.get('type') != 'events':
+                raise ValueError(f"Unexpected sync message: {message.get('type')}")
+            try:
+                device = message['device']
+                if not isinstance(device, str):
+                    raise TypeError("device id is not a string")
+                received.extend(self.apply(device, message['start'], message['records']))
+            except (KeyError, TypeError) as e:
+                raise ValueError(f"Malformed sync batch: {e}")
+
+    def _proof(self, role: str, nonce: str, device: str) -> str:
+        message = f"{role}:{nonce}:{device}".encode()
+        return hmac.new(self.secret.encode(), message, hashlib.sha256).hexdigest()
+
+    def _authenticate(self, sock, initiator: bool, peer: dict, nonce: str, traffic: dict) -> dict:
+        """Exchange HMAC proofs; returns the peer's version vector.
+
+        The responder only answers once the initiator has proven itself, so
+        its proofs can't be collected by a client that doesn't know the secret.
+        """
+        role, peer_role = ('initiator', 'responder') if initiator else ('responder', 'initiator')
+        auth = {'type': 'auth', 'proof': self._proof(role, peer['nonce'], self.device_id)}
+
+        def check(message):
+            proof = message.get('proof')
+            if message.get('type') != 'auth' or not isinstance(proof, str) or not hmac.compare_digest(
+                    proof, self._proof(peer_role, nonce, peer['device'])):
+                raise PermissionError("Sync peer failed authentication (check sync_secret)")
+            vector = message.get('vector')
+            if not isinstance(vector, dict) or not all(
+                    isinstance(k, str) and isinstance(v, int) and not isinstance(v, bool)
+                    for k, v in vector.items()):
+                raise ValueError("Malformed sync vector")
+            return vector
+
+        if initiator:
+            self._send(sock, dict(auth, vector=self.vector()), traffic)
+            return check(self._recv(sock, traffic))
+        vector = check(self._recv(sock, traffic))
+        self._send(sock, dict(auth, vector=self.vector()), traffic)
+        return vector
+
+    def sync(self, sock, initiator: bool) -> dict:
+        """Run one exchange over a connected socket; both sides end up equal"""
+        if not self.secret:
+            raise PermissionError("Sync is disabled until sync_secret is set")
+        # Per-exchange counters: the server and peer threads may sync at once
+        traffic = {'bytes_sent': 0, 'bytes_received': 0}
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)  # small frames, request/response
+        nonce = secrets.token_hex(16)
+        hello = {'type': 'hello', 'protocol': self.PROTOCOL, 'device': self.device_id, 'nonce': nonce}
+        if initiator:
+            self._send(sock, hello, traffic)
+            peer = self._recv(sock, traffic)
+        else:
+            peer = self._recv(sock, traffic)
+        if peer.get('type') != 'hello' or peer.get('protocol') != self.PROTOCOL:
+            raise ValueError("Sync peer speaks a different protocol")
+        if not isinstance(peer.get('device'), str) or not isinstance(peer.get('nonce'), str):
+            raise ValueError("Malformed sync hello")
+        if not initiator:
+            self._send(sock, hello, traffic)
+        peer_vector = self._authenticate(sock, initiator, peer, nonce, traffic)
+        # One side talks at a time, so neither can block on a full socket buffer
+        if initiator:
+            sent = self._send_missing(sock, peer_vector, traffic)
+            received = self._receive_missing(sock, traffic)
+        else:
+            received = self._receive_missing(sock, traffic)
+            sent = self._send_missing(sock, peer_vector, traffic)
+        with self._lock:
+            self.bytes_sent += traffic['bytes_sent']
+            self.bytes_received += traffic['bytes_received']
+        return {'peer': peer['device'], 'sent': sent, 'received': received, **traffic}
+
+    def sync_with(self, host: str, port: int = DEFAULT_PORT, timeout: float = 30) -> dict:
+        """Connect to a peer's SyncServer and sync with it"""
+        with socket.create_connection((host, port), timeout=timeout) as sock:
+            return self.sync(sock, initiator=True)
+
+class SyncServer:
+    """Accepts sync connections from peers, one at a time, on a background thread"""
+
+    def __init__(self, store: SyncStore, host: str = '0.0.0.0', port: int = SyncStore.DEFAULT_PORT,
+                 on_events=None):
+        self.store = store
+        self.host = host
+        self.port = port
+        self.on_events = on_events
+        self.running = False
+        self.sock = None
+        self.thread = None
+
+    def start(self):
+        self.sock = socket.create_server((self.host, self.port))
+        self.sock.settimeout(1.0)
+        self.port = self.sock.getsockname()[1]
+        self.running = True
+        self.thread = threading.Thread(target=self._serve, daemon=True)
+        self.thread.start()
+
+    def _serve(self):
+        while self.running:
+            try:
+                conn, address = self.sock.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            with conn:
+                try:
+                    conn.settimeout(30)
+                    report = self.store.sync(conn, initiator=False)
+                    if report['received'] and self.on_events:
+                        self.on_events(report['received'])
+                except Exception as e:
+                    sync_log.warning("Sync with %s failed: %s", address[0], e)
+
+    def stop(self):
+        self.running = False
+        if self.sock:
+            self.sock.close()
+        if self.thread:
+            self.thread.join(timeout=2.0)
+
+class StatisticsExporter:
+    """Streams workout history to CSV or JSON Lines.
+
+    Events flow through a chain of generators (read -> filter -> aggregate ->
+    chunked write), so memory use does not depend on the size of the history.
+    """
+    FORMATS = ('csv', 'jsonl')
+    GROUPS = ('day', 'week')
+    RAW_FIELDS = ['timestamp', 'exercise', 'profile', 'count']
+    GROUPED_FIELDS = ['period', 'exercise', 'profile', 'sets', 'count']
+
+    def __init__(self, stats: Statistics, chunk_size: int = 5000,
+                 catalog: Optional[ExerciseCatalog] = None):
+        self.stats = stats
+        self.chunk_size = chunk_size
+        self.catalog = catalog or ExerciseCatalog.default()
+
+    def iter_events(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                    exercise: Optional[str] = None, profile: Optional[str] = None):
+        """History events in [start, end) matching the exercise/profile filters"""
+        exercise_id = None
+        if exercise:
+            exercise_id = self.catalog.id_for(exercise)
+            if exercise_id is None:
+                raise ValueError(f"Unknown exercise: {exercise}")
+        for event in self.stats.history.iter_events(start, end):
+            if exercise_id is not None and event.exercise != exercise_id:
+                continue
+            if profile and event.profile != profile:
+                continue
+            yield event
+
+    @staticmethod
+    def _period(event: WorkoutEvent, group: str) -> str:
+        day = datetime.fromtimestamp(event.timestamp).date()
+        if group == 'week':
+            day = day - timedelta(days=day.weekday())
+        return day.isoformat()
+
+    def _aggregate(self, events, group: str):
+        """Fold events into per-period rows.
+
+        History is read month by month, so once a new month starts only buckets
+        that can still receive events (the current week) are kept open.
+        """
+        buckets = {}
+        current_month = None
+        for event in events:
+            month = event.month
+            if month != current_month:
+                current_month = month
+                month_start = datetime.strptime(month, '%Y-%m').date()
+                if group == 'week':
+                    month_start -= timedelta(days=month_start.weekday())
+                cutoff = month_start.isoformat()
+                for key in sorted(k for k in buckets if k[0] < cutoff):
+                    yield self._grouped_row(key, buckets.pop(key))
+            key = (self._period(event, group), event.exercise, event.profile)
+            sets, count = buckets.get(key, (0, 0))
+            buckets[key] = (sets + 1, count + event.count)
+        for key in sorted(buckets):
+            yield self._grouped_row(key, buckets[key])
+
+    def _grouped_row(self, key: tuple, value: tuple) -> dict:
+        period, exercise, profile = key
+        return {'period': period, 'exercise': self.catalog.key_for(exercise), 'profile': profile,
+                'sets': value[0], 'count': value[1]}
+
+    def _raw_row(self, event: WorkoutEvent) -> dict:
+        return {
+            'timestamp': datetime.fromtimestamp(event.timestamp).isoformat(timespec='seconds'),
+            'exercise': self.catalog.key_for(event.exercise),
+            'profile': event.profile,
+            'count': event.count,
+        }
+
+    def iter_rows(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                  exercise: Optional[str] = None, profile: Optional[str] = None,
+                  group: Optional[str] = None):
+        """Rows ready to be written, either one per set or one per period"""
+        events = self.iter_events(start, end, exercise, profile)
+        if group:
+            return self._aggregate(events, group)
+        return (self._raw_row(event) for event in events)
+
+    def _chunks(self, rows):
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= self.chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def export(self, output, fmt: str = 'csv', start: Optional[datetime] = None,
+               end: Optional[datetime] = None, exercise: Optional[str] = None,
+               profile: Optional[str] = None, group: Optional[str] = None,
+               progress=None) -> int:
+        """Write matching rows to ``output`` (a path or an open text file).
+
+        ``progress(rows_written, fraction)`` is called after every chunk, where
+        fraction is the share of history months already read.
+        Returns the number of rows written.
+        """
+        if fmt not in self.FORMATS:
+            raise ValueError(f"Unsupported export format: {fmt}")
+        if group and group not in self.GROUPS:
+            raise ValueError(f"Unsupported grouping: {group}")
+
+        months = [m for m in self.stats.history.months()
+                  if (not start or m >= start.strftime('%Y-%m'))
+                  and (not end or m <= end.strftime('%Y-%m'))]
+        month_index = {m: i for i, m in enumerate(months)}
+        fields = self.GROUPED_FIELDS if group else self.RAW_FIELDS
+        rows = self.iter_rows(start, end, exercise, profile, group)
+
+        if isinstance(output, (str, Path)):
+            f = open(output, 'w', newline='', encoding='utf-8')
+            close = True
+        else:
+            f, close = output, False
+        written = 0
+        try:
+            if fmt == 'csv':
+                writer = csv.DictWriter(f, fieldnames=fields)
+                writer.writeheader()
+            for chunk in self._chunks(rows):
+                if fmt == 'csv':
+                    writer.writerows(chunk)
+                else:
+                    f.write(''.join(json.dumps(row, separators=(',', ':')) + '\n' for row in chunk))
+                written += len(chunk)
+                if progress:
+                    last = chunk[-1]
+                    month = (last.get('period') or last['timestamp'])[:7]
+                    done = month_index.get(month, len(months) - 1) + 1
+                    progress(written, done / len(months) if months else 1.0)
+        finally:
+            if close:
+                f.close()
+        if progress:
+            progress(written, 1.0)
+        return written
+
+class BackupService:
+    """Incremental, deduplicated backups of the user's data in ~/.pushup_reminder.
+
+    Only settings, statistics, achievements, challenges and the workout
+    history are backed up (``DATA_FILES``/``DATA_DIRS``); logs, caches, sync
+    replicas and session state are runtime files and are left alone.
+
+    Files are split into fixed-size chunks stored once under their SHA-256
+    (``chunks/ab/abcd...``). A snapshot is just a manifest listing each file's
+    chunk hashes, so a new snapshot only writes chunks that changed. History
+    logs are append-only and archived segments never change, which keeps the
+    set of new chunks per backup small.
+    """
+    CHUNK_SIZE = 64 * 1024
+    DATA_FILES = ('config.json', 'stats.json', 'achievements.json', 'leaderboard.json')
+    DATA_DIRS = ('history',)
+    # SetThreadPriority mode that also lowers the thread's I/O priority
+    THREAD_MODE_BACKGROUND_BEGIN = 0x00010000
+
+    def __init__(self, data_dir: Optional[Path] = None, backup_dir: Optional[Path] = None,
+                 keep: int = 7):
+        self.data_dir = data_dir or Path.home() / '.pushup_reminder'
+        self.backup_dir = backup_dir or self.data_dir / 'backups'
+        self.chunks_dir = self.backup_dir / 'chunks'
+        self.snapshots_dir = self.backup_dir / 'snapshots'
+        self.keep = keep
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self.thread = None
+
+    def _iter_files(self, root: Optional[Path] = None):
+        """The backed-up files under ``root`` (the data directory by default)"""
+        root = root or self.data_dir
+        for name in self.DATA_FILES:
+            if (root / name).is_file():
+                yield root / name
+        for name in self.DATA_DIRS:
+            if not (root / name).is_dir():
+                continue
+            for path in sorted((root / name).rglob('*')):
+                if path.is_file() and not path.name.endswith('.tmp'):
+                    yield path
+
+    def _chunk_path(self, digest: str) -> Path:
+        return self.chunks_dir / digest[:2] / digest
+
+    def _store_chunk(self, digest: str, data: bytes) -> bool:
+        """Store a chunk unless it already exists. Returns True if written."""
+        path = self._chunk_path(digest)
+        if path.exists():
+            return False
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(zlib.compress(data, 6))
+        os.replace(tmp_path, path)
+        return True
+
+    def _read_chunk(self, digest: str) -> bytes:
+        with open(self._chunk_path(digest), 'rb') as f:
+            data = zlib.decompress(f.read())
+        if hashlib.sha256(data).hexdigest() != digest:
+            raise ValueError(f"Backup chunk {digest[:12]} is corrupt")
+        return data
+
+    def list_snapshots(self) -> list[str]:
+        """Snapshot ids, oldest first"""
+        if not self.snapshots_dir.exists():
+            return []
+        return sorted(p.stem for p in self.snapshots_dir.glob('*.json'))
+
+    def load_manifest(self, snapshot_id: str) -> dict:
+        with open(self.snapshots_dir / f'{snapshot_id}.json', 'r') as f:
+            return json.load(f)
+
+    def last_backup_time(self) -> Optional[float]:
+        snapshots = self.list_snapshots()
+        if not snapshots:
+            return None
+        return self.load_manifest(snapshots[-1])['created']
+
+    def create_snapshot(self) -> dict:
+        """Back up every changed chunk and write a new manifest"""
+        with self._lock:
+            snapshots = self.list_snapshots()
+            previous = self.load_manifest(snapshots[-1])['files'] if snapshots else {}
+            files = {}
+            report = {'files': 0, 'new_chunks': 0, 'reused_chunks': 0, 'bytes_written': 0}
+            for path in self._iter_files():
+                rel = path.relative_to(self.data_dir).as_posix()
+                stat = path.stat()
+                old = previous.get(rel)
+                report['files'] += 1
+                if old and old['size'] == stat.st_size and old['mtime_ns'] == stat.st_mtime_ns:
+                    # Unchanged since the last snapshot: no need to re-read it
+                    files[rel] = old
+                    report['reused_chunks'] += len(old['chunks'])
+                    continue
+                chunks = []
+                file_hash = hashlib.sha256()
+                with open(path, 'rb') as f:
+                    while True:
+                        data = f.read(self.CHUNK_SIZE)
+                        if not data:
+                            break
+                        file_hash.update(data)
+                        digest = hashlib.sha256(data).hexdigest()
+                        chunks.append(digest)
+                        if self._store_chunk(digest, data):
+                            report['new_chunks'] += 1
+                            report['bytes_written'] += self._chunk_path(digest).stat().st_size
+                        else:
+                            report['reused_chunks'] += 1
+                files[rel] = {
+                    'size': stat.st_size,
+                    'mtime_ns': stat.st_mtime_ns,
+                    'sha256': file_hash.hexdigest(),
+                    'chunks': chunks,
+                }
+
+            created = time.time()
+            snapshot_id = datetime.fromtimestamp(created).strftime('%Y%m%dT%H%M%S%f')
+            self.snapshots_dir.mkdir(parents=True, exist_ok=True)
+            manifest_path = self.snapshots_dir / f'{snapshot_id}.json'
+            tmp_path = manifest_path.with_suffix('.tmp')
+            with open(tmp_path, 'w') as f:
+                json.dump({'created': created, 'files': files}, f)
+            os.replace(tmp_path, manifest_path)
+            report['snapshot'] = snapshot_id
+        self.apply_retention()
+        return report
+
+    def restore(self, snapshot_id: Optional[str] = None, target_dir: Optional[Path] = None) -> int:
+        """Restore a snapshot (latest by default), verifying every hash first.
+
+        All files are rebuilt and verified into temporary files before any
+        existing file is replaced, so a corrupt backup never clobbers live data.
+        Backed-up files that are not in the snapshot (e.g. newer history months)
+        are moved to ``backups/displaced/<time>/`` so the restored data is
+        consistent. Returns the number of files restored.
+        """
+        snapshots = self.list_snapshots()
+        if not snapshots:
+            raise FileNotFoundError("No backups available")
+        snapshot_id = snapshot_id or snapshots[-1]
+        if snapshot_id not in snapshots:
+            raise FileNotFoundError(f"Backup {snapshot_id} not found")
+        target_dir = target_dir or self.data_dir
+        manifest = self.load_manifest(snapshot_id)
+
+        staged = []
+        try:
+            for rel, entry in manifest['files'].items():
+                dest = target_dir / rel
+                dest.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = dest.with_name(dest.name + '.restore.tmp')
+                file_hash = hashlib.sha256()
+                with open(tmp_path, 'wb') as f:
+                    staged.append((tmp_path, dest))
+                    for digest in entry['chunks']:
+                        data = self._read_chunk(digest)
+                        file_hash.update(data)
+                        f.write(data)
+                if file_hash.hexdigest() != entry['sha256']:
+                    raise ValueError(f"Restored {rel} does not match its backup hash")
+        except Exception:
+            for tmp_path, _ in staged:
+                tmp_path.unlink(missing_ok=True)
+            raise
+        restored = {dest for _, dest in staged}
+        displaced_dir = self.backup_dir / 'displaced' / datetime.now().strftime('%Y%m%dT%H%M%S%f')
+        for path in list(self._iter_files(target_dir)):
+            if path not in restored:
+                aside = displaced_dir / path.relative_to(target_dir)
+                aside.parent.mkdir(parents=True, exist_ok=True)
+                shutil.move(str(path), str(aside))
+        for tmp_path, dest in staged:
+            os.replace(tmp_path, dest)
+        return len(staged)
+
+    def apply_retention(self, keep: Optional[int] = None) -> int:
+        """Drop snapshots beyond the newest ``keep`` and unreferenced chunks"""
+        keep = self.keep if keep is None else keep
+        removed = 0
+        with self._lock:
+            snapshots = self.list_snapshots()
+            for snapshot_id in snapshots[:max(0, len(snapshots) - keep)]:
+                (self.snapshots_dir / f'{snapshot_id}.json').unlink()
+                removed += 1
+            if not removed:
+                return 0
+            referenced = set()
+            for snapshot_id in self.list_snapshots():
+                for entry in self.load_manifest(snapshot_id)['files'].values():
+                    referenced.update(entry['chunks'])
+            for path in self.chunks_dir.glob('*/*'):
+                if path.name not in referenced:
+                    path.unlink()
+        return removed
+
+    def _lower_thread_priority(self):
+        """Run this thread at background CPU and I/O priority on Windows"""
+        try:
+            win32process.SetThreadPriority(
+                win32api.GetCurrentThread(),
+                self.THREAD_MODE_BACKGROUND_BEGIN
+            )
+        except Exception as e:
+            backup_log.warning("Failed to lower backup thread priority: %s", e)
 
-    @classmethod
-    def load(cls) -> 'AppSettings':
-        config_path = Path.home() / '.pushup_reminder' / 'config.json'
-        if config_path.exists():
-            with open(config_path, 'r') as f:
-                data = json.load(f)
-                # Remove old sound-related settings if they exist
-                data.pop('notification_sound', None)
-                data.pop('custom_sound_path', None)
-                # Only keep known settings
-                valid_fields = cls.__dataclass_fields__.keys()
-                filtered_data = {k: v for k, v in data.items() if k in valid_fields}
-                return cls(**filtered_data)
-        return cls()
-    
-    def save(self):
-        config_path = Path.home() / '.pushup_reminder' / 'config.json'
-        config_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(config_path, 'w') as f:
-            json.dump(self.__dict__, f)
+    def _schedule_loop(self, interval_hours: float):
+        self._lower_thread_priority()
+        interval = interval_hours * 3600
+        while not self._stop_event.is_set():
+            try:
+                last = self.last_backup_time()
+                due = interval if last is None else last + interval - time.time()
+                if last is None or due <= 0:
+                    report = self.create_snapshot()
+                    backup_log.info("Backup %s complete: %d new chunk(s), %d bytes",
+                                    report['snapshot'], report['new_chunks'], report['bytes_written'])
+                    due = interval
+            except Exception as e:
+                backup_log.error("Scheduled backup failed: %s", e)
+                due = min(interval, 3600)
+            self._stop_event.wait(due)
+
+    def start_scheduler(self, interval_hours: float):
+        """Start periodic backups on a background thread"""
+        if self.thread and self.thread.is_alive():
+            return
+        self._stop_event.clear()
+        self.thread = threading.Thread(
+            target=self._schedule_loop, args=(interval_hours,), daemon=True
+        )
+        self.thread.start()
+
+    def stop_scheduler(self):
+        self._stop_event.set()
+        if self.thread:
+            self.thread.join(timeout=1.0)
+
+class SoundBuffer:
+    """A WAV cue decoded once and kept in memory.
+
+    ``data`` holds the complete RIFF image (what ``winsound`` plays with
+    ``SND_MEMORY``); ``pcm`` is a zero-copy view of its sample data. Buffers
+    are shared by every playback of the cue and never copied.
+    """
+    PCM_FORMATS = (1, 3, 0xFFFE)  # PCM, IEEE float, WAVE_FORMAT_EXTENSIBLE
+
+    def __init__(self, name: str, data: bytes):
+        self.name = name
+        self.data = data
+        view = memoryview(data)
+        if data[:4] != b'RIFF' or data[8:12] != b'WAVE':
+            raise ValueError(f"{name} is not a WAV file")
+        fmt = None
+        self.pcm = None
+        offset = 12
+        while offset + 8 <= len(data):
+            chunk_id = data[offset:offset + 4]
+            size = struct.unpack_from('<I', data, offset + 4)[0]
+            body = offset + 8
+            if chunk_id == b'fmt ':
+                fmt = struct.unpack_from('<HHIIHH', data, body)
+            elif chunk_id == b'data':
+                self.pcm = view[body:body + size]
+            offset = body + size + (size & 1)  # chunks are word aligned
+        if fmt is None or self.pcm is None:
+            raise ValueError(f"{name} is missing its fmt or data chunk")
+        format_tag, self.channels, self.frame_rate, _, block_align, bits = fmt
+        if format_tag not in self.PCM_FORMATS:
+            raise ValueError(f"{name} uses unsupported WAV format {format_tag}")
+        self.sample_width = bits // 8
+        self.frames = len(self.pcm) // block_align if block_align else 0
+
+    @property
+    def duration(self) -> float:
+        return self.frames / self.frame_rate if self.frame_rate else 0.0
+
+class NullSoundBackend:
+    """Discards audio but records what would have played (for tests)"""
 
-class Statistics:
     def __init__(self):
-        self.today_pushups = 0
-        self.total_pushups = 0
-        self.streak_days = 0
-        self.last_completion = None
-        self.load_stats()
-    
-    def add_pushups(self, count: int):
-        """Record completed pushups"""
-        self.today_pushups += count
-        self.total_pushups += count
-        self.last_completion = datetime.now()
-        self.save_stats()
-    
-    def reset_daily(self):
-        """Reset daily statistics"""
-        self.today_pushups = 0
-        self.save_stats()
-    
-    def load_stats(self):
-        """Load statistics from file"""
-        stats_path = Path.home() / '.pushup_reminder' / 'stats.json'
-        if stats_path.exists():
+        self.played = []
+
+    def play(self, buffer: SoundBuffer, requested_at: float, on_started):
+        on_started(buffer, requested_at)
+        self.played.append(buffer.name)
+
+    def close(self):
+        pass
+
+class WaveFileSoundBackend:
+    """Writes each cue to a WAV file instead of the speakers.
+
+    The buffer's RIFF image is written as-is, so float and extensible WAVs
+    keep their real format header.
+    """
+
+    def __init__(self, output_dir: Path):
+        self.output_dir = output_dir
+        self.count = 0
+
+    def play(self, buffer: SoundBuffer, requested_at: float, on_started):
+        on_started(buffer, requested_at)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.count += 1
+        with open(self.output_dir / f'{self.count:04d}_{buffer.name}.wav', 'wb') as f:
+            f.write(buffer.data)
+
+    def close(self):
+        pass
+
+class WinsoundSoundBackend:
+    """Plays cues straight from memory with winsound on a dedicated thread.
+
+    ``winsound`` cannot play ``SND_MEMORY`` sounds asynchronously, so a single
+    worker thread plays them synchronously. A new cue stops the one playing
+    (``PlaySound(None)``) and cues still waiting are dropped, so only the
+    latest one is heard.
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self.playing = False
+        self.thread = threading.Thread(target=self._worker, daemon=True)
+        self.thread.start()
+
+    def _worker(self):
+        while True:
+            item = self._queue.get()
+            # Skip to the newest request; stale cues are not worth playing late
+            while item is not None:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                else:
+                    if item is None:
+                        break
+            if item is None:
+                break
+            buffer, requested_at, on_started = item
             try:
-                with open(stats_path, 'r') as f:
-                    data = json.load(f)
-                    self.today_pushups = data.get('today_pushups', 0)
-                    self.total_pushups = data.get('total_pushups', 0)
-                    self.streak_days = data.get('streak_days', 0)
-                    last_completion = data.get('last_completion')
-                    if last_completion:
-                        self.last_completion = datetime.fromisoformat(last_completion)
+                on_started(buffer, requested_at)
+                self.playing = True
+                winsound.PlaySound(buffer.data, winsound.SND_MEMORY | winsound.SND_NODEFAULT)
             except Exception as e:
-                print(f"Failed to load statistics: {e}")
-    
-    def save_stats(self):
-        """Save statistics to file"""
-        stats_path = Path.home() / '.pushup_reminder' / 'stats.json'
-        stats_path.parent.mkdir(parents=True, exist_ok=True)
+                sound_log.warning("Failed to play sound %s: %s", buffer.name, e)
+            finally:
+                self.playing = False
+
+    def play(self, buffer: SoundBuffer, requested_at: float, on_started):
+        self._queue.put((buffer, requested_at, on_started))
+        if self.playing:
+            try:
+                winsound.PlaySound(None, 0)  # stops the cue the worker is playing
+            except Exception as e:
+                sound_log.warning("Failed to stop sound: %s", e)
+
+    def close(self):
+        self._queue.put(None)
+
+class SoundEngine:
+    """Loads reminder sounds once and plays them from memory"""
+    NO_SOUND = "None"
+
+    def __init__(self, backend=None, sounds_dir: Optional[Path] = None):
+        self.backend = backend or WinsoundSoundBackend()
+        self.sounds_dir = sounds_dir or Path(__file__).parent / 'assets' / 'sounds'
+        self._buffers = {}
+        self._lock = threading.Lock()
+        self._latencies = []
+
+    def available(self) -> list[str]:
+        """Names of the bundled sounds"""
+        if not self.sounds_dir.exists():
+            return []
+        return sorted(p.stem for p in self.sounds_dir.glob('*.wav'))
+
+    def get(self, name: str) -> SoundBuffer:
+        """Decoded buffer for a sound, loading it on first use"""
+        buffer = self._buffers.get(name)
+        if buffer is None:
+            with self._lock:
+                buffer = self._buffers.get(name)
+                if buffer is None:
+                    with open(self.sounds_dir / f'{name}.wav', 'rb') as f:
+                        buffer = SoundBuffer(name, f.read())
+                    self._buffers[name] = buffer
+        return buffer
+
+    def preload(self, names):
+        """Decode sounds ahead of time so reminders never touch the disk"""
+        for name in names:
+            if name and name != self.NO_SOUND:
+                try:
+                    self.get(name)
+                except Exception as e:
+                    sound_log.warning("Failed to load sound %s: %s", name, e)
+
+    def _on_started(self, buffer: SoundBuffer, requested_at: float):
+        # Called just before the backend hands the cue to the audio API
+        self._latencies.append(time.perf_counter() - requested_at)
+        if len(self._latencies) > 100:
+            del self._latencies[:-100]
+
+    def play(self, name: str):
+        """Play a cue; silently does nothing for the "None" sound"""
+        if not name or name == self.NO_SOUND:
+            return
+        requested_at = time.perf_counter()
         try:
-            data = {
-                'today_pushups': self.today_pushups,
-                'total_pushups': self.total_pushups,
-                'streak_days': self.streak_days,
-                'last_completion': self.last_completion.isoformat() if self.last_completion else None
-            }
-            with open(stats_path, 'w') as f:
-                json.dump(data, f)
+            self.backend.play(self.get(name), requested_at, self._on_started)
         except Exception as e:
-            print(f"Failed to save statistics: {e}")
+            sound_log.warning("Failed to play sound %s: %s", name, e)
 
-    def reset_all(self):
-        """Reset all statistics"""
-        self.today_pushups = 0
-        self.total_pushups = 0
-        self.streak_days = 0
-        self.last_completion = None
-        self.save_stats()
+    def latency_stats(self) -> dict:
+        """Dispatch latency over the last 100 cues, in milliseconds.
+
+        This is the time from ``play()`` until the backend hands the cue to the
+        audio API (queueing and thread wakeup); the device's own output latency
+        is not included.
+        """
+        samples = sorted(self._latencies)
+        if not samples:
+            return {'count': 0}
+        return {
+            'count': len(samples),
+            'avg_ms': sum(samples) / len(samples) * 1000,
+            'p95_ms': samples[max(0, int(len(samples) * 0.95) - 1)] * 1000,
+            'max_ms': samples[-1] * 1000,
+        }
+
+    def close(self):
+        self.backend.close()
+
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mov', '.mkv', '.webm')
+
+def render_media_previews(source: str, cache_dir: str, sizes: tuple) -> dict:
+    """Generate PNG thumbnails of an image or video poster frame.
+
+    Runs in a worker process. Outputs are named after the SHA-256 of the
+    source file, so unchanged media is never decoded twice.
+    Returns a mapping of size -> thumbnail path.
+    """
+    source_path = Path(source)
+    file_hash = hashlib.sha256()
+    with open(source_path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            file_hash.update(block)
+    digest = file_hash.hexdigest()[:20]
+    outputs = {size: Path(cache_dir) / f'{digest}-{size}.png' for size in sizes}
+    if all(path.exists() for path in outputs.values()):
+        return {size: str(path) for size, path in outputs.items()}
+
+    if source_path.suffix.lower() in VIDEO_EXTENSIONS:
+        poster = None
+        for candidate in (source_path.with_suffix('.poster.png'), source_path.with_suffix('.poster.jpg')):
+            if candidate.exists():
+                poster = Image.open(candidate)
+                break
+        if poster is None:
+            import cv2  # optional, only needed for videos without a poster image
+            capture = cv2.VideoCapture(str(source_path))
+            ok, frame = capture.read()
+            capture.release()
+            if not ok:
+                raise ValueError(f"Could not read a frame from {source_path.name}")
+            poster = Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+        image = poster
+    else:
+        image = Image.open(source_path)
+        image.seek(0)  # first frame of animated images
+    image = image.convert('RGBA')
+
+    Path(cache_dir).mkdir(parents=True, exist_ok=True)
+    for size, path in sorted(outputs.items(), reverse=True):
+        thumb = image.copy()
+        thumb.thumbnail((size, size), Image.Resampling.LANCZOS)
+        tmp_path = path.with_suffix('.tmp')
+        thumb.save(tmp_path, format='PNG')
+        os.replace(tmp_path, path)
+        image = thumb  # downscale the next size from this one
+    return {size: str(path) for size, path in outputs.items()}
+
+class MediaPreviewCache:
+    """Exercise media previews generated off the Tk thread.
+
+    Decoding and resizing run in a process pool; results land in a
+    content-hashed PNG cache on disk. The Tk thread only loads the small
+    finished PNGs, keeping at most ``max_images`` PhotoImages cached; widgets
+    showing a preview keep their own reference, so eviction never blanks one.
+    """
+    SIZES = (48, 96, 192)
+
+    def __init__(self, root, cache_dir: Optional[Path] = None, max_images: int = 64, workers: int = 2):
+        self.root = root
+        self.cache_dir = cache_dir or Path.home() / '.pushup_reminder' / 'cache' / 'media'
+        self.max_images = max_images
+        self.workers = workers
+        self._pool = None
+        self._images = OrderedDict()  # (source, size) -> PhotoImage
+        self._thumbnails = {}  # source -> {size: png path}
+        self._pending = {}  # source -> Future
+        self._callbacks = {}  # source -> [(size, callback)]
+        self._polling = False
+
+    def _resolve(self, media: str) -> Optional[Path]:
+        if not media:
+            return None
+        path = Path(media)
+        if not path.is_absolute():
+            path = Path(__file__).parent / path
+        return path if path.exists() else None
+
+    def get(self, media: str, size: int, callback) -> Optional[ImageTk.PhotoImage]:
+        """Return a cached preview now, or None and call ``callback(photo)`` later"""
+        source = self._resolve(media)
+        if source is None:
+            return None
+        key = (str(source), size)
+        photo = self._images.get(key)
+        if photo is not None:
+            self._images.move_to_end(key)
+            return photo
+        if str(source) in self._thumbnails:
+            return self._load(key)
+
+        self._callbacks.setdefault(str(source), []).append((size, callback))
+        if str(source) not in self._pending:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            self._pending[str(source)] = self._pool.submit(
+                render_media_previews, str(source), str(self.cache_dir), self.SIZES
+            )
+        if not self._polling:
+            self._polling = True
+            self.root.after(50, self._poll)
+        return None
+
+    def _load(self, key: tuple) -> Optional[ImageTk.PhotoImage]:
+        source, size = key
+        path = self._thumbnails[source].get(size)
+        if not path:
+            return None
+        photo = ImageTk.PhotoImage(Image.open(path))
+        self._images[key] = photo
+        while len(self._images) > self.max_images:
+            self._images.popitem(last=False)
+        return photo
+
+    def _poll(self):
+        for source, future in list(self._pending.items()):
+            if not future.done():
+                continue
+            del self._pending[source]
+            callbacks = self._callbacks.pop(source, [])
+            try:
+                self._thumbnails[source] = {int(k): v for k, v in future.result().items()}
+            except Exception as e:
+                media_log.warning("Failed to generate preview for %s: %s", Path(source).name, e)
+                continue
+            for size, callback in callbacks:
+                photo = self._load((source, size))
+                if photo is not None:
+                    try:
+                        callback(photo)
+                    except tk.TclError:
+                        pass  # the widget was closed before its preview arrived
+        if self._pending:
+            self.root.after(50, self._poll)
+        else:
+            self._polling = False
+
+    def clear(self):
+        """Release all PhotoImages (e.g. when the picker closes)"""
+        self._images.clear()
+
+    def close(self):
+        self.clear()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+def downsample_lttb(points: list, threshold: int) -> list:
+    """Largest-Triangle-Three-Buckets downsampling of (x, y) points.
+
+    Keeps the first and last points and, from each of ``threshold - 2``
+    buckets, the point forming the largest triangle with its neighbours,
+    which preserves the visual shape of the series at a fraction of the points.
+    """
+    if threshold >= len(points) or threshold < 3:
+        return list(points)
+    sampled = [points[0]]
+    bucket_size = (len(points) - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        start = int(i * bucket_size) + 1
+        end = int((i + 1) * bucket_size) + 1
+        # Average of the next bucket is the third triangle vertex
+        next_start = end
+        next_end = min(int((i + 2) * bucket_size) + 1, len(points))
+        next_bucket = points[next_start:next_end] or [points[-1]]
+        avg_x = sum(p[0] for p in next_bucket) / len(next_bucket)
+        avg_y = sum(p[1] for p in next_bucket) / len(next_bucket)
+
+        ax, ay = points[a]
+        best_area = -1.0
+        best = start
+        for j in range(start, end):
+            x, y = points[j]
+            area = abs((ax - avg_x) * (y - ay) - (ax - x) * (avg_y - ay))
+            if area > best_area:
+                best_area = area
+                best = j
+        sampled.append(points[best])
+        a = best
+    sampled.append(points[-1])
+    return sampled
+
+def render_progress_chart(points: list, width: int, height: int, title: str = "",
+                          max_points: Optional[int] = None) -> Image.Image:
+    """Plot (date ordinal, pushups) points into a PIL image of the given pixel size.
+
+    Points are downsampled to ``max_points`` (default: the chart's pixel width)
+    before plotting. matplotlib is imported here, on first use, so it never
+    slows down startup.
+    """
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    if max_points is None:
+        max_points = width
+    if max_points:
+        points = downsample_lttb(points, max_points)
+    dpi = 100
+    figure = Figure(figsize=(width / dpi, height / dpi), dpi=dpi)
+    canvas = FigureCanvasAgg(figure)
+    axes = figure.add_subplot(111)
+    if points:
+        xs = [datetime.fromordinal(int(x)) for x, _ in points]
+        axes.fill_between(xs, [y for _, y in points], color="#4CAF50", alpha=0.3, linewidth=0)
+        axes.plot(xs, [y for _, y in points], color="#4CAF50", linewidth=1)
+        figure.autofmt_xdate(rotation=0, ha='center')
+    axes.set_title(title, fontsize=9)
+    axes.tick_params(labelsize=7)
+    axes.margins(x=0)
+    figure.tight_layout(pad=0.4)
+    canvas.draw()
+    return Image.frombuffer('RGBA', canvas.get_width_height(), canvas.buffer_rgba(), 'raw', 'RGBA', 0, 1).copy()
+
+def daily_series(totals: dict, days: Optional[int] = None) -> list:
+    """(date ordinal, pushups) for every day in range, with missing days as 0"""
+    today = datetime.now().date()
+    if days:
+        first = today - timedelta(days=days - 1)
+    elif totals:
+        first = datetime.strptime(min(totals), '%Y-%m-%d').date()
+    else:
+        first = today
+    series = []
+    day = first
+    while day <= today:
+        series.append((day.toordinal(), totals.get(day.isoformat(), 0)))
+        day += timedelta(days=1)
+    return series
+
+class TrayIconFrames:
+    """Precomputed tray icon frames for daily-goal progress and the countdown.
+
+    The outer ring shows goal progress in ``progress_steps`` steps and the
+    inner ring the share of the interval left in ``countdown_steps`` steps,
+    plus a "due now" frame with a red badge. All frames are rendered once at
+    startup; the tray only swaps images when the quantized state changes.
+    """
+    DUE = 'due'
+
+    def __init__(self, base_image: Image.Image, size: int = 64,
+                 progress_steps: int = 20, countdown_steps: int = 4):
+        self.size = size
+        self.progress_steps = progress_steps
+        self.countdown_steps = countdown_steps
+        logo = base_image.convert('RGBA')
+        inner = int(size * 0.56)
+        logo.thumbnail((inner, inner), Image.Resampling.LANCZOS)
+        self.base = Image.new('RGBA', (size, size), (0, 0, 0, 0))
+        offset = ((size - logo.width) // 2, (size - logo.height) // 2)
+        self.base.paste(logo, offset, logo)
+
+        self.frames = {}
+        for progress in range(progress_steps + 1):
+            for countdown in range(countdown_steps + 1):
+                self.frames[(progress, countdown)] = self._render(progress, countdown)
+            self.frames[(progress, None)] = self._render(progress, None)
+        self.frames[self.DUE] = self._render(progress_steps, None, due=True)
+
+    def _render(self, progress: int, countdown: Optional[int], due: bool = False) -> Image.Image:
+        image = self.base.copy()
+        draw = ImageDraw.Draw(image)
+        size = self.size
+        width = max(3, size // 10)
+        box = (width // 2, width // 2, size - width // 2 - 1, size - width // 2 - 1)
+        draw.arc(box, 0, 360, fill=(80, 80, 80, 160), width=width)
+        if progress:
+            color = (76, 175, 80, 255) if progress < self.progress_steps else (255, 193, 7, 255)
+            draw.arc(box, -90, -90 + 360 * progress / self.progress_steps, fill=color, width=width)
+        if countdown:
+            inset = width + max(2, width // 2)
+            inner_box = (inset, inset, size - inset - 1, size - inset - 1)
+            draw.arc(inner_box, -90, -90 + 360 * countdown / self.countdown_steps,
+                     fill=(33, 150, 243, 255), width=max(2, width // 2))
+        if due:
+            radius = size // 5
+            draw.ellipse((size - 2 * radius - 1, 0, size - 1, 2 * radius), fill=(244, 67, 54, 255))
+        return image
+
+    def key_for(self, goal_fraction: float, remaining_fraction: Optional[float], due: bool = False):
+        """Quantized state for the given goal progress and share of interval left"""
+        if due:
+            return self.DUE
+        progress = round(min(max(goal_fraction, 0.0), 1.0) * self.progress_steps)
+        if remaining_fraction is None:
+            return (progress, None)
+        countdown = math.ceil(min(max(remaining_fraction, 0.0), 1.0) * self.countdown_steps)
+        return (progress, countdown)
+
+    def frame(self, key) -> Image.Image:
+        return self.frames[key]
+
+class AnimationLibrary:
+    """Pre-rendered animation frames, built once per sprite and size.
+
+    PIL frames are rendered on first request and converted to PhotoImages
+    once; every animator showing the same animation shares them.
+    """
+
+    def __init__(self, assets_path: Optional[Path] = None):
+        self.assets_path = assets_path or Path(__file__).parent / 'assets' / 'icons'
+        self._frames = {}  # (name, size) -> [PhotoImage]
+
+    def _sprite(self, size: int) -> Image.Image:
+        path = self.assets_path / 'pushup.png'
+        if path.exists():
+            sprite = Image.open(path).convert('RGBA')
+        else:
+            sprite = Image.new('RGBA', (size, size), "#2196F3")
+        sprite.thumbnail((size, size), Image.Resampling.LANCZOS)
+        return sprite
+
+    def _render_pushup(self, size: int, count: int = 16) -> list:
+        """Sprite dipping down and back up, one push-up per loop"""
+        sprite = self._sprite(int(size * 0.8))
+        frames = []
+        travel = size - sprite.height
+        for i in range(count):
+            depth = (1 - math.cos(2 * math.pi * i / count)) / 2
+            frame = Image.new('RGBA', (size, size), (0, 0, 0, 0))
+            squash = sprite.resize((sprite.width, max(1, int(sprite.height * (1 - 0.15 * depth)))))
+            frame.paste(squash, ((size - squash.width) // 2, int(travel * depth) + sprite.height - squash.height), squash)
+            frames.append(frame)
+        return frames
+
+    def _render_pulse(self, size: int, count: int = 12) -> list:
+        """Ring that swells and fades, for the last seconds of the countdown"""
+        frames = []
+        center = size / 2
+        for i in range(count):
+            phase = i / count
+            frame = Image.new('RGBA', (size, size), (0, 0, 0, 0))
+            draw = ImageDraw.Draw(frame)
+            radius = size * (0.2 + 0.28 * phase)
+            alpha = int(255 * (1 - phase))
+            draw.ellipse(
+                (center - radius, center - radius, center + radius, center + radius),
+                outline=(33, 150, 243, alpha), width=max(2, size // 12)
+            )
+            draw.ellipse(
+                (center - size * 0.12, center - size * 0.12, center + size * 0.12, center + size * 0.12),
+                fill=(33, 150, 243, 255)
+            )
+            frames.append(frame)
+        return frames
+
+    def frames(self, name: str, size: int) -> list:
+        key = (name, size)
+        if key not in self._frames:
+            render = {'pushup': self._render_pushup, 'pulse': self._render_pulse}[name]
+            self._frames[key] = [ImageTk.PhotoImage(frame) for frame in render(size)]
+        return self._frames[key]
+
+    def clear(self):
+        self._frames.clear()
+
+class FrameAnimator:
+    """Plays pre-rendered frames on a Label from a single after() tick.
+
+    The frame shown is chosen from the time elapsed since start, so when the
+    Tk thread is busy late ticks skip straight to the current frame instead
+    of falling behind. Ticking stops entirely while the widget is not
+    viewable (e.g. the window is withdrawn to the tray) and resumes on <Map>.
+    """
+    # Process-wide instrumentation across all animators
+    totals = {'frames': 0, 'dropped': 0, 'cost_total': 0.0, 'cost_max': 0.0}
+    # Live animators per toplevel; each toplevel gets a single <Map> binding,
+    # so replaced animators (and their frames) are not kept alive by Tk
+    _by_toplevel = weakref.WeakKeyDictionary()
+
+    def __init__(self, label, frames: list, fps: int = 24, loop: bool = True):
+        self.label = label
+        self.frames = frames
+        self.fps = fps
+        self.loop = loop
+        self.running = False
+        self._job = None
+        self._started = 0.0
+        self._last_index = -1
+        self._paused_at = None
+        self.frames_shown = 0
+        self.frames_dropped = 0
+        self.cost_total = 0.0
+        self.cost_max = 0.0
+        toplevel = label.winfo_toplevel()
+        animators = self._by_toplevel.get(toplevel)
+        if animators is None:
+            animators = self._by_toplevel[toplevel] = weakref.WeakSet()
+            toplevel.bind('<Map>', lambda e: [a._resume() for a in list(animators)], add='+')
+        animators.add(self)
+
+    def start(self):
+        if self.running or not self.frames:
+            return
+        self.running = True
+        self._started = time.perf_counter()
+        self._last_index = -1
+        self._paused_at = None
+        self._tick()
+
+    def stop(self):
+        self.running = False
+        self._paused_at = None
+        if self._job:
+            try:
+                self.label.after_cancel(self._job)
+            except tk.TclError:
+                pass
+            self._job = None
+
+    def _resume(self):
+        if self.running and self._paused_at is not None:
+            # Continue where we left off instead of counting hidden time as dropped
+            self._started += time.perf_counter() - self._paused_at
+            self._paused_at = None
+            self._tick()
+
+    def _tick(self):
+        self._job = None
+        if not self.running:
+            return
+        try:
+            if not self.label.winfo_exists():
+                self.stop()
+                return
+            if not self.label.winfo_viewable():
+                self._paused_at = time.perf_counter()
+                return  # no ticks at all until the window is mapped again
+        except tk.TclError:
+            self.stop()
+            return
+
+        now = time.perf_counter()
+        index = int((now - self._started) * self.fps)
+        if not self.loop and index >= len(self.frames):
+            self.stop()
+            return
+        skipped = index - self._last_index - 1
+        if skipped > 0:
+            self.frames_dropped += skipped
+            self.totals['dropped'] += skipped
+        self._last_index = index
+
+        self.label.configure(image=self.frames[index % len(self.frames)])
+        cost = time.perf_counter() - now
+        self.frames_shown += 1
+        self.cost_total += cost
+        self.cost_max = max(self.cost_max, cost)
+        self.totals['frames'] += 1
+        self.totals['cost_total'] += cost
+        self.totals['cost_max'] = max(self.totals['cost_max'], cost)
+
+        # Aim for the next frame boundary rather than a fixed delay
+        next_due = self._started + (index + 1) / self.fps
+        delay = max(1, int((next_due - time.perf_counter()) * 1000))
+        self._job = self.label.after(delay, self._tick)
+
+    def stats(self) -> dict:
+        return {
+            'frames': self.frames_shown,
+            'dropped': self.frames_dropped,
+            'avg_cost_ms': self.cost_total / self.frames_shown * 1000 if self.frames_shown else 0.0,
+            'max_cost_ms': self.cost_max * 1000,
+        }
+
+    @classmethod
+    def instrumentation(cls) -> dict:
+        """Frames shown/dropped and per-frame cost over all animators"""
+        frames = cls.totals['frames']
+        return {
+            'frames': frames,
+            'dropped': cls.totals['dropped'],
+            'avg_cost_ms': cls.totals['cost_total'] / frames * 1000 if frames else 0.0,
+            'max_cost_ms': cls.totals['cost_max'] * 1000,
+        }
 
 class NotificationService:
-    def __init__(self, settings: AppSettings, stats: Statistics, root: ttk.Window, update_callback):
+    def __init__(self, settings: AppSettings, stats: Statistics, root: ttk.Window, update_callback,
+                 sound_engine: Optional[SoundEngine] = None,
+                 animations: Optional[AnimationLibrary] = None):
         self.settings = settings
         self.stats = stats
         self.root = root
         self.toaster = ToastNotifier()
         self.update_callback = update_callback
+        self.sound_engine = sound_engine
+        self.animations = animations
+        self.reminder_pending = False  # a completion dialog is waiting for an answer
+        self.on_transition = None  # called when reminder_pending changes
         pythoncom.CoInitialize()
     
     def notify_minimize(self, title: str, message: str):
@@ -166,16 +3595,55 @@ class NotificationService:
                 )
             
         except Exception as e:
-            print(f"Failed to send minimize notification: {e}")
+            notification_failures.inc(kind="minimize")
+            notify_log.error("Failed to send minimize notification: %s", e)
+
+    def notify_achievements(self, achievements: list):
+        """Toast newly unlocked achievements"""
+        try:
+            self.toaster.show_toast(
+                "Achievement Unlocked!",
+                "\n".join(a.title for a in achievements),
+                duration=5,
+                threaded=True
+            )
+        except Exception as e:
+            notification_failures.inc(kind="achievement")
+            notify_log.error("Failed to show achievement notification: %s", e)
+
+    def show_completion_dialog(self):
+        self.reminder_pending = True
+        CompletionDialog(
+            self.root,
+            self.settings.pushups,
+            self.stats,
+            self.update_callback,
+            self.settings.exercise_id,
+            on_close=self.reminder_answered,
+            animation_frames=(self.animations.frames('pushup', 96)
+                              if self.animations and self.settings.pushup_animation else None)
+        )
+
+    def reminder_answered(self):
+        """Called when a completion dialog is answered or dismissed"""
+        self.reminder_pending = False
+        if self.on_transition:
+            self.on_transition()
+        # The dialog was the only thing showing the frames if we're in the tray
+        if self.animations and self.root.state() == 'withdrawn':
+            self.animations.clear()
 
     def notify(self, title: str, message: str):
         """Send a Windows notification and show completion dialog"""
+        started = time.perf_counter()
         try:
             icon_path = str(Path(__file__).parent / 'assets' / 'icons' / 'logo.ico')
             if not Path(icon_path).exists():
                 icon_path = str(Path(__file__).parent / 'assets' / 'icons' / 'logo.png')
             
             # Play our custom notification sound first
+            if self.sound_engine:
+                self.sound_engine.play(self.settings.reminder_sound)
             self.toaster.show_toast(
                 title,
                 message,
@@ -184,14 +3652,14 @@ class NotificationService:
                 threaded=True
             )
             # Show completion dialog after notification
-            self.root.after(5000, lambda: CompletionDialog(
-                self.root,
-                self.settings.pushups,
-                self.stats,
-                self.update_callback
-            ))
+            self.reminder_pending = True
+            if self.on_transition:
+                self.on_transition()
+            self.root.after(5000, self.show_completion_dialog)
+            notification_dispatch_seconds.observe(time.perf_counter() - started)
         except Exception as e:
-            print(f"Failed to send notification: {e}")
+            notification_failures.inc(kind="reminder")
+            notify_log.error("Failed to send notification: %s", e)
             # Attempt to reinitialize COM and retry once
             try:
                 pythoncom.CoInitialize()
@@ -203,7 +3671,320 @@ class NotificationService:
                     threaded=True
                 )
             except Exception as retry_error:
-                print(f"Retry failed: {retry_error}")
+                notification_failures.inc(kind="reminder_retry")
+                notify_log.error("Notification retry failed: %s", retry_error)
+
+class CronRule:
+    """A compiled cron expression: ``minute hour day-of-month month day-of-week``.
+
+    Fields are stored as sorted lists so the next match is found by jumping
+    to the next allowed month/day/hour/minute with bisect, never by
+    stepping minute by minute.
+    """
+    DAY_NAMES = ('mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun')
+    MONTH_NAMES = ('jan', 'feb', 'mar', 'apr', 'may', 'jun',
+                   'jul', 'aug', 'sep', 'oct', 'nov', 'dec')
+
+    def __init__(self, expression: str):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron rule needs 5 fields: {expression}")
+        self.expression = expression
+        self.minutes = self._parse(fields[0], 0, 59)
+        self.hours = self._parse(fields[1], 0, 23)
+        self.days = self._parse(fields[2], 1, 31)
+        self.months = self._parse(fields[3], 1, 12, self.MONTH_NAMES, 1)
+        # cron counts Sunday as 0 (or 7); Python's weekday() has Monday as 0
+        cron_days = self._parse(fields[4], 0, 7, ('sun',) + self.DAY_NAMES[:6], 0)
+        self.weekdays = sorted({(d + 6) % 7 for d in cron_days})
+        self.any_day = fields[2] == '*'
+        self.any_weekday = fields[4] == '*'
+
+    @staticmethod
+    def _parse(field: str, low: int, high: int, names: tuple = (), name_base: int = 0) -> list:
+        values = set()
+        for part in field.lower().split(','):
+            step = 1
+            stepped = '/' in part
+            if stepped:
+                part, step_text = part.split('/', 1)
+                step = int(step_text)
+                if step <= 0:
+                    raise ValueError(f"Invalid cron step: {field}")
+            if part == '*':
+                start, end = low, high
+            else:
+                bounds = []
+                for token in part.split('-', 1):
+                    if token in names:
+                        bounds.append(names.index(token) + name_base)
+                    else:
+                        bounds.append(int(token))
+                start, end = bounds[0], bounds[-1]
+                if stepped and len(bounds) == 1:
+                    end = high  # 'n/step' means from n to the end of the range
+            if not low <= start <= end <= high:
+                raise ValueError(f"Cron field out of range: {field}")
+            values.update(range(start, end + 1, step))
+        return sorted(values)
+
+    def _day_matches(self, day: datetime) -> bool:
+        in_month = day.day in self.days
+        in_week = day.weekday() in self.weekdays
+        if self.any_day:
+            return in_week
+        if self.any_weekday:
+            return in_month
+        return in_month or in_week  # cron: either field may match
+
+    def next_after(self, after: datetime) -> Optional[datetime]:
+        """First matching minute strictly after ``after``"""
+        t = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = t + timedelta(days=366 * 5)
+        while t < limit:
+            if t.month not in self.months:
+                i = bisect.bisect_right(self.months, t.month)
+                if i < len(self.months):
+                    t = t.replace(month=self.months[i], day=1, hour=0, minute=0)
+                else:
+                    t = t.replace(year=t.year + 1, month=self.months[0], day=1, hour=0, minute=0)
+                continue
+            if not self._day_matches(t):
+                t = (t + timedelta(days=1)).replace(hour=0, minute=0)
+                continue
+            if t.hour not in self.hours:
+                i = bisect.bisect_right(self.hours, t.hour)
+                if i < len(self.hours):
+                    t = t.replace(hour=self.hours[i], minute=0)
+                else:
+                    t = (t + timedelta(days=1)).replace(hour=0, minute=0)
+                continue
+            if t.minute not in self.minutes:
+                i = bisect.bisect_right(self.minutes, t.minute)
+                if i < len(self.minutes):
+                    t = t.replace(minute=self.minutes[i])
+                else:
+                    t = t.replace(minute=0) + timedelta(hours=1)
+                continue
+            return t
+        return None
+
+class ReminderSchedule:
+    """A compiled reminder schedule.
+
+    The schedule text has one rule per line::
+
+        every 45m                  # fire at a fixed interval (default: the interval setting)
+        at 09:00,12:30 mon-fri     # fixed times on some days
+        cron */30 9-17 * * mon-fri # standard 5-field cron rule
+        dnd 22:00-07:00 daily      # Do Not Disturb window (may wrap midnight)
+        rest sat,sun               # rest days, no reminders at all
+
+    Exclusion windows (DND and rest days) repeat weekly, so they are compiled
+    into sorted, merged, non-overlapping intervals of minutes-into-the-week;
+    checking whether a time is excluded is a single bisect. Interval
+    reminders that land in a window fire when it ends; cron/at reminders
+    move to their next match after it.
+    """
+    WEEK_MINUTES = 7 * 24 * 60
+
+    def __init__(self, interval: Optional[int], rules: list, windows: list):
+        self.interval = interval
+        self.rules = rules
+        self.window_starts = [start for start, _ in windows]
+        self.window_ends = [end for _, end in windows]
+
+    @staticmethod
+    def _parse_duration(text: str) -> int:
+        match = re.fullmatch(r'(?:(\d+)h)?(?:(\d+)m)?(?:(\d+)s)?', text.lower())
+        if not text or not match or not any(match.groups()):
+            raise ValueError(f"Invalid duration: {text}")
+        hours, minutes, seconds = (int(g or 0) for g in match.groups())
+        return hours * 3600 + minutes * 60 + seconds
+
+    @staticmethod
+    def _parse_time(text: str) -> tuple:
+        match = re.fullmatch(r'(\d{1,2}):(\d{2})', text)
+        if not match or int(match.group(1)) > 23 or int(match.group(2)) > 59:
+            raise ValueError(f"Invalid time: {text}")
+        return int(match.group(1)), int(match.group(2))
+
+    @staticmethod
+    def _parse_days(text: str) -> list:
+        text = text.lower()
+        if text in ('', 'daily', 'everyday'):
+            return list(range(7))
+        if text == 'weekdays':
+            return list(range(5))
+        if text == 'weekends':
+            return [5, 6]
+        days = set()
+        for part in text.split(','):
+            bounds = part.split('-', 1)
+            try:
+                indexes = [CronRule.DAY_NAMES.index(b[:3]) for b in bounds]
+            except ValueError:
+                raise ValueError(f"Invalid days: {text}")
+            start, end = indexes[0], indexes[-1]
+            day = start
+            while True:
+                days.add(day)
+                if day == end:
+                    break
+                day = (day + 1) % 7
+        return sorted(days)
+
+    @classmethod
+    def _merge(cls, windows: list) -> list:
+        """Split windows at the week boundary and merge overlaps"""
+        pieces = []
+        for start, end in windows:
+            if end <= start:
+                end += cls.WEEK_MINUTES if end < start else 0
+            if end > cls.WEEK_MINUTES:
+                pieces.append((start, cls.WEEK_MINUTES))
+                pieces.append((0, end - cls.WEEK_MINUTES))
+            elif end > start:
+                pieces.append((start, end))
+        merged = []
+        for start, end in sorted(pieces):
+            if merged and start <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+            else:
+                merged.append((start, end))
+        return merged
+
+    @classmethod
+    def compile(cls, text: str, default_interval: int) -> 'ReminderSchedule':
+        """Parse schedule text. Results are cached per (text, interval)."""
+        return cls._compile(text or "", max(1, default_interval))
+
+    @classmethod
+    @functools.lru_cache(maxsize=16)
+    def _compile(cls, text: str, default_interval: int) -> 'ReminderSchedule':
+        interval = None
+        rules = []
+        windows = []
+        for number, raw_line in enumerate(text.splitlines(), start=1):
+            line = raw_line.split('#', 1)[0].strip()
+            if not line:
+                continue
+            keyword, _, rest = line.partition(' ')
+            keyword = keyword.lower()
+            rest = rest.strip()
+            try:
+                if keyword == 'every':
+                    interval = cls._parse_duration(rest)
+                elif keyword == 'cron':
+                    rules.append(CronRule(rest))
+                elif keyword == 'at':
+                    times_text, _, days_text = rest.partition(' ')
+                    times = [cls._parse_time(t) for t in times_text.split(',')]
+                    cron_days = ','.join(str((d + 1) % 7) for d in cls._parse_days(days_text.strip()))
+                    for hour, minute in times:
+                        rules.append(CronRule(f"{minute} {hour} * * {cron_days}"))
+                elif keyword == 'dnd':
+                    span, _, days_text = rest.partition(' ')
+                    start_text, _, end_text = span.partition('-')
+                    start_h, start_m = cls._parse_time(start_text)
+                    end_h, end_m = cls._parse_time(end_text)
+                    length = (end_h * 60 + end_m - start_h * 60 - start_m) % (24 * 60) or 24 * 60
+                    for day in cls._parse_days(days_text.strip()):
+                        start = day * 24 * 60 + start_h * 60 + start_m
+                        windows.append((start, start + length))
+                elif keyword == 'rest':
+                    for day in cls._parse_days(rest):
+                        windows.append((day * 24 * 60, (day + 1) * 24 * 60))
+                else:
+                    raise ValueError(f"Unknown rule '{keyword}'")
+            except ValueError as e:
+                raise ValueError(f"Line {number}: {e}")
+        if interval is None and not rules:
+            interval = default_interval
+        return cls(interval, rules, cls._merge(windows))
+
+    def _week_minute(self, t: datetime) -> float:
+        return t.weekday() * 24 * 60 + t.hour * 60 + t.minute + t.second / 60
+
+    def exclusion_end(self, t: datetime) -> Optional[datetime]:
+        """End of the DND/rest window containing t, or None if t is allowed"""
+        if not self.window_starts:
+            return None
+        minute = self._week_minute(t)
+        i = bisect.bisect_right(self.window_starts, minute) - 1
+        if i < 0 or minute >= self.window_ends[i]:
+            return None
+        end = t.replace(second=0, microsecond=0) + timedelta(minutes=self.window_ends[i] - int(minute))
+        # A window ending at the week boundary may continue into next week's first one
+        if self.window_ends[i] == self.WEEK_MINUTES and self.window_starts[0] == 0:
+            end += timedelta(minutes=self.window_ends[0])
+        return end
+
+    def next_fire(self, after: datetime, last_fire: Optional[datetime] = None) -> Optional[datetime]:
+        """Next reminder time after ``after`` (interval counted from ``last_fire``)"""
+        candidates = []
+        if self.interval:
+            base = last_fire or after
+            candidates.append(max(base + timedelta(seconds=self.interval), after))
+        for rule in self.rules:
+            match = rule.next_after(after)
+            if match:
+                candidates.append(match)
+        # Each pass either returns or jumps past a whole merged window, so the
+        # loop is bounded by the number of windows a week (plus one wrap)
+        for _ in range(2 * len(self.window_starts) + 2):
+            if not candidates:
+                return None
+            candidate = min(candidates)
+            blocked_until = self.exclusion_end(candidate)
+            if blocked_until is None:
+                return candidate
+            candidates = []
+            if self.interval:
+                candidates.append(blocked_until)
+            for rule in self.rules:
+                match = rule.next_after(blocked_until - timedelta(minutes=1))
+                if match:
+                    candidates.append(match)
+        return None
+
+class SessionState:
+    """Scheduler state checkpointed to ``session.json``.
+
+    Saved on every transition (start, stop, reminder, snooze, dialog
+    answered) so a crash, update restart or reboot resumes the schedule
+    instead of restarting it. Each save is one small atomic write
+    (temp file + os.replace); restoring is a single read.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = path or Path.home() / '.pushup_reminder' / 'session.json'
+        self._lock = threading.Lock()
+
+    def save(self, state: dict):
+        record = seal_record(dict(state, saved_at=time.time()))
+        with self._lock:
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = self.path.with_suffix('.json.tmp')
+                with open(tmp_path, 'w') as f:
+                    json.dump(record, f)
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                scheduler_log.error("Failed to save session state: %s", e)
+
+    def load(self) -> Optional[dict]:
+        try:
+            with open(self.path, 'r') as f:
+                state = json.load(f)
+            if not verify_record(state, required=True):
+                raise ValueError("checksum mismatch")
+            return state
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            scheduler_log.warning("Ignoring unreadable session state: %s", e)
+            return None
 
 class ReminderService:
     def __init__(self, settings: AppSettings, notification_service: NotificationService):
@@ -212,56 +3993,120 @@ class ReminderService:
         self.running = False
         self.thread = None
         self.last_reminder = None
-        self.notification_shown = False
+        self.next_deadline = None
+        self.snoozed = False
+        self._schedule_key = None
+        self.on_transition = None  # called after every state change, to checkpoint it
     
+    def _changed(self):
+        if self.on_transition:
+            self.on_transition()
+
+    def get_schedule(self) -> ReminderSchedule:
+        """Compiled schedule for the current settings (cached by ReminderSchedule)"""
+        return ReminderSchedule.compile(self.settings.custom_schedule, self.get_interval())
+
+    def _plan_next(self, now: float):
+        """Recompute the next deadline from the compiled schedule"""
+        schedule = self.get_schedule()
+        self._schedule_key = (self.settings.custom_schedule, self.get_interval())
+        last = datetime.fromtimestamp(self.last_reminder) if self.last_reminder else None
+        next_fire = schedule.next_fire(datetime.fromtimestamp(now), last)
+        self.next_deadline = next_fire.timestamp() if next_fire else None
+        self.snoozed = False
+        self._changed()
+
     def _reminder_loop(self):
         """Main reminder loop"""
         while self.running:
-            total_seconds = (self.settings.interval_hours * 3600 +
-                           self.settings.interval_minutes * 60 +
-                           self.settings.interval_seconds)
-            
-            # Check if it's time for notification
             current_time = time.time()
-            if self.last_reminder is None or (current_time - self.last_reminder) >= total_seconds:
-                if not self.notification_shown:  # Only show if not already shown
-                    self.last_reminder = current_time
-                    self.notification_shown = True
-                    self.notification_service.notify(
-                        "Time for Push-ups!",
-                        f"Do {self.settings.pushups} push-ups now!"
-                    )
-            # Reset notification_shown flag when the interval is complete
-            elif self.notification_shown and (current_time - self.last_reminder) < total_seconds * 0.1:  # Reset in first 10% of new interval
-                self.notification_shown = False
+            scheduler_wakeups.inc()
+            # Only recompute when the schedule changes or the deadline passes;
+            # every other tick is a float comparison
+            if self._schedule_key != (self.settings.custom_schedule, self.get_interval()):
+                try:
+                    self._plan_next(current_time)
+                except ValueError as e:
+                    scheduler_log.error("Invalid reminder schedule: %s", e)
+                    self._schedule_key = (self.settings.custom_schedule, self.get_interval())
+                    self.next_deadline = None
+            elif self.next_deadline is not None and current_time >= self.next_deadline:
+                scheduler_fires.inc()
+                scheduler_fire_lag.observe(current_time - self.next_deadline)
+                self.last_reminder = current_time
+                self.notification_service.notify(
+                    "Time for Push-ups!",
+                    f"Do {self.settings.pushups} push-ups now!"
+                )
+                self._plan_next(current_time)
             
             time.sleep(1)  # Check every second instead of waiting full interval
     
     def start(self):
         """Start the reminder service"""
         self.running = True
-        self.notification_shown = False  # Reset flag when starting
         self.last_reminder = time.time()  # Initialize last reminder time
+        self._schedule_key = None  # Plan the first deadline on the first tick
+        try:
+            self._plan_next(self.last_reminder)
+        except ValueError as e:
+            scheduler_log.error("Invalid reminder schedule: %s", e)
+        self.thread = threading.Thread(target=self._reminder_loop, daemon=True)
+        self.thread.start()
+
+    def resume(self, last_reminder: float, next_deadline: Optional[float], snoozed: bool = False):
+        """Start again from checkpointed state instead of from zero"""
+        self.running = True
+        self.last_reminder = last_reminder
+        self.next_deadline = next_deadline
+        self.snoozed = snoozed
+        self._schedule_key = (self.settings.custom_schedule, self.get_interval())
+        if next_deadline is None:
+            self._schedule_key = None  # plan on the first tick
+        self._changed()
         self.thread = threading.Thread(target=self._reminder_loop, daemon=True)
         self.thread.start()
     
+    def snooze(self, seconds: int):
+        """Push the next reminder to ``seconds`` from now"""
+        if not self.running:
+            return
+        self.next_deadline = time.time() + seconds
+        self.snoozed = True
+        self._changed()
+
+    def get_interval(self) -> int:
+        return (self.settings.interval_hours * 3600 +
+                self.settings.interval_minutes * 60 +
+                self.settings.interval_seconds)
+
+    def get_period(self) -> int:
+        """Length of the current wait, from the last reminder to the next one"""
+        if not self.running or not self.last_reminder or self.next_deadline is None:
+            return 0
+        return max(1, int(self.next_deadline - self.last_reminder))
+    
     def stop(self):
         """Stop the reminder service"""
         self.running = False
-        self.notification_shown = False  # Reset flag when stopping
+        self.next_deadline = None
+        self._changed()
         if self.thread:
             self.thread.join(timeout=1.0)
+
+    def state(self) -> dict:
+        return {
+            'running': self.running,
+            'last_reminder': self.last_reminder,
+            'next_deadline': self.next_deadline,
+            'snoozed': self.snoozed,
+        }
     
     def get_remaining_time(self) -> int:
         """Get remaining time until next reminder in seconds"""
-        if not self.running or not self.last_reminder:
+        if not self.running or self.next_deadline is None:
             return 0
-        interval = (self.settings.interval_hours * 3600 +
-                   self.settings.interval_minutes * 60 +
-                   self.settings.interval_seconds)
-        elapsed = time.time() - self.last_reminder
-        remaining = max(0, interval - int(elapsed))
-        return remaining
+        return max(0, int(self.next_deadline - time.time()))
 
 class UpdateService:
     def __init__(self, current_version: str):
@@ -273,6 +4118,7 @@ class UpdateService:
     def check_for_updates(self) -> tuple[bool, Optional[str], Optional[str]]:
         """Check if updates are available
         Returns: (update_available, version, download_url)"""
+        outcome = "error"
         try:
             headers = {'Accept': 'application/vnd.github.v3+json'}
             response = requests.get(self.github_api, headers=headers, timeout=10)
@@ -295,16 +4141,20 @@ class UpdateService:
             try:
                 has_update = version.parse(latest_version) > version.parse(self.current_version)
             except version.InvalidVersion:
-                print(f"Invalid version format: current={self.current_version}, latest={latest_version}")
+                update_log.warning("Invalid version format: current=%s, latest=%s", self.current_version, latest_version)
+                outcome = "invalid_version"
                 raise ValueError("Invalid version format")
             
+            update_checks.inc(outcome="available" if has_update else "current")
             return has_update, latest_version, download_url
             
         except requests.RequestException as e:
-            print(f"Network error checking for updates: {e}")
+            update_checks.inc(outcome="network_error")
+            update_log.warning("Network error checking for updates: %s", e)
             raise ConnectionError("Failed to connect to update server")
         except Exception as e:
-            print(f"Error checking for updates: {e}")
+            update_checks.inc(outcome=outcome)
+            update_log.error("Error checking for updates: %s", e)
             raise
 
 class ModernPushupApp:
@@ -328,27 +4178,68 @@ class ModernPushupApp:
             if icon_path.exists():
                 self.root.iconbitmap(str(icon_path))
         except Exception as e:
-            print(f"Failed to set window icon: {e}")
+            ui_log.warning("Failed to set window icon: %s", e)
             
         self.root.position_center()
         
-        # Initialize statistics first
-        self.stats = Statistics()
+        # Initialize statistics first
+        self.stats = Statistics(self.settings.profile)
+        # Rankings of every profile; only history newer than leaderboard.json is replayed
+        try:
+            leaderboard = Leaderboard(self.stats.history)
+            leaderboard.refresh()
+            self.stats.leaderboard = leaderboard
+        except Exception as e:
+            stats_log.error("Failed to load the leaderboard: %s", e)
+        self.catalog = ExerciseCatalog.default()
+        self.media_cache = MediaPreviewCache(self.root)
+        # Verify data written since the last clean exit, then roll finished
+        # months into compressed segments, without blocking startup
+        self.integrity_verifier = IntegrityVerifier()
+        threading.Thread(target=self.check_data_files, daemon=True).start()
+        
+        # Periodic low-priority backups of settings, stats and history
+        self.backup_service = BackupService(keep=self.settings.backup_keep)
+        if self.settings.auto_backup:
+            self.backup_service.start_scheduler(self.settings.backup_interval_hours)
+        
+        # Exchange new sets with the user's other machines
+        self.sync_server = None
+        self.sync_stop = threading.Event()
+        self.start_sync()
+        
+        # Opt-in Prometheus metrics for local monitoring
+        self.metrics_exporter = None
+        self.start_metrics()
         
         # Setup all required variables and resources first
         self.setup_variables()
         self.setup_placeholder_images()
         self.setup_animations()
         
+        # Decode the reminder sound now so reminders never wait on disk
+        self.sound_engine = SoundEngine()
+        self.sound_engine.preload([self.settings.reminder_sound])
+        
         # Initialize services with stats
-        self.notification_service = NotificationService(self.settings, self.stats, self.root, self.update_statistics)
+        self.notification_service = NotificationService(
+            self.settings, self.stats, self.root, self.update_statistics, self.sound_engine,
+            self.animations
+        )
         self.reminder_service = ReminderService(self.settings, self.notification_service)
         
         # Create GUI after all resources are initialized
         self.create_gui()
         
+        # Resume the schedule (and any unanswered reminder) from the last run
+        self.session = SessionState()
+        self.restore_session()
+        self.reminder_service.on_transition = self.checkpoint_session
+        self.notification_service.on_transition = self.checkpoint_session
+        
         # Bind the close button event
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
+        self.root.bind("<Map>", self.on_root_map, add="+")
         
         # Setup system tray icon
         self.setup_tray_icon()
@@ -362,19 +4253,38 @@ class ModernPushupApp:
         else:
             # Create a simple colored square if icon doesn't exist
             icon_image = Image.new('RGB', (64, 64), '#4CAF50')
+        # Render every progress/countdown frame once; update_tray_icon only swaps them
+        self.tray_frames = TrayIconFrames(icon_image)
+        self.tray_state = self.tray_state_key()
+        icon_image = self.tray_frames.frame(self.tray_state)
         
         def restore_window(icon, item):
             self.root.deiconify()  # Restore the window
             self.root.lift()  # Bring to front
         
+        # Quick actions run on the Tk thread but never open a window
+        def log_set(icon, item):
+            self.root.after(0, self.log_set)
+        
+        def snooze(icon, item):
+            self.root.after(0, lambda: self.reminder_service.snooze(10 * 60))
+        
+        def toggle_pause(icon, item):
+            self.root.after(0, lambda: self.set_reminder_running(not self.is_running))
+        
         def exit_app(icon, item):
             icon.stop()  # Stop the tray icon
-            self.reminder_service.stop()  # Stop reminders
+            self.shutdown_services()
             self.root.destroy()  # Close the app
         
         # Create tray icon menu
         menu = (
-            pystray.MenuItem("Open", restore_window),
+            pystray.MenuItem("Open", restore_window, default=True),
+            pystray.MenuItem(lambda item: f"Log a Set ({self.settings.pushups})", log_set),
+            pystray.MenuItem("Snooze 10 Minutes", snooze, enabled=lambda item: self.is_running),
+            pystray.MenuItem(lambda item: "Resume Reminders" if not self.is_running else "Pause Reminders",
+                             toggle_pause),
+            pystray.Menu.SEPARATOR,
             pystray.MenuItem("Exit", exit_app)
         )
         
@@ -387,6 +4297,54 @@ class ModernPushupApp:
         # Run tray icon in separate thread
         threading.Thread(target=self.tray_icon.run, daemon=True).start()
         
+    def tray_state_key(self):
+        """Quantized tray icon state for the current progress and countdown"""
+        goal_fraction = self.stats.today_pushups / max(1, self.settings.daily_goal)
+        remaining_fraction = None
+        if self.reminder_service.running:
+            period = self.reminder_service.get_period()
+            if period:
+                remaining_fraction = min(1.0, self.reminder_service.get_remaining_time() / period)
+        return self.tray_frames.key_for(
+            goal_fraction, remaining_fraction, self.notification_service.reminder_pending
+        )
+        
+    def update_tray_icon(self):
+        """Swap the tray image, but only when the quantized state changed"""
+        if not hasattr(self, 'tray_frames'):
+            return
+        state = self.tray_state_key()
+        if state != self.tray_state:
+            self.tray_state = state
+            self.tray_icon.icon = self.tray_frames.frame(state)
+        title = f"Pushup Reminder - {self.stats.today_pushups}/{self.settings.daily_goal} today"
+        if self.tray_icon.title != title:
+            self.tray_icon.title = title
+        
+    def log_set(self):
+        """Record a full set without opening the completion dialog"""
+        self.stats.add_pushups(self.settings.pushups, self.settings.exercise_id)
+        self.update_statistics()
+        
+    def release_hidden_resources(self):
+        """Free images nobody can see while the window sits in the tray.
+
+        They are rebuilt on demand: the chart when the window is mapped
+        again, animation frames the next time an animation starts.
+        """
+        if self.countdown_animator:
+            self.countdown_animator.stop()
+            self.countdown_animator = None
+        self.animation_running = False
+        self.countdown_anim_label.configure(image='')
+        self.animations.clear()
+        self.media_cache.clear()
+        self.progress_chart.release()
+
+    def on_root_map(self, event):
+        if event.widget is self.root:
+            self.progress_chart.refresh()
+
     def on_closing(self):
         """Handle window close button click"""
         response = messagebox.askyesno(
@@ -397,6 +4355,7 @@ class ModernPushupApp:
         # Stop any running reminders
         if response:  # Yes clicked - minimize
             self.root.withdraw()  # Hide the window
+            self.release_hidden_resources()
             # Show notification that app is minimized WITHOUT showing completion dialog
             self.notification_service.notify_minimize(
                 "Pushup Reminder",
@@ -404,11 +4363,93 @@ class ModernPushupApp:
             )
         else:  # No clicked - exit
             if messagebox.askokcancel("Confirm Exit", "Are you sure you want to exit?"):
-                self.reminder_service.stop()  # Stop any running reminders
+                self.shutdown_services()
                 if hasattr(self, 'tray_icon'):
                     self.tray_icon.stop()  # Stop the tray icon if it exists
                 self.root.destroy()  # Close the application
         
+    def check_data_files(self):
+        """Startup integrity check followed by history archiving (background thread)"""
+        try:
+            self.integrity_verifier.startup_check()
+        except Exception as e:
+            integrity_log.error("Integrity check failed: %s", e)
+        self.stats.history.archive_completed_months()
+        
+    def shutdown_services(self):
+        """Stop background services and record a clean shutdown"""
+        # Keep the checkpoint saying "running" so the next start resumes
+        self.checkpoint_session()
+        self.reminder_service.on_transition = None
+        self.notification_service.on_transition = None
+        self.reminder_service.stop()  # Stop any running reminders
+        self.backup_service.stop_scheduler()
+        self.sync_stop.set()
+        if self.sync_server:
+            self.sync_server.stop()
+        if self.metrics_exporter:
+            self.metrics_exporter.stop()
+        self.sound_engine.close()
+        self.media_cache.close()
+        self.progress_chart.close()
+        self.integrity_verifier.mark_clean_shutdown()
+        
+    def start_sync(self):
+        """Accept sync connections and/or sync with peers periodically"""
+        if not (self.settings.sync_port or self.settings.sync_peers.strip()):
+            return
+        if not self.settings.sync_secret:
+            sync_log.error("Sync is configured but sync_secret is empty; not syncing")
+            return
+        self.stats.enable_sync(self.settings.sync_secret)
+        if self.settings.sync_port:
+            self.sync_server = SyncServer(self.stats.sync, port=self.settings.sync_port,
+                                          on_events=self.on_synced_events)
+            try:
+                self.sync_server.start()
+            except OSError as e:
+                sync_log.error("Failed to start sync server on port %d: %s", self.settings.sync_port, e)
+                self.sync_server = None
+        if self.settings.sync_peers.strip():
+            threading.Thread(target=self.sync_peers_loop, daemon=True).start()
+
+    def start_metrics(self):
+        """Serve and/or write metrics if enabled in the settings"""
+        if not (self.settings.metrics_port or self.settings.metrics_textfile):
+            return
+        self.metrics_exporter = MetricsExporter(
+            METRICS,
+            port=self.settings.metrics_port or None,
+            textfile=self.settings.metrics_textfile,
+            interval=max(1, self.settings.metrics_interval_seconds)
+        )
+        try:
+            self.metrics_exporter.start()
+        except OSError as e:
+            metrics_log.error("Failed to start metrics exporter: %s", e)
+            self.metrics_exporter = None
+
+    def sync_peers_loop(self):
+        while not self.sync_stop.is_set():
+            for peer in self.settings.sync_peers.split(','):
+                host, _, port = peer.strip().partition(':')
+                if not host:
+                    continue
+                try:
+                    report = self.stats.sync.sync_with(host, int(port or SyncStore.DEFAULT_PORT))
+                    if report['received']:
+                        self.on_synced_events(report['received'])
+                except Exception as e:
+                    sync_log.warning("Sync with %s failed: %s", peer.strip(), e)
+            self.sync_stop.wait(max(1, self.settings.sync_interval_minutes) * 60)
+
+    def on_synced_events(self, events: list):
+        """Called from sync threads; counters are updated on the Tk thread"""
+        def merge():
+            self.stats.merge_remote(events)
+            self.update_statistics()
+        self.root.after(0, merge)
+
     def setup_variables(self):
         self.pushups_var = tk.IntVar(value=self.settings.pushups)
         self.progress_var = tk.DoubleVar(value=0)
@@ -453,7 +4494,7 @@ class ModernPushupApp:
                 # Convert to PhotoImage
                 self.images[name] = ImageTk.PhotoImage(img)
             except Exception as e:
-                print(f"Failed to load image {filename}: {e}")
+                ui_log.warning("Failed to load image %s: %s", filename, e)
                 # Create placeholder on error
                 size = (64, 64) if name == "logo" else (24, 24)
                 img = Image.new('RGBA', size, "#808080")  # Gray placeholder with alpha
@@ -553,6 +4594,14 @@ class ModernPushupApp:
         )
         self.streak_label.pack(anchor=tk.W, pady=5)
         
+        # Personal bests
+        self.best_label = ttk.Label(
+            stats_frame,
+            text=self.personal_bests_text(),
+            font=("Segoe UI", 12)
+        )
+        self.best_label.pack(anchor=tk.W, pady=5)
+        
         # Last completion
         self.last_completion_label = ttk.Label(
             stats_frame,
@@ -585,6 +4634,23 @@ class ModernPushupApp:
             command=reset_stats
         ).pack(side=tk.RIGHT)
         
+        ttk.Button(
+            reset_frame,
+            text="Export...",
+            style="info.TButton",
+            command=self.export_statistics
+        ).pack(side=tk.LEFT)
+        
+        ttk.Button(
+            reset_frame,
+            text="Calendar",
+            style="info.TButton",
+            command=lambda: CalendarWindow(self.root, self.stats, self.settings.daily_goal)
+        ).pack(side=tk.LEFT, padx=(5, 0))
+        
+        # Progress chart, rendered in the background
+        self.progress_chart = ProgressChart(self.right_panel, self.root, self.stats)
+        
     def create_footer(self):
         footer = ttk.Frame(self.main_container)
         footer.pack(fill=tk.X, pady=(20, 0))
@@ -618,6 +4684,8 @@ class ModernPushupApp:
         
     def setup_animations(self):
         self.animation_running = False
+        self.animations = AnimationLibrary()
+        self.countdown_animator = None
         
     def toggle_reminder(self):
         if not self.is_running:
@@ -626,24 +4694,134 @@ class ModernPushupApp:
                 if pushups <= 0:
                     messagebox.showerror("Error", "Number of pushups must be greater than 0!")
                     return
-                self.reminder_service.start()
-                self.is_running = True
-                self.toggle_btn.configure(
-                    text="Stop Reminder",
-                    style="danger.TButton"
-                )
-                self.status_label.configure(text="Reminder is running...")
+                self.set_reminder_running(True)
             except ValueError:
                 messagebox.showerror("Error", "Please enter valid numbers!")
+        else:
+            self.set_reminder_running(False)
+            
+    def checkpoint_session(self):
+        state = self.reminder_service.state()
+        state['pending_reminder'] = self.notification_service.reminder_pending
+        self.session.save(state)
+
+    def restore_session(self):
+        """Apply the last checkpoint, catching up on reminders missed while closed"""
+        state = self.session.load()
+        if not state:
+            return
+        now = time.time()
+        pending = state.get('pending_reminder', False)
+        if state.get('running'):
+            last_reminder = state.get('last_reminder') or now
+            deadline = state.get('next_deadline')
+            if deadline is not None and deadline <= now:
+                missed_for = now - deadline
+                if self.settings.catch_up_policy == "skip":
+                    # Wait a full period from now, as if freshly started
+                    last_reminder, deadline = now, None
+                else:
+                    # All missed reminders collapse into one, right away
+                    deadline = now
+                    pending = False  # the catch-up reminder replaces the old dialog
+                ui_log.info("Missed reminder %.0f s ago while closed, policy %s",
+                            missed_for, self.settings.catch_up_policy)
+            self.set_reminder_running(True, resume=(last_reminder, deadline, state.get('snoozed', False)))
+        if pending:
+            self.root.after(1000, self.notification_service.show_completion_dialog)
+
+    def set_reminder_running(self, running: bool, resume: Optional[tuple] = None):
+        """Start or stop reminders and update the controls (no dialogs).
+
+        ``resume`` is (last_reminder, next_deadline, snoozed) from a checkpoint.
+        """
+        if running == self.is_running:
+            return
+        if running:
+            if resume:
+                self.reminder_service.resume(*resume)
+            else:
+                self.reminder_service.start()
+            self.toggle_btn.configure(
+                text="Stop Reminder",
+                style="danger.TButton"
+            )
+            self.status_label.configure(text="Reminder is running...")
         else:
             self.reminder_service.stop()
-            self.is_running = False
             self.toggle_btn.configure(
                 text="Start Reminder",
                 style="success.TButton"
             )
             self.status_label.configure(text="Reminder stopped")
+        self.is_running = running
+        if hasattr(self, 'tray_icon'):
+            self.tray_icon.update_menu()
             
+    def export_statistics(self):
+        """Export workout history in the background with a progress window"""
+        path = filedialog.asksaveasfilename(
+            parent=self.root,
+            title="Export Statistics",
+            defaultextension=".csv",
+            filetypes=[("CSV", "*.csv"), ("JSON Lines", "*.jsonl")]
+        )
+        if not path:
+            return
+        fmt = 'jsonl' if path.lower().endswith('.jsonl') else 'csv'
+        
+        window = ttk.Toplevel(self.root)
+        window.title("Exporting...")
+        window.geometry("300x100")
+        window.resizable(False, False)
+        status = ttk.Label(window, text="Exporting statistics...")
+        status.pack(pady=(15, 5))
+        bar = ttk.Progressbar(window, length=250, mode='determinate')
+        bar.pack()
+        
+        # The worker thread only writes here; the Tk thread polls it
+        state = {'rows': 0, 'fraction': 0.0, 'done': False, 'error': None}
+        
+        def on_progress(rows, fraction):
+            state['rows'] = rows
+            state['fraction'] = fraction
+        
+        def worker():
+            try:
+                StatisticsExporter(self.stats).export(
+                    path, fmt, profile=self.settings.profile, progress=on_progress
+                )
+            except Exception as e:
+                state['error'] = e
+            finally:
+                state['done'] = True
+        
+        def poll():
+            if not window.winfo_exists():
+                return
+            bar.configure(value=state['fraction'] * 100)
+            status.configure(text=f"Exported {state['rows']} rows...")
+            if not state['done']:
+                window.after(100, poll)
+                return
+            window.destroy()
+            if state['error']:
+                messagebox.showerror("Export Failed", f"Failed to export statistics: {state['error']}")
+            else:
+                messagebox.showinfo("Export Complete", f"Exported {state['rows']} rows to {path}")
+        
+        threading.Thread(target=worker, daemon=True).start()
+        poll()
+        
+    def open_exercise_picker(self):
+        ExercisePickerDialog(self)
+        
+    def select_exercise(self, exercise: Exercise):
+        """Make an exercise the current one and remember it for next time"""
+        self.settings.exercise_id = exercise.id
+        self.settings.save()
+        self.exercise_label.configure(text=f"Exercise: {exercise.name}")
+        
     def open_settings(self):
         # Pass self instead of self.root to provide access to update_service
         SettingsWindow(self, self.settings)
@@ -678,6 +4856,10 @@ class ModernPushupApp:
         self.streak_label.configure(
             text=f"Current Streak: {self.stats.streak_days} days"
         )
+        self.best_label.configure(text=self.personal_bests_text())
+        if self.stats.new_achievements:
+            self.notification_service.notify_achievements(self.stats.new_achievements)
+            self.stats.new_achievements = []
         
         # Update last completion
         if self.stats.last_completion:
@@ -685,6 +4867,12 @@ class ModernPushupApp:
             self.last_completion_label.configure(
                 text=f"Last Completed: {last_time}"
             )
+        
+        self.progress_chart.refresh()
+
+    def personal_bests_text(self) -> str:
+        bests = self.stats.achievements.personal_bests()
+        return f"Best Set: {bests['best_set']}  |  Best Day: {bests['best_day']}"
 
     def create_left_panel(self, content):
         left_panel = ttk.Frame(content)
@@ -709,6 +4897,21 @@ class ModernPushupApp:
         )
         pushup_entry.pack(pady=10)
         
+        # Current exercise and picker
+        exercise = self.catalog.get(self.settings.exercise_id)
+        self.exercise_label = ttk.Label(
+            counter_frame,
+            text=f"Exercise: {exercise.name if exercise else 'Push-ups'}",
+            font=("Segoe UI", 10)
+        )
+        self.exercise_label.pack()
+        ttk.Button(
+            counter_frame,
+            text="Choose Exercise",
+            style="Outline.TButton",
+            command=self.open_exercise_picker
+        ).pack(pady=(5, 0))
+        
         # Start/Stop button
         self.toggle_btn = ttk.Button(
             left_panel,
@@ -727,10 +4930,39 @@ class ModernPushupApp:
         )
         self.countdown_label.pack(pady=(5, 0))
         
+        # Pulses during the last seconds before a reminder
+        self.countdown_anim_label = ttk.Label(left_panel)
+        self.countdown_anim_label.pack(pady=(5, 0))
+        
+        self.countdown_due = None  # when the next once-a-second tick should run
         self.update_countdown()
         
+    def update_countdown_animation(self):
+        """Run the countdown pulse only in the final seconds before a reminder"""
+        due_soon = (
+            self.settings.pushup_animation
+            and hasattr(self, 'reminder_service')
+            and self.reminder_service.running
+            and self.reminder_service.get_remaining_time() <= 10
+        )
+        if due_soon and not self.animation_running:
+            if self.countdown_animator is None:
+                self.countdown_animator = FrameAnimator(
+                    self.countdown_anim_label, self.animations.frames('pulse', 32), fps=12
+                )
+            self.countdown_animator.start()
+            self.animation_running = True
+        elif not due_soon and self.animation_running:
+            if self.countdown_animator is not None:
+                self.countdown_animator.stop()
+            self.countdown_anim_label.configure(image='')
+            self.animation_running = False
+        
     def update_countdown(self):
         """Update the countdown timer"""
+        # How late this tick is shows how busy the Tk event loop has been
+        if self.countdown_due is not None:
+            ui_loop_lag.observe(max(0.0, time.perf_counter() - self.countdown_due))
         if hasattr(self, 'reminder_service') and self.reminder_service.running:
             remaining = self.reminder_service.get_remaining_time()
             hours = remaining // 3600
@@ -741,8 +4973,11 @@ class ModernPushupApp:
             )
         else:
             self.countdown_label.configure(text="Next reminder in: --:--:--")
+        self.update_tray_icon()
+        self.update_countdown_animation()
         
         # Update every second
+        self.countdown_due = time.perf_counter() + 1.0
         self.root.after(1000, self.update_countdown)
 
 class SettingsWindow:
@@ -751,7 +4986,7 @@ class SettingsWindow:
         self.settings = settings
         self.window = ttk.Toplevel(parent.root)  # Use parent.root for the window parent
         self.window.title("Settings")
-        self.window.geometry("400x750")
+        self.window.geometry("400x980")
         self.window.resizable(False, False)
         self.preview_style = ttk.Style()
         self.create_settings_form()
@@ -803,11 +5038,54 @@ class SettingsWindow:
         minutes_var = tk.IntVar(value=self.settings.interval_minutes)
         ttk.Entry(minutes_frame, textvariable=minutes_var, width=5).pack()
         
+        # Custom schedule (optional, overrides the plain interval)
+        ttk.Label(
+            container,
+            text="Custom schedule (e.g. 'dnd 22:00-07:00 daily', 'rest sun')",
+            font=("Segoe UI", 9)
+        ).pack(anchor=tk.W)
+        schedule_text = tk.Text(container, height=3, width=40, font=("Consolas", 9))
+        schedule_text.insert("1.0", self.settings.custom_schedule)
+        schedule_text.pack(fill=tk.X)
+        
+        # What to do about reminders missed while the app was closed
+        catch_up_frame = ttk.Frame(container)
+        catch_up_frame.pack(fill=tk.X, pady=(5, 0))
+        ttk.Label(catch_up_frame, text="Missed while closed:").pack(side=tk.LEFT)
+        catch_up_choices = {"once": "Remind once on start", "skip": "Skip them"}
+        catch_up_var = tk.StringVar(value=catch_up_choices.get(self.settings.catch_up_policy, "Remind once on start"))
+        ttk.Combobox(
+            catch_up_frame,
+            textvariable=catch_up_var,
+            values=list(catch_up_choices.values()),
+            state="readonly",
+            width=22
+        ).pack(side=tk.RIGHT)
+        
         # Daily goal
         ttk.Label(container, text="Daily Goal", font=("Segoe UI", 12, "bold")).pack(anchor=tk.W, pady=(20, 10))
         goal_var = tk.IntVar(value=self.settings.daily_goal)
         ttk.Entry(container, textvariable=goal_var).pack(fill=tk.X)
         
+        # Reminder sound
+        ttk.Label(container, text="Reminder Sound", font=("Segoe UI", 12, "bold")).pack(anchor=tk.W, pady=(20, 10))
+        sound_frame = ttk.Frame(container)
+        sound_frame.pack(fill=tk.X)
+        sound_engine = self.parent.sound_engine
+        sound_var = tk.StringVar(value=self.settings.reminder_sound)
+        ttk.Combobox(
+            sound_frame,
+            textvariable=sound_var,
+            values=[SoundEngine.NO_SOUND] + sound_engine.available(),
+            state="readonly"
+        ).pack(side=tk.LEFT, fill=tk.X, expand=True)
+        ttk.Button(
+            sound_frame,
+            text="Test",
+            style="secondary.TButton",
+            command=lambda: sound_engine.play(sound_var.get())
+        ).pack(side=tk.RIGHT, padx=(5, 0))
+        
         # Add auto-update toggle before buttons
         ttk.Label(
             container,
@@ -908,6 +5186,13 @@ class SettingsWindow:
             variable=startup_var
         ).pack(anchor=tk.W)
         
+        auto_backup_var = tk.BooleanVar(value=self.settings.auto_backup)
+        ttk.Checkbutton(
+            startup_frame,
+            text=f"Back up data automatically (every {self.settings.backup_interval_hours}h)",
+            variable=auto_backup_var
+        ).pack(anchor=tk.W, pady=(5, 0))
+        
         # Button frame at the bottom (move this to the end)
         button_frame = ttk.Frame(container)
         button_frame.pack(fill=tk.X, pady=(20, 0))
@@ -931,12 +5216,22 @@ class SettingsWindow:
                 theme_var.get(),
                 goal_var.get(),
                 auto_update_var.get(),
-                startup_var.get()  # Add startup setting
+                startup_var.get(),  # Add startup setting
+                auto_backup_var.get(),
+                sound_var.get(),
+                schedule_text.get("1.0", tk.END).strip(),
+                next(k for k, v in catch_up_choices.items() if v == catch_up_var.get())
             )
         ).pack(side=tk.RIGHT, padx=5)
         
-    def save_settings(self, hours, minutes, theme, goal, auto_update, start_with_windows):
+    def save_settings(self, hours, minutes, theme, goal, auto_update, start_with_windows, auto_backup,
+                      reminder_sound, custom_schedule="", catch_up_policy="once"):
         """Save settings handler"""
+        try:
+            ReminderSchedule.compile(custom_schedule, hours * 3600 + minutes * 60)
+        except ValueError as e:
+            messagebox.showerror("Invalid Schedule", str(e))
+            return
         try:
             old_theme = self.settings.theme
             
@@ -947,8 +5242,17 @@ class SettingsWindow:
             self.settings.daily_goal = goal
             self.settings.auto_update = auto_update  # Save auto_update setting
             self.settings.start_with_windows = start_with_windows
+            self.settings.auto_backup = auto_backup
+            self.settings.reminder_sound = reminder_sound
+            self.settings.custom_schedule = custom_schedule
+            self.settings.catch_up_policy = catch_up_policy
+            self.parent.sound_engine.preload([reminder_sound])
             self.settings.save()
             self.update_startup_registry(start_with_windows)
+            if auto_backup:
+                self.parent.backup_service.start_scheduler(self.settings.backup_interval_hours)
+            else:
+                self.parent.backup_service.stop_scheduler()
             theme_changed = old_theme != theme
             if theme_changed:
                 if messagebox.askyesno(
@@ -994,15 +5298,487 @@ class SettingsWindow:
                 raise Exception(f"Failed to update startup registry: {e}")
                 
         except Exception as e:
-            print(f"Error updating startup registry: {e}")
+            ui_log.error("Error updating startup registry: %s", e)
             raise
 
     def close_window(self):
         """Handle window close"""
         self.window.destroy()
 
+class ProgressChart:
+    """Progress chart in the Statistics panel.
+
+    Rendering happens on a single background thread and finished images are
+    cached by (data version, range, size), so resizing back or switching
+    ranges reuses earlier renders instead of plotting again.
+    """
+    RANGES = {"30 days": 30, "90 days": 90, "1 year": 365, "All time": None}
+    CACHE_SIZE = 8
+
+    def __init__(self, parent, root, stats: Statistics):
+        self.root = root
+        self.stats = stats
+        self.frame = ttk.Frame(parent)
+        self.frame.pack(fill=tk.BOTH, expand=True, pady=(10, 0))
+
+        header = ttk.Frame(self.frame)
+        header.pack(fill=tk.X)
+        ttk.Label(header, text="Progress", font=("Segoe UI", 12, "bold")).pack(side=tk.LEFT)
+        self.range_var = tk.StringVar(value="30 days")
+        range_box = ttk.Combobox(
+            header,
+            textvariable=self.range_var,
+            values=list(self.RANGES),
+            state="readonly",
+            width=10
+        )
+        range_box.pack(side=tk.RIGHT)
+        range_box.bind("<<ComboboxSelected>>", lambda e: self.refresh())
+
+        self.image_label = ttk.Label(self.frame, anchor=tk.CENTER)
+        self.image_label.pack(fill=tk.BOTH, expand=True)
+        self.image_label.bind("<Configure>", self._on_resize)
+
+        self.photo = None
+        self._cache = OrderedDict()  # (version, range, width, height) -> PIL image
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._future = None
+        self._future_key = None
+        self._resize_job = None
+        self._size = (0, 0)
+        self.available = True
+
+    def _on_resize(self, event):
+        size = (event.width, event.height)
+        if size == self._size:
+            return
+        self._size = size
+        # Wait for the resize to settle before rendering
+        if self._resize_job:
+            self.root.after_cancel(self._resize_job)
+        self._resize_job = self.root.after(150, self.refresh)
+
+    def refresh(self):
+        """Show the chart for the current data, range and size"""
+        self._resize_job = None
+        if not self.available:
+            return
+        width, height = self._size
+        if width < 50 or height < 50:
+            return
+        if not self.image_label.winfo_viewable():
+            return  # rendered when the window is shown again
+        key = self._key()
+        image = self._cache.get(key)
+        if image is not None:
+            self._cache.move_to_end(key)
+            self._show(image)
+            return
+        if self._future_key == key:
+            return  # already rendering exactly this
+        self._future_key = key
+        self._future = self._executor.submit(self._render, key)
+        self.root.after(50, self._poll)
+
+    def _key(self) -> tuple:
+        # The day is part of the key: the window of days shown moves at midnight
+        # even when no stats change
+        return (self.stats.version, date.today(), self.range_var.get()) + self._size
+
+    def _render(self, key: tuple) -> Image.Image:
+        _, _, range_name, width, height = key
+        days = self.RANGES[range_name]
+        series = daily_series(self.stats.history.daily_totals(), days)
+        return render_progress_chart(series, width, height, f"Pushups per day ({range_name})")
+
+    def _poll(self):
+        future, key = self._future, self._future_key
+        if future is None:
+            return
+        if not future.done():
+            self.root.after(50, self._poll)
+            return
+        self._future = self._future_key = None
+        try:
+            image = future.result()
+        except ImportError:
+            self.available = False
+            self.image_label.configure(text="Install matplotlib to see progress charts")
+            return
+        except Exception as e:
+            ui_log.error("Failed to render progress chart: %s", e)
+            return
+        self._cache[key] = image
+        while len(self._cache) > self.CACHE_SIZE:
+            self._cache.popitem(last=False)
+        if key == self._key():
+            self._show(image)
+        else:
+            self.refresh()  # inputs changed while rendering
+
+    def _show(self, image: Image.Image):
+        self.photo = ImageTk.PhotoImage(image)
+        self.image_label.configure(image=self.photo)
+
+    def release(self):
+        """Drop the shown and cached renders (the window was hidden)"""
+        self.photo = None
+        self.image_label.configure(image='')
+        self._cache.clear()
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+class HistoryCalendar:
+    """Workout history heatmap drawn on a single Canvas.
+
+    One row per week, newest at the bottom. Only the rows that fit in the
+    canvas exist as canvas items; scrolling recycles them by moving them and
+    recolouring them from precomputed per-day levels, so the item count is
+    independent of how many years of history there are.
+    """
+    CELL = 16
+    GAP = 3
+    ROW = CELL + GAP
+    LEFT = 70
+    TOP = 24
+    COLORS = ("#2d333b", "#0e4429", "#006d32", "#26a641", "#39d353")
+    DAY_NAMES = "MTWTFSS"
+
+    def __init__(self, parent, totals: dict, daily_goal: int, visible_weeks: int = 20):
+        self.frame = ttk.Frame(parent)
+        self.canvas = tk.Canvas(
+            self.frame,
+            width=self.LEFT + 7 * self.ROW + 10,
+            height=self.TOP + visible_weeks * self.ROW,
+            highlightthickness=0
+        )
+        self.scrollbar = ttk.Scrollbar(self.frame, orient=tk.VERTICAL, command=self.yview)
+        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.rows = []  # recycled row items: (label id, [7 cell ids])
+        self.offset = 0  # scroll position in pixels
+        self.frame_times = deque(maxlen=240)  # redraw durations in seconds
+
+        for col, name in enumerate(self.DAY_NAMES):
+            self.canvas.create_text(
+                self.LEFT + col * self.ROW + self.CELL / 2, self.TOP / 2,
+                text=name, fill="#888888", font=("Segoe UI", 8)
+            )
+        self.tooltip_bg = self.canvas.create_rectangle(0, 0, 0, 0, fill="#111111", outline="#555555",
+                                                       state=tk.HIDDEN)
+        self.tooltip = self.canvas.create_text(0, 0, anchor=tk.NW, fill="#ffffff",
+                                               font=("Segoe UI", 9), state=tk.HIDDEN)
+
+        self.canvas.bind("<Configure>", lambda e: self.redraw())
+        self.canvas.bind("<MouseWheel>", self._on_wheel)
+        self.canvas.bind("<Motion>", self._on_motion)
+        self.canvas.bind("<Leave>", lambda e: self._hide_tooltip())
+        self.set_data(totals, daily_goal)
+
+    def set_data(self, totals: dict, daily_goal: int):
+        """Precompute per-day totals and colour levels, then jump to the latest week"""
+        today = datetime.now().date()
+        first = min((datetime.strptime(d, '%Y-%m-%d').date() for d in totals), default=today)
+        self.first_day = first.toordinal() - first.weekday()  # Monday of the first week
+        last_day = today.toordinal() - today.weekday() + 6
+        self.weeks = (last_day - self.first_day + 1) // 7
+        self.today = today.toordinal()
+
+        self.values = array('I', bytes(4 * self.weeks * 7))
+        self.levels = bytearray(self.weeks * 7)
+        goal = max(1, daily_goal)
+        for day, total in totals.items():
+            index = datetime.strptime(day, '%Y-%m-%d').date().toordinal() - self.first_day
+            if 0 <= index < len(self.values) and total > 0:
+                self.values[index] = total
+                self.levels[index] = self.level_for(total, goal)
+        self.offset = self._max_offset()
+        self.redraw()
+
+    @staticmethod
+    def level_for(total: int, goal: int) -> int:
+        """Colour level of a day: 0 for rest days, 1-3 below the goal, 4 only once it's met"""
+        if total <= 0:
+            return 0
+        return 4 if total >= goal else 1 + total * 3 // goal
+
+    def _view_height(self) -> int:
+        return max(self.ROW, self.canvas.winfo_height() - self.TOP)
+
+    def _max_offset(self) -> int:
+        return max(0, self.weeks * self.ROW - self._view_height())
+
+    def _ensure_rows(self):
+        needed = self._view_height() // self.ROW + 2
+        while len(self.rows) < needed:
+            label = self.canvas.create_text(self.LEFT - 8, 0, anchor=tk.E, fill="#888888",
+                                            font=("Segoe UI", 8))
+            cells = [
+                self.canvas.create_rectangle(0, 0, 0, 0, outline="", tags="cell")
+                for _ in range(7)
+            ]
+            self.rows.append((label, cells))
+        self.canvas.tag_raise(self.tooltip_bg)
+        self.canvas.tag_raise(self.tooltip)
+
+    def redraw(self):
+        """Position and colour the recycled rows for the current scroll offset"""
+        started = time.perf_counter()
+        self._ensure_rows()
+        self.offset = min(max(0, self.offset), self._max_offset())
+        first_week, shift = divmod(self.offset, self.ROW)
+        canvas = self.canvas
+        for i, (label, cells) in enumerate(self.rows):
+            week = first_week + i
+            y = self.TOP + i * self.ROW - shift
+            if week >= self.weeks:
+                canvas.itemconfigure(label, state=tk.HIDDEN)
+                for cell in cells:
+                    canvas.itemconfigure(cell, state=tk.HIDDEN)
+                continue
+            base = week * 7
+            monday = date.fromordinal(self.first_day + base)
+            sunday = date.fromordinal(self.first_day + base + 6)
+            # Label a row when a month starts in it, and always the top row
+            text = ""
+            if i == 0 or monday.day == 1 or sunday.month != monday.month:
+                text = sunday.strftime('%b %Y') if sunday.month == 1 or i == 0 else sunday.strftime('%b')
+            canvas.itemconfigure(label, text=text, state=tk.NORMAL)
+            canvas.coords(label, self.LEFT - 8, y + self.CELL / 2)
+            for col, cell in enumerate(cells):
+                x = self.LEFT + col * self.ROW
+                canvas.coords(cell, x, y, x + self.CELL, y + self.CELL)
+                future = self.first_day + base + col > self.today
+                canvas.itemconfigure(
+                    cell,
+                    fill=self.COLORS[self.levels[base + col]],
+                    state=tk.HIDDEN if future else tk.NORMAL
+                )
+        top = self.offset / (self.weeks * self.ROW) if self.weeks else 0.0
+        bottom = (self.offset + self._view_height()) / (self.weeks * self.ROW) if self.weeks else 1.0
+        self.scrollbar.set(top, min(1.0, bottom))
+        self.frame_times.append(time.perf_counter() - started)
+
+    def scroll_to(self, offset: int):
+        if offset != self.offset:
+            self.offset = offset
+            self._hide_tooltip()
+            self.redraw()
+
+    def yview(self, *args):
+        """Scrollbar protocol: ('moveto', fraction) or ('scroll', n, 'units'|'pages')"""
+        if args[0] == 'moveto':
+            self.scroll_to(int(float(args[1]) * self.weeks * self.ROW))
+        elif args[0] == 'scroll':
+            step = self._view_height() if args[2] == 'pages' else self.ROW
+            self.scroll_to(self.offset + int(args[1]) * step)
+
+    def _on_wheel(self, event):
+        self.scroll_to(self.offset - int(event.delta / 120 * self.ROW * 2))
+
+    def _day_at(self, x: int, y: int) -> Optional[int]:
+        col = (x - self.LEFT) // self.ROW
+        if not 0 <= col < 7 or y < self.TOP or (x - self.LEFT) % self.ROW >= self.CELL:
+            return None
+        week = (y - self.TOP + self.offset) // self.ROW
+        if not 0 <= week < self.weeks:
+            return None
+        index = week * 7 + col
+        return index if self.first_day + index <= self.today else None
+
+    def _on_motion(self, event):
+        index = self._day_at(event.x, event.y)
+        if index is None:
+            self._hide_tooltip()
+            return
+        day = date.fromordinal(self.first_day + index)
+        text = f"{day.strftime('%a %d %b %Y')}: {self.values[index]} pushups"
+        self.canvas.itemconfigure(self.tooltip, text=text, state=tk.NORMAL)
+        x = min(event.x + 12, self.canvas.winfo_width() - 170)
+        self.canvas.coords(self.tooltip, x, event.y + 12)
+        x1, y1, x2, y2 = self.canvas.bbox(self.tooltip)
+        self.canvas.coords(self.tooltip_bg, x1 - 4, y1 - 2, x2 + 4, y2 + 2)
+        self.canvas.itemconfigure(self.tooltip_bg, state=tk.NORMAL)
+
+    def _hide_tooltip(self):
+        self.canvas.itemconfigure(self.tooltip, state=tk.HIDDEN)
+        self.canvas.itemconfigure(self.tooltip_bg, state=tk.HIDDEN)
+
+class CalendarWindow:
+    """Toplevel showing the workout history heatmap"""
+
+    def __init__(self, parent, stats: Statistics, daily_goal: int):
+        self.window = ttk.Toplevel(parent)
+        self.window.title("Workout History")
+        self.window.geometry("260x480")
+        container = ttk.Frame(self.window, padding="10")
+        container.pack(fill=tk.BOTH, expand=True)
+        ttk.Label(
+            container,
+            text="Workout History",
+            font=("Segoe UI", 14, "bold")
+        ).pack(anchor=tk.W, pady=(0, 10))
+        self.status_label = ttk.Label(container, text="Loading history...")
+        self.status_label.pack(anchor=tk.W)
+        self.calendar = HistoryCalendar(container, {}, daily_goal)
+        self.calendar.frame.pack(fill=tk.BOTH, expand=True)
+        self.daily_goal = daily_goal
+        # Reading the totals still touches every month's file, so keep it off
+        # the Tk thread; the empty calendar is filled in when they arrive
+        executor = ThreadPoolExecutor(max_workers=1)
+        self._future = executor.submit(stats.history.daily_totals)
+        executor.shutdown(wait=False)
+        self.window.after(50, self._poll)
+
+    def _poll(self):
+        if not self.window.winfo_exists():
+            return  # closed while loading
+        if not self._future.done():
+            self.window.after(50, self._poll)
+            return
+        try:
+            totals = self._future.result()
+        except Exception as e:
+            ui_log.error("Failed to load workout history: %s", e)
+            self.status_label.configure(text="Could not load history")
+            return
+        self.status_label.pack_forget()
+        self.calendar.set_data(totals, self.daily_goal)
+
+class ExercisePickerDialog:
+    """Lets the user choose today's exercise, with media previews"""
+    PREVIEW_SIZE = 96
+
+    def __init__(self, app):
+        self.app = app
+        self.catalog = app.catalog
+        self.window = ttk.Toplevel(app.root)
+        self.window.title("Choose Exercise")
+        self.window.geometry("520x600")
+        self.window.protocol("WM_DELETE_WINDOW", self.close_window)
+        # Drawn immediately; real previews replace it as they become ready
+        self.placeholder = ImageTk.PhotoImage(
+            Image.new('RGBA', (self.PREVIEW_SIZE, self.PREVIEW_SIZE), "#808080")
+        )
+        self.create_picker()
+
+    def create_picker(self):
+        container = ttk.Frame(self.window, padding="20")
+        container.pack(fill=tk.BOTH, expand=True)
+
+        ttk.Label(
+            container,
+            text="What exercise do you want to do today?",
+            font=("Segoe UI", 14, "bold")
+        ).pack(anchor=tk.W, pady=(0, 10))
+
+        # Filters
+        filter_frame = ttk.Frame(container)
+        filter_frame.pack(fill=tk.X, pady=(0, 10))
+        self.muscle_var = tk.StringVar(value="any")
+        self.difficulty_var = tk.StringVar(value="any")
+        ttk.Label(filter_frame, text="Muscle").pack(side=tk.LEFT)
+        muscle_box = ttk.Combobox(
+            filter_frame,
+            textvariable=self.muscle_var,
+            values=["any"] + sorted(self.catalog.by_muscle),
+            state="readonly",
+            width=12
+        )
+        muscle_box.pack(side=tk.LEFT, padx=(5, 15))
+        ttk.Label(filter_frame, text="Difficulty").pack(side=tk.LEFT)
+        difficulty_box = ttk.Combobox(
+            filter_frame,
+            textvariable=self.difficulty_var,
+            values=["any"] + list(ExerciseCatalog.DIFFICULTIES),
+            state="readonly",
+            width=12
+        )
+        difficulty_box.pack(side=tk.LEFT, padx=5)
+        muscle_box.bind("<<ComboboxSelected>>", lambda e: self.show_exercises())
+        difficulty_box.bind("<<ComboboxSelected>>", lambda e: self.show_exercises())
+
+        # Scrollable list of exercises
+        list_frame = ttk.Frame(container)
+        list_frame.pack(fill=tk.BOTH, expand=True)
+        self.canvas = tk.Canvas(list_frame, highlightthickness=0)
+        scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.canvas.yview)
+        self.list_inner = ttk.Frame(self.canvas)
+        self.list_inner.bind(
+            "<Configure>",
+            lambda e: self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+        )
+        self.canvas.create_window((0, 0), window=self.list_inner, anchor=tk.NW)
+        self.canvas.configure(yscrollcommand=scrollbar.set)
+        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.show_exercises()
+
+    def show_exercises(self):
+        for child in self.list_inner.winfo_children():
+            child.destroy()
+        muscle = self.muscle_var.get()
+        difficulty = self.difficulty_var.get()
+        exercises = self.catalog.query(
+            muscle=None if muscle == "any" else muscle,
+            difficulty=None if difficulty == "any" else difficulty
+        )
+        for index, exercise in enumerate(exercises, start=1):
+            row = ttk.Frame(self.list_inner, padding=5)
+            row.pack(fill=tk.X)
+
+            preview = ttk.Label(row, image=self.placeholder)
+            preview.pack(side=tk.LEFT)
+            photo = self.app.media_cache.get(
+                exercise.media,
+                self.PREVIEW_SIZE,
+                lambda photo, label=preview: self.show_preview(label, photo)
+            )
+            if photo is not None:
+                self.show_preview(preview, photo)
+
+            details = ttk.Frame(row)
+            details.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=10)
+            ttk.Label(
+                details,
+                text=f"{index}. {exercise.name}",
+                font=("Segoe UI", 12, "bold")
+            ).pack(anchor=tk.W)
+            ttk.Label(
+                details,
+                text=f"{exercise.difficulty.capitalize()} · {', '.join(exercise.muscles)} · {exercise.reps} reps",
+                font=("Segoe UI", 9)
+            ).pack(anchor=tk.W)
+
+            ttk.Button(
+                row,
+                text="Select",
+                style="success.TButton" if exercise.id == self.app.settings.exercise_id else "TButton",
+                command=lambda ex=exercise: self.select(ex)
+            ).pack(side=tk.RIGHT)
+
+    @staticmethod
+    def show_preview(label, photo):
+        label.configure(image=photo)
+        # Tk doesn't keep the image alive; without this reference the cache's
+        # LRU could evict it and blank the label
+        label.image = photo
+
+    def select(self, exercise: Exercise):
+        self.app.select_exercise(exercise)
+        self.close_window()
+
+    def close_window(self):
+        """Handle window close"""
+        self.app.media_cache.clear()
+        self.window.destroy()
+
 class CompletionDialog:
-    def __init__(self, parent, pushups: int, stats: Statistics, update_callback):
+    def __init__(self, parent, pushups: int, stats: Statistics, update_callback,
+                 exercise_id: int = PUSHUPS_ID, on_close=None, animation_frames: Optional[list] = None):
         self.window = ttk.Toplevel(parent)
         self.window.title("Pushup Completion")
         self.window.geometry("300x400")
@@ -1012,12 +5788,24 @@ class CompletionDialog:
         self.pushups = pushups
         self.stats = stats
         self.update_callback = update_callback  # Add callback for updates
+        self.exercise_id = exercise_id
+        self.on_close = on_close
+        self.animation_frames = animation_frames
+        self.animator = None
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
         self.create_dialog()
         
     def create_dialog(self):
         container = ttk.Frame(self.window, padding="20")
         container.pack(fill=tk.BOTH, expand=True)
         
+        if self.animation_frames:
+            self.window.geometry("300x500")
+            animation_label = ttk.Label(container)
+            animation_label.pack(pady=(0, 10))
+            self.animator = FrameAnimator(animation_label, self.animation_frames, fps=16)
+            self.animator.start()
+        
         # Title
         ttk.Label(
             container,
@@ -1059,7 +5847,7 @@ class CompletionDialog:
             container,
             text="Skip This Time",
             style="danger.TButton",
-            command=self.window.destroy
+            command=self.close
         ).pack(fill=tk.X, pady=5)
         
     def custom_amount(self):
@@ -1074,13 +5862,919 @@ class CompletionDialog:
             self.complete_pushups(amount)
     
     def complete_pushups(self, count: int):
-        self.stats.add_pushups(count)
+        self.stats.add_pushups(count, self.exercise_id)
         self.update_callback()  # Call the update function
+        self.close()
+    
+    def close(self):
+        if self.animator:
+            self.animator.stop()
+        if self.on_close:
+            self.on_close()
         self.window.destroy()
 
-def main():
+def run_history_command(args) -> int:
+    """Archive finished months and print storage/latency measurements"""
+    history = WorkoutHistory(codec=args.codec)
+    if args.archive:
+        history.archive_completed_months()
+    report = history.storage_report()
+    print(f"Months: {report['months']}")
+    print(f"Raw size: {report['raw_bytes']} bytes")
+    print(f"Stored size: {report['stored_bytes']} bytes")
+    if 'ratio' in report:
+        print(f"Compression ratio: {report['ratio']:.2%}")
+    print(f"Cold footer reads: {report['footer_ms']:.2f} ms")
+    print(f"Full decompression: {report['decompress_ms']:.2f} ms")
+    return 0
+
+def parse_date(value: str) -> datetime:
+    try:
+        return datetime.strptime(value, '%Y-%m-%d')
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid date (expected YYYY-MM-DD): {value}")
+
+def run_export_command(args) -> int:
+    """Stream filtered statistics to a file or stdout"""
+    def report(rows, fraction):
+        print(f"\r{fraction:6.1%}  {rows} rows", end='', file=sys.stderr, flush=True)
+
+    exporter = StatisticsExporter(Statistics(), chunk_size=args.chunk_size)
+    output = sys.stdout if args.output == '-' else args.output
+    end = args.end + timedelta(days=1) if args.end else None  # --to is inclusive
+    rows = exporter.export(
+        output,
+        args.format,
+        start=args.start,
+        end=end,
+        exercise=args.exercise,
+        profile=args.profile,
+        group=args.group,
+        progress=report if args.progress else None
+    )
+    if args.progress:
+        print(file=sys.stderr)
+    if output is not sys.stdout:
+        print(f"Exported {rows} rows to {args.output}")
+    return 0
+
+def run_backup_command(args) -> int:
+    """Create a backup snapshot or list existing ones"""
+    settings = AppSettings.load()
+    backups = BackupService(keep=args.keep or settings.backup_keep)
+    if args.list:
+        for snapshot_id in backups.list_snapshots():
+            manifest = backups.load_manifest(snapshot_id)
+            print(f"{snapshot_id}  {len(manifest['files'])} files")
+        return 0
+    report = backups.create_snapshot()
+    print(f"Backup {report['snapshot']}: {report['files']} files, "
+          f"{report['new_chunks']} new chunks ({report['bytes_written']} bytes), "
+          f"{report['reused_chunks']} reused")
+    return 0
+
+def run_restore_command(args) -> int:
+    """Restore a verified backup snapshot"""
+    backups = BackupService()
+    try:
+        count = backups.restore(args.snapshot, Path(args.target) if args.target else None)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"Restore failed: {e}", file=sys.stderr)
+        return 1
+    print(f"Restored {count} files")
+    return 0
+
+def run_verify_command(args) -> int:
+    """Verify checksums of every stats/history file"""
+    verifier = IntegrityVerifier(workers=args.workers)
+    started = time.perf_counter()
+    reports = verifier.verify_all()
+    elapsed = (time.perf_counter() - started) * 1000
+    bad = [r for r in reports if r['bad']]
+    for report in bad:
+        print(f"{report['path'].name}: {len(report['bad'])} of {report['blocks']} block(s) corrupt")
+        if args.repair:
+            verifier.quarantine(report)
+    blocks = sum(r['blocks'] for r in reports)
+    print(f"Verified {blocks} blocks in {len(reports)} files in {elapsed:.1f} ms")
+    return 1 if bad else 0
+
+def run_sound_command(args) -> int:
+    """Play cues through a backend and report their dispatch latency"""
+    if args.backend == 'null':
+        backend = NullSoundBackend()
+    elif args.backend == 'file':
+        backend = WaveFileSoundBackend(Path(args.output))
+    else:
+        backend = WinsoundSoundBackend()
+    engine = SoundEngine(backend)
+    names = [args.sound] if args.sound else engine.available()
+    started = time.perf_counter()
+    engine.preload(names)
+    print(f"Decoded {len(names)} sound(s) in {(time.perf_counter() - started) * 1000:.1f} ms")
+    for _ in range(args.repeat):
+        for name in names:
+            engine.play(name)
+    engine.close()
+    if isinstance(backend, WinsoundSoundBackend):
+        backend.thread.join()
+    stats = engine.latency_stats()
+    if stats['count']:
+        print(f"{stats['count']} cues dispatched: avg {stats['avg_ms']:.3f} ms, "
+              f"p95 {stats['p95_ms']:.3f} ms, max {stats['max_ms']:.3f} ms")
+    return 0
+
+def run_catalog_command(args) -> int:
+    """List exercises and time catalog loading and queries"""
+    path = Path(args.file) if args.file else None
+    # Time a cold and a cached load in a scratch cache, leaving the user's alone
+    with tempfile.TemporaryDirectory() as tmp:
+        started = time.perf_counter()
+        catalog = ExerciseCatalog.load(path, Path(tmp))
+        cold_ms = (time.perf_counter() - started) * 1000
+        started = time.perf_counter()
+        catalog = ExerciseCatalog.load(path, Path(tmp))
+        cached_ms = (time.perf_counter() - started) * 1000
+
+    results = catalog.query(args.muscle, args.difficulty, args.equipment)
+    rounds = 10000
+    started = time.perf_counter()
+    for _ in range(rounds):
+        catalog.query(args.muscle, args.difficulty, args.equipment)
+    query_us = (time.perf_counter() - started) / rounds * 1e6
+
+    for exercise in results:
+        print(f"{exercise.id:3d}  {exercise.name:<20} {exercise.difficulty:<13} "
+              f"{exercise.equipment:<8} {', '.join(exercise.muscles)}")
+    print(f"Loaded {len(catalog.exercises)} exercises: JSON {cold_ms:.2f} ms, "
+          f"cache {cached_ms:.2f} ms; query {query_us:.2f} us")
+    return 0
+
+def run_chart_benchmark_command(args) -> int:
+    """Compare raw and downsampled chart rendering on a synthetic history"""
+    rng = random.Random(1)
+    today = datetime.now().date().toordinal()
+    points = [(today - args.days + i, max(0, int(rng.gauss(80, 30)))) for i in range(args.days)]
+    timings = {}
+    for label, max_points in (("raw", 0), ("downsampled", args.width)):
+        render_progress_chart(points[:10], args.width, args.height, max_points=max_points)  # warm up
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            render_progress_chart(points, args.width, args.height, max_points=max_points)
+        timings[label] = (time.perf_counter() - started) / args.repeat * 1000
+    started = time.perf_counter()
+    downsample_lttb(points, args.width)
+    lttb_ms = (time.perf_counter() - started) * 1000
+    print(f"{args.days} days at {args.width}x{args.height} px")
+    print(f"Raw plot:         {timings['raw']:.1f} ms")
+    print(f"Downsampled plot: {timings['downsampled']:.1f} ms (LTTB {lttb_ms:.1f} ms)")
+    return 0
+
+def run_calendar_benchmark_command(args) -> int:
+    """Time heatmap scrolling and hovering over a synthetic history"""
+    rng = random.Random(1)
+    today = datetime.now().date()
+    totals = {
+        (today - timedelta(days=i)).isoformat(): rng.randint(0, 150)
+        for i in range(args.years * 365)
+    }
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        print(f"Calendar benchmark needs a display: {e}", file=sys.stderr)
+        return 1
+    root.geometry("260x480")
+    started = time.perf_counter()
+    calendar = HistoryCalendar(root, totals, 100)
+    calendar.frame.pack(fill=tk.BOTH, expand=True)
+    root.update()
+    build_ms = (time.perf_counter() - started) * 1000
+
+    calendar.frame_times.clear()
+    for offset in range(calendar._max_offset(), -1, -args.step):
+        calendar.scroll_to(offset)
+        root.update_idletasks()
+    scroll_times = sorted(calendar.frame_times)
+
+    hover_times = []
+    for i in range(500):
+        event = types.SimpleNamespace(x=calendar.LEFT + (i % 7) * calendar.ROW + 5, y=calendar.TOP + 5 + i % 300)
+        started = time.perf_counter()
+        calendar._on_motion(event)
+        root.update_idletasks()
+        hover_times.append(time.perf_counter() - started)
+    hover_times.sort()
+    items = len(calendar.canvas.find_all())
+    root.destroy()
+
+    print(f"{args.years} years ({calendar.weeks} weeks), {items} canvas items, built in {build_ms:.1f} ms")
+    for name, times in (("Scroll frame", scroll_times), ("Hover", hover_times)):
+        if times:
+            print(f"{name}: avg {sum(times) / len(times) * 1000:.2f} ms, "
+                  f"p95 {times[int(len(times) * 0.95) - 1] * 1000:.2f} ms, max {times[-1] * 1000:.2f} ms "
+                  f"over {len(times)} frames")
+    return 0
+
+def run_achievements_command(args) -> int:
+    """List achievements and personal bests, or benchmark the rule engine"""
+    if args.benchmark:
+        return run_achievements_benchmark(args)
+    stats = Statistics()
+    if args.rebuild:
+        started = time.perf_counter()
+        stats.rebuild_achievements()
+        print(f"Replayed {stats.achievements.events} events in "
+              f"{(time.perf_counter() - started) * 1000:.1f} ms")
+    engine = stats.achievements
+    for achievement in sorted(engine.achievements.values(), key=lambda a: (a.metric, a.threshold)):
+        unlocked = engine.unlocked.get(achievement.key)
+        when = datetime.fromtimestamp(unlocked).strftime('%Y-%m-%d') if unlocked else ''
+        print(f"{'x' if unlocked else ' '} {achievement.title:<22} {when}")
+    bests = engine.personal_bests()
+    print(f"Personal bests: set {bests['best_set']}, day {bests['best_day']}, "
+          f"streak {bests['streak']} days")
+    return 0
+
+def run_achievements_benchmark(args) -> int:
+    """Time the engine with many rules over a synthetic history"""
+    exercises = [None] + list(range(1, 11))
+    kinds = list(AchievementEngine.METRICS)
+    per_metric = max(1, math.ceil(args.rules / (len(exercises) * len(kinds))))
+    rules = [
+        Achievement(f'{kind}_{exercise}_{i}', f'{kind} {i}', kind, 2 ** i, exercise)
+        for exercise in exercises for kind in kinds for i in range(per_metric)
+    ]
+    rng = random.Random(1)
+    start = datetime(2020, 1, 1).timestamp()
+    spacing = 5 * 365 * 86400 / args.events
+    events = (
+        WorkoutEvent(start + i * spacing, rng.randint(5, 60), rng.randint(1, 10))
+        for i in range(args.events)
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = AchievementEngine(rules, Path(tmp) / 'achievements.json')
+        started = time.perf_counter()
+        engine.rebuild(events)
+        replay = time.perf_counter() - started
+        started = time.perf_counter()
+        engine.save()
+        save_ms = (time.perf_counter() - started) * 1000
+        size = engine.path.stat().st_size
+        started = time.perf_counter()
+        engine.load()
+        load_ms = (time.perf_counter() - started) * 1000
+    print(f"{len(rules)} rules on {len(engine.metrics)} metrics, {args.events} events")
+    print(f"Replay: {replay:.2f} s ({replay / args.events * 1e6:.2f} us/event), "
+          f"{len(engine.unlocked)} unlocked")
+    print(f"Checkpoint: {size} bytes, save {save_ms:.2f} ms, load {load_ms:.2f} ms")
+    print(f"Rescanning history on every set instead would cost ~{replay:.2f} s per set")
+    return 0
+
+def run_leaderboard_command(args) -> int:
+    """Show, manage or benchmark the local leaderboard"""
+    if args.benchmark:
+        return run_leaderboard_benchmark(args)
+    history = WorkoutHistory(Path(args.history_dir) if args.history_dir else None)
+    leaderboard = Leaderboard(history)
+    if args.delete_profile:
+        leaderboard.delete_profile(args.delete_profile)
+        print(f"Removed {args.delete_profile} from the leaderboard")
+        return 0
+    if args.remove_challenge:
+        leaderboard.remove_challenge(args.remove_challenge)
+        return 0
+    if args.rebuild:
+        leaderboard.build()
+    leaderboard.refresh()
+    if args.add_challenge:
+        name, start, end = args.add_challenge
+        exercise = None
+        if args.exercise:
+            exercise = ExerciseCatalog.load().id_for(args.exercise)
+            if exercise is None:
+                print(f"Unknown exercise: {args.exercise}", file=sys.stderr)
+                return 1
+        try:
+            leaderboard.add_challenge(Challenge(
+                name, parse_date(start).timestamp(),
+                (parse_date(end) + timedelta(days=1)).timestamp(), exercise
+            ))
+        except (ValueError, argparse.ArgumentTypeError) as e:
+            print(f"Invalid challenge: {e}", file=sys.stderr)
+            return 1
+        args.period = name
+    try:
+        rows = leaderboard.top(args.period, args.top)
+    except KeyError as e:
+        print(e.args[0], file=sys.stderr)
+        return 1
+    for rank, profile, score in rows:
+        print(f"{rank:4d}. {profile:<24} {score}")
+    if args.profile:
+        rank, score, participants = leaderboard.rank_of(args.period, args.profile)
+        if rank is None:
+            print(f"{args.profile} has no sets on this board")
+        else:
+            print(f"{args.profile}: rank {rank} of {participants} with {score}")
+    return 0
+
+def run_leaderboard_benchmark(args) -> int:
+    """Compare incremental rankings with re-sorting on every refresh"""
+    rng = random.Random(1)
+    profiles = [f'user{i:04d}' for i in range(args.profiles)]
+    now = time.time()
+    events = [WorkoutEvent(now - (args.events - i), rng.randint(5, 50), PUSHUPS_ID, rng.choice(profiles))
+              for i in range(args.events)]
+    with tempfile.TemporaryDirectory() as tmp:
+        leaderboard = Leaderboard(WorkoutHistory(Path(tmp) / 'history'))
+        leaderboard.reset(now)
+        started = time.perf_counter()
+        for event in events:
+            leaderboard.record(event)
+        record_us = (time.perf_counter() - started) / len(events) * 1e6
+        started = time.perf_counter()
+        for profile in profiles:
+            leaderboard.top('today', 10)
+            leaderboard.rank_of('today', profile)
+        query_us = (time.perf_counter() - started) / len(profiles) * 1e6
+
+        totals = dict(leaderboard.boards['today'][1].scores)
+        started = time.perf_counter()
+        for profile in profiles:
+            ranked = sorted(totals.items(), key=lambda item: -item[1])
+            ranked[:10]
+            next(i for i, (name, _) in enumerate(ranked) if name == profile)
+        resort_us = (time.perf_counter() - started) / len(profiles) * 1e6
+    print(f"{args.profiles} profiles, {args.events} events")
+    print(f"Record: {record_us:.2f} us/event (4 boards)")
+    print(f"Top 10 + my rank: {query_us:.2f} us incremental, {resort_us:.2f} us re-sorting")
+    return 0
+
+def run_sync_command(args) -> int:
+    """Sync with another machine, serve sync requests, or benchmark sync"""
+    if args.action == 'benchmark':
+        return run_sync_benchmark(args)
+    stats = Statistics()
+    store = stats.enable_sync(AppSettings.load().sync_secret)
+    if args.action == 'status':
+        print(f"Device: {store.device_id}")
+        for device, count in sorted(store.vector().items()):
+            print(f"  {device}{' (this device)' if device == store.device_id else ''}: {count} events")
+        return 0
+    if not store.secret:
+        print("Set sync_secret in config.json (the same on every machine) to sync", file=sys.stderr)
+        return 1
+    if args.action == 'serve':
+        server = SyncServer(store, port=args.port, on_events=stats.merge_remote)
+        server.start()
+        print(f"Waiting for sync connections on port {server.port} (Ctrl+C to stop)")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            server.stop()
+        return 0
+    if not args.peer:
+        print("sync with: missing HOST[:PORT]", file=sys.stderr)
+        return 1
+    host, _, port = args.peer.partition(':')
+    try:
+        report = store.sync_with(host, int(port or args.port))
+    except (OSError, ValueError) as e:
+        print(f"Sync failed: {e}", file=sys.stderr)
+        return 1
+    if report['received']:
+        stats.merge_remote(report['received'])
+    print(f"Synced with {report['peer']}: sent {report['sent']}, received {len(report['received'])} "
+          f"events ({report['bytes_sent']} bytes out, {report['bytes_received']} bytes in)")
+    return 0
+
+def run_sync_benchmark(args) -> int:
+    """Show that a sync costs in proportion to new events, not history size"""
+    rng = random.Random(1)
+    start = datetime(2020, 1, 1).timestamp()
+    for history_size in (args.events // 10, args.events):
+        with tempfile.TemporaryDirectory() as tmp:
+            laptop = SyncStore(Path(tmp) / 'laptop', secret='benchmark')
+            desktop = SyncStore(Path(tmp) / 'desktop', secret='benchmark')
+            server = SyncServer(desktop, host='127.0.0.1', port=0)
+            server.start()
+            try:
+                laptop._log(laptop.device_id).append([
+                    WorkoutEvent(start + i * 600, rng.randint(5, 50)).to_record()
+                    for i in range(history_size)
+                ])
+                started = time.perf_counter()
+                full = laptop.sync_with('127.0.0.1', server.port)
+                full_ms = (time.perf_counter() - started) * 1000
+                for i in range(args.new):
+                    laptop.record_local(WorkoutEvent(time.time() + i, rng.randint(5, 50)))
+                started = time.perf_counter()
+                delta = laptop.sync_with('127.0.0.1', server.port)
+                delta_ms = (time.perf_counter() - started) * 1000
+                started = time.perf_counter()
+                again = laptop.sync_with('127.0.0.1', server.port)
+                noop_ms = (time.perf_counter() - started) * 1000
+            finally:
+                server.stop()
+            assert desktop.vector() == laptop.vector()
+        print(f"History of {history_size} events:")
+        print(f"  initial sync: {full_ms:8.1f} ms, {full['bytes_sent']} bytes")
+        print(f"  {args.new} new events: {delta_ms:8.1f} ms, {delta['bytes_sent']} bytes")
+        print(f"  nothing new:  {noop_ms:8.1f} ms, {again['bytes_sent']} bytes")
+    return 0
+
+def run_logs_command(args) -> int:
+    """Print recent log entries or measure logging overhead"""
+    if args.benchmark:
+        return run_logs_benchmark(args)
+    path = default_log_dir() / 'pushup_reminder.log'
+    if not path.exists():
+        print("No log entries yet")
+        return 0
+    with open(path, 'r', encoding='utf-8') as f:
+        lines = deque(f, maxlen=args.tail)
+    for line in lines:
+        try:
+            entry = json.loads(line)
+            print(f"{entry['time']} {entry['level']:<8} {entry['logger']}: {entry['msg']}")
+        except (ValueError, KeyError):
+            print(line.rstrip())
+    return 0
+
+def run_logs_benchmark(args) -> int:
+    """Time logging calls as seen by the calling thread"""
+    results = {}
+
+    def measure(label, log, burst=100):
+        # Log in bursts and let the writer catch up in between, as in the
+        # app, so the writer thread doesn't compete with the timed calls
+        elapsed = 0.0
+        for start in range(0, args.repeat, burst):
+            started = time.perf_counter()
+            for i in range(start, min(start + burst, args.repeat)):
+                log("Saved stats in %.2f ms", i * 0.01)
+            elapsed += time.perf_counter() - started
+            while _log_listener and not _log_listener.queue.empty():
+                time.sleep(0.001)
+        results[label] = elapsed / args.repeat * 1e6
+
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_logging(Path(tmp), console=False, max_bytes=256 * 1024)
+        logger.setLevel(logging.INFO)
+        bench_log = logger.getChild("benchmark")
+        sampling = logger.handlers[0].filters[0]
+
+        measure("debug (disabled)", bench_log.debug)
+        null_log = logging.getLogger("pushup_reminder_null_benchmark")
+        null_log.propagate = False
+        null_log.addHandler(logging.NullHandler())
+        null_log.setLevel(logging.INFO)
+        measure("info (stdlib, no handler)", null_log.info)
+        measure("info (sampled out)", bench_log.info)
+        sampling.burst = args.repeat
+        measure("info (queued)", bench_log.info)
+        stop_logging()
+
+        direct = logging.handlers.RotatingFileHandler(Path(tmp) / 'direct.log', maxBytes=256 * 1024,
+                                                      backupCount=5, encoding='utf-8')
+        direct.setFormatter(JsonLineFormatter())
+        blocking_log = logging.getLogger("pushup_reminder_blocking_benchmark")
+        blocking_log.propagate = False
+        blocking_log.addHandler(direct)
+        blocking_log.setLevel(logging.INFO)
+        measure("info (direct file write)", blocking_log.info)
+        direct.close()
+    setup_logging()
+    for label, us in results.items():
+        print(f"{label:<26} {us:6.2f} us/call")
+    return 0
+
+def rss_mb() -> float:
+    return psutil.Process().memory_info().rss / (1024 * 1024)
+
+def run_memory_command(args) -> int:
+    """tracemalloc report of the data layer, or a soak test for leaks"""
+    if args.action == 'soak':
+        return run_memory_soak(args)
+    tracemalloc.start(args.frames)
+    samples = [("start", rss_mb())]
+    stats = Statistics()
+    samples.append(("statistics", rss_mb()))
+    ExerciseCatalog.default()
+    samples.append(("catalog", rss_mb()))
+    totals = stats.history.daily_totals()
+    samples.append(("daily totals", rss_mb()))
+    events = EventColumns.from_events(stats.history.iter_events())
+    samples.append(("history columns", rss_mb()))
+    snapshot = tracemalloc.take_snapshot().filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+    ])
+    current, peak = tracemalloc.get_traced_memory()
+    print(f"Top {args.top} allocation sites:")
+    for stat in snapshot.statistics('lineno')[:args.top]:
+        frame = stat.traceback[0]
+        print(f"  {stat.size / 1024:9.1f} KiB {stat.count:7d} blocks  {Path(frame.filename).name}:{frame.lineno}")
+    print(f"Traced: {current / 1024:.1f} KiB now, {peak / 1024:.1f} KiB peak")
+    print(f"History: {len(events)} events in {events.nbytes() / 1024:.1f} KiB of columns, "
+          f"{len(totals)} days")
+    print("RSS:")
+    for label, mb in samples:
+        print(f"  {label:<16} {mb:7.1f} MiB")
+    return 0
+
+class SoakNotifier:
+    """Stand-in for NotificationService in the memory soak: counts reminders"""
+
+    def __init__(self):
+        self.sent = 0
+        self.reminder_pending = False
+
+    def notify(self, title: str, message: str):
+        self.sent += 1
+        self.reminder_pending = True
+
+def open_soak_root():
+    """Hidden Tk root for the soak's UI cycles, or None without a display"""
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        return None
+    root.withdraw()
+    return root
+
+def run_memory_soak(args) -> int:
+    """Simulate reminder cycles in a scratch profile and check memory stays flat"""
+    rng = random.Random(1)
+    with tempfile.TemporaryDirectory() as tmp:
+        # Everything below keeps its data under the home directory, logs included
+        saved_env = {name: os.environ.get(name) for name in ('HOME', 'USERPROFILE')}
+        os.environ['HOME'] = os.environ['USERPROFILE'] = tmp
+        setup_logging(console=False)
+        root = open_soak_root()
+        try:
+            stats = Statistics()
+            settings = AppSettings(custom_schedule=BENCHMARK_SCHEDULE)
+            notifier = SoakNotifier()
+            service = ReminderService(settings, notifier)
+            session = SessionState()
+            service.on_transition = lambda: session.save(service.state())
+            service.running = True  # driven by cycle() below, not by its thread
+            tray = TrayIconFrames(Image.new('RGB', (64, 64), '#4CAF50'))
+            animations = AnimationLibrary() if root else None
+            if root is None:
+                print("No display: skipping the Tk part of each cycle")
+            clock = datetime(2024, 1, 1, 8, 0).timestamp()
+
+            def show_ui():
+                # What a reminder does on screen: the completion dialog with its
+                # animation, the progress chart, then back to the tray
+                dialog = tk.Toplevel(root)
+                label = tk.Label(dialog)
+                label.pack()
+                animator = FrameAnimator(label, animations.frames('pushup', 96))
+                animator.start()
+                chart = ImageTk.PhotoImage(render_progress_chart(
+                    daily_series(stats.history.daily_totals(), 30), 320, 200, "soak"))
+                tk.Label(dialog, image=chart).pack()
+                root.update()
+                animator.stop()
+                dialog.destroy()
+                root.update()
+                animations.clear()  # the window is withdrawn, as in reminder_answered
+
+            def cycle(i):
+                nonlocal clock
+                service.last_reminder = clock
+                service._plan_next(clock)
+                clock = service.next_deadline
+                notifier.notify("Time for Push-ups!", f"Do {settings.pushups} push-ups now!")
+                if i % 7 == 0:
+                    service.snooze(300)
+                if root is not None:
+                    show_ui()
+                stats.add_pushups(rng.randint(5, settings.pushups * 3), rng.randint(1, 10))
+                stats.new_achievements.clear()  # announced by the UI
+                notifier.reminder_pending = False
+                tray.frame(tray.key_for(stats.today_pushups / settings.daily_goal, rng.random(), False))
+                if i % 50 == 0:
+                    stats.reset_daily()
+                    stats.history.daily_totals()
+
+            for i in range(args.warmup):
+                cycle(i)
+            gc.collect()
+            tracemalloc.start()
+            baseline = tracemalloc.take_snapshot()
+            base_current = tracemalloc.get_traced_memory()[0]
+            base_rss = rss_mb()
+            print(f"{'cycles':>8} {'traced KiB':>11} {'RSS MiB':>8}")
+            for i in range(args.cycles):
+                cycle(args.warmup + i)
+                if (i + 1) % max(1, args.cycles // 10) == 0:
+                    print(f"{i + 1:8d} {(tracemalloc.get_traced_memory()[0] - base_current) / 1024:11.1f} "
+                          f"{rss_mb():8.1f}")
+            gc.collect()
+            growth = tracemalloc.get_traced_memory()[0] - base_current
+            top = tracemalloc.take_snapshot().compare_to(baseline, 'lineno')[:5]
+            tracemalloc.stop()
+            service.running = False
+        finally:
+            if root is not None:
+                root.destroy()
+            stop_logging()
+            for name, value in saved_env.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+    setup_logging()
+    print(f"Growth over {args.cycles} cycles ({notifier.sent} reminders including warm-up): "
+          f"{growth / 1024:.1f} KiB traced, {rss_mb() - base_rss:+.1f} MiB RSS")
+    if growth > args.max_growth * 1024:
+        print(f"FAIL: more than {args.max_growth} KiB retained. Largest increases:")
+        for stat in top:
+            print(f"  {stat}")
+        return 1
+    print("OK: no memory growth")
+    return 0
+
+def run_metrics_command(args) -> int:
+    """Print, serve or scrape the Prometheus metrics"""
+    if args.action == 'benchmark':
+        return run_metrics_benchmark(args)
+    if args.action == 'dump':
+        print(METRICS.render(), end='')
+        return 0
+    if args.action == 'scrape':
+        port = args.port or AppSettings.load().metrics_port
+        if not port:
+            print("Metrics are off; set metrics_port in config.json or pass --port")
+            return 1
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5) as response:
+                print(response.read().decode('utf-8'), end='')
+        except OSError as e:
+            print(f"Scrape failed: {e}")
+            return 1
+        return 0
+    exporter = MetricsExporter(METRICS, port=args.port)
+    exporter.start()
+    print(f"Serving {exporter.url} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        exporter.stop()
+    return 0
+
+def run_metrics_benchmark(args) -> int:
+    """Time metric updates and scrapes, and the exporter's idle CPU"""
+    registry = MetricsRegistry("benchmark")
+    counter = registry.counter("events_total", "Benchmark events.", labels=("kind",))
+    histogram = registry.histogram("latency_seconds", "Benchmark latency.")
+    results = {}
+    started = time.perf_counter()
+    for _ in range(args.repeat):
+        counter.inc(kind="reminder")
+    results["counter inc"] = (time.perf_counter() - started) / args.repeat * 1e6
+    started = time.perf_counter()
+    for i in range(args.repeat):
+        histogram.observe(i % 1000 * 0.001)
+    results["histogram observe"] = (time.perf_counter() - started) / args.repeat * 1e6
+    started = time.perf_counter()
+    for _ in range(100):
+        METRICS.render()
+    results["render app metrics"] = (time.perf_counter() - started) / 100 * 1e6
+    for label, us in results.items():
+        print(f"{label:<20} {us:9.2f} us")
+
+    # CPU used by this process while idle, without and then with the exporter
+    def idle_cpu():
+        cpu = time.process_time()
+        time.sleep(args.idle)
+        return (time.process_time() - cpu) / args.idle * 100
+
+    baseline = idle_cpu()
+    exporter = MetricsExporter(METRICS, port=0)
+    exporter.start()
+    try:
+        serving = idle_cpu()
+        started = time.perf_counter()
+        with urllib.request.urlopen(exporter.url, timeout=5) as response:
+            body = response.read()
+        scrape_ms = (time.perf_counter() - started) * 1000
+    finally:
+        exporter.stop()
+    print(f"Idle CPU: {baseline:.3f}% without exporter, {serving:.3f}% serving {exporter.url}")
+    print(f"Scrape: {len(body)} bytes in {scrape_ms:.2f} ms")
+    return 0
+
+BENCHMARK_SCHEDULE = """
+every 40m
+cron */15 9-11 * * mon-fri
+at 06:30,12:15,18:45 weekdays
+dnd 22:00-07:00 daily
+dnd 12:00-13:00 mon-fri
+dnd 15:10-15:20 tue,thu
+rest sun
+"""
+
+def run_schedule_command(args) -> int:
+    """Preview or benchmark the reminder schedule"""
+    settings = AppSettings.load()
+    interval = settings.interval_hours * 3600 + settings.interval_minutes * 60 + settings.interval_seconds
+    text = settings.custom_schedule
+    if args.file:
+        text = Path(args.file).read_text(encoding='utf-8')
+    elif args.benchmark:
+        text = BENCHMARK_SCHEDULE
+    try:
+        started = time.perf_counter()
+        schedule = ReminderSchedule.compile(text, interval)
+        compile_ms = (time.perf_counter() - started) * 1000
+    except ValueError as e:
+        print(f"Invalid schedule: {e}", file=sys.stderr)
+        return 1
+
+    if not args.benchmark:
+        fire = datetime.now()
+        last = fire
+        for _ in range(args.preview):
+            fire = schedule.next_fire(fire, last)
+            if fire is None:
+                print("No further reminders")
+                break
+            print(fire.strftime("%a %Y-%m-%d %H:%M"))
+            last = fire
+        return 0
+
+    # Walk a whole year of reminders, then time random next-fire queries
+    start = datetime(2024, 1, 1)
+    fire, last, fires = start, start, 0
+    started = time.perf_counter()
+    while fire is not None and fire < start + timedelta(days=365):
+        fire = schedule.next_fire(fire, last)
+        last = fire
+        fires += 1
+    year_ms = (time.perf_counter() - started) * 1000
+    rng = random.Random(1)
+    queries = [start + timedelta(minutes=rng.randrange(365 * 24 * 60)) for _ in range(args.repeat)]
+    started = time.perf_counter()
+    for query in queries:
+        schedule.next_fire(query, query)
+    query_us = (time.perf_counter() - started) / len(queries) * 1e6
+    started = time.perf_counter()
+    for query in queries:
+        schedule.exclusion_end(query)
+    window_us = (time.perf_counter() - started) / len(queries) * 1e6
+    print(f"{len(schedule.rules)} rules, {len(schedule.window_starts)} merged exclusion windows, "
+          f"compiled in {compile_ms:.2f} ms")
+    print(f"One year: {fires} reminders in {year_ms:.1f} ms")
+    print(f"next_fire: {query_us:.1f} us/query, window lookup: {window_us:.2f} us/query")
+    return 0
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=App_Version)
+    commands = parser.add_subparsers(dest="command")
+
+    history_parser = commands.add_parser("history", help="Report on the workout history archive")
+    history_parser.add_argument("--archive", action="store_true", help="Archive finished months first")
+    history_parser.add_argument("--codec", choices=["lzma", "zlib"], default="lzma")
+    history_parser.set_defaults(handler=run_history_command)
+
+    export_parser = commands.add_parser("export", help="Export statistics to CSV or JSON Lines")
+    export_parser.add_argument("output", help="Output file, or - for stdout")
+    export_parser.add_argument("--format", choices=StatisticsExporter.FORMATS, default="csv")
+    export_parser.add_argument("--from", dest="start", type=parse_date, help="First day (YYYY-MM-DD)")
+    export_parser.add_argument("--to", dest="end", type=parse_date, help="Last day, inclusive (YYYY-MM-DD)")
+    export_parser.add_argument("--exercise", help="Only export this exercise")
+    export_parser.add_argument("--profile", help="Only export this profile")
+    export_parser.add_argument("--group", choices=StatisticsExporter.GROUPS, help="Aggregate per day or week")
+    export_parser.add_argument("--chunk-size", type=int, default=5000)
+    export_parser.add_argument("--progress", action="store_true", help="Show progress on stderr")
+    export_parser.set_defaults(handler=run_export_command)
+
+    backup_parser = commands.add_parser("backup", help="Back up settings, statistics and history")
+    backup_parser.add_argument("--list", action="store_true", help="List existing backups")
+    backup_parser.add_argument("--keep", type=int, help="Number of backups to retain")
+    backup_parser.set_defaults(handler=run_backup_command)
+
+    restore_parser = commands.add_parser("restore", help="Restore a backup (latest by default)")
+    restore_parser.add_argument("snapshot", nargs="?", help="Backup id from 'backup --list'")
+    restore_parser.add_argument("--target", help="Restore into this directory instead")
+    restore_parser.set_defaults(handler=run_restore_command)
+
+    verify_parser = commands.add_parser("verify", help="Check stats and history checksums")
+    verify_parser.add_argument("--repair", action="store_true", help="Quarantine corrupt blocks")
+    verify_parser.add_argument("--workers", type=int, default=4)
+    verify_parser.set_defaults(handler=run_verify_command)
+
+    sound_parser = commands.add_parser("sound", help="Measure reminder sound dispatch latency")
+    sound_parser.add_argument("sound", nargs="?", help="Sound name (all bundled sounds by default)")
+    sound_parser.add_argument("--backend", choices=["winsound", "null", "file"], default="null")
+    sound_parser.add_argument("--output", default="sound_output", help="Directory for the file backend")
+    sound_parser.add_argument("--repeat", type=int, default=10)
+    sound_parser.set_defaults(handler=run_sound_command)
+
+    catalog_parser = commands.add_parser("catalog", help="List and benchmark the exercise catalog")
+    catalog_parser.add_argument("--file", help="Alternative exercises.json")
+    catalog_parser.add_argument("--muscle")
+    catalog_parser.add_argument("--difficulty", choices=ExerciseCatalog.DIFFICULTIES)
+    catalog_parser.add_argument("--equipment")
+    catalog_parser.set_defaults(handler=run_catalog_command)
+
+    chart_parser = commands.add_parser("chart-benchmark", help="Time progress chart rendering")
+    chart_parser.add_argument("--days", type=int, default=3650)
+    chart_parser.add_argument("--width", type=int, default=360)
+    chart_parser.add_argument("--height", type=int, default=160)
+    chart_parser.add_argument("--repeat", type=int, default=5)
+    chart_parser.set_defaults(handler=run_chart_benchmark_command)
+
+    calendar_parser = commands.add_parser("calendar-benchmark", help="Time the history calendar")
+    calendar_parser.add_argument("--years", type=int, default=10)
+    calendar_parser.add_argument("--step", type=int, default=7, help="Pixels scrolled per frame")
+    calendar_parser.set_defaults(handler=run_calendar_benchmark_command)
+
+    achievements_parser = commands.add_parser("achievements", help="Show achievements and personal bests")
+    achievements_parser.add_argument("--rebuild", action="store_true", help="Replay the history first")
+    achievements_parser.add_argument("--benchmark", action="store_true", help="Time the rule engine")
+    achievements_parser.add_argument("--rules", type=int, default=300)
+    achievements_parser.add_argument("--events", type=int, default=1000000)
+    achievements_parser.set_defaults(handler=run_achievements_command)
+
+    leaderboard_parser = commands.add_parser("leaderboard", help="Rank every local profile")
+    leaderboard_parser.add_argument("period", nargs="?", default="today",
+                                    help="today, week, month, all or a challenge name")
+    leaderboard_parser.add_argument("--top", type=int, default=10)
+    leaderboard_parser.add_argument("--profile", help="Also show this profile's rank")
+    leaderboard_parser.add_argument("--history-dir", help="Shared history directory")
+    leaderboard_parser.add_argument("--add-challenge", nargs=3, metavar=("NAME", "FROM", "TO"),
+                                    help="Start a challenge between two dates (inclusive)")
+    leaderboard_parser.add_argument("--exercise", help="Limit a new challenge to one exercise")
+    leaderboard_parser.add_argument("--remove-challenge", metavar="NAME")
+    leaderboard_parser.add_argument("--delete-profile", metavar="PROFILE")
+    leaderboard_parser.add_argument("--rebuild", action="store_true", help="Recount the whole history")
+    leaderboard_parser.add_argument("--benchmark", action="store_true")
+    leaderboard_parser.add_argument("--profiles", type=int, default=500)
+    leaderboard_parser.add_argument("--events", type=int, default=200000)
+    leaderboard_parser.set_defaults(handler=run_leaderboard_command)
+
+    sync_parser = commands.add_parser("sync", help="Sync workouts with your other machines")
+    sync_parser.add_argument("action", choices=["status", "with", "serve", "benchmark"])
+    sync_parser.add_argument("peer", nargs="?", help="HOST[:PORT] for 'with'")
+    sync_parser.add_argument("--port", type=int, default=SyncStore.DEFAULT_PORT)
+    sync_parser.add_argument("--events", type=int, default=100000, help="History size for the benchmark")
+    sync_parser.add_argument("--new", type=int, default=100, help="New events per benchmark sync")
+    sync_parser.set_defaults(handler=run_sync_command)
+
+    logs_parser = commands.add_parser("logs", help="Show recent log entries")
+    logs_parser.add_argument("--tail", type=int, default=20)
+    logs_parser.add_argument("--benchmark", action="store_true", help="Measure logging call overhead")
+    logs_parser.add_argument("--repeat", type=int, default=100000)
+    logs_parser.set_defaults(handler=run_logs_command)
+
+    memory_parser = commands.add_parser("memory", help="Memory diagnostics")
+    memory_parser.add_argument("action", choices=["report", "soak"], nargs="?", default="report")
+    memory_parser.add_argument("--top", type=int, default=15, help="Allocation sites to list")
+    memory_parser.add_argument("--frames", type=int, default=1, help="Traceback depth to record")
+    memory_parser.add_argument("--cycles", type=int, default=5000, help="Soak test reminder cycles")
+    memory_parser.add_argument("--warmup", type=int, default=500)
+    memory_parser.add_argument("--max-growth", type=int, default=256, help="Allowed growth in KiB")
+    memory_parser.set_defaults(handler=run_memory_command)
+
+    metrics_parser = commands.add_parser("metrics", help="Prometheus metrics")
+    metrics_parser.add_argument("action", choices=["dump", "scrape", "serve", "benchmark"], nargs="?",
+                                default="dump")
+    metrics_parser.add_argument("--port", type=int, default=0,
+                                help="Port to scrape or serve on (default: metrics_port setting / any free port)")
+    metrics_parser.add_argument("--repeat", type=int, default=100000)
+    metrics_parser.add_argument("--idle", type=float, default=5.0, help="Seconds to measure idle CPU for")
+    metrics_parser.set_defaults(handler=run_metrics_command)
+
+    schedule_parser = commands.add_parser("schedule", help="Preview or benchmark the reminder schedule")
+    schedule_parser.add_argument("--file", help="Read the schedule from a file instead of the settings")
+    schedule_parser.add_argument("--preview", type=int, default=10, help="Number of reminders to list")
+    schedule_parser.add_argument("--benchmark", action="store_true", help="Time next-fire queries")
+    schedule_parser.add_argument("--repeat", type=int, default=10000)
+    schedule_parser.set_defaults(handler=run_schedule_command)
+
+    return parser
+
+def main(argv=None):
+    args = build_arg_parser().parse_args(argv)
+    setup_logging()
+    settings = AppSettings.load()
+    set_log_levels(settings.log_level, settings.log_levels)
+    if args.command:
+        return args.handler(args)
     app = ModernPushupApp()
     app.run()
+    return 0
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    multiprocessing.freeze_support()  # preview workers in the frozen build
+    sys.exit(main())
\ No newline at end of file
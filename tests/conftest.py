@@ -0,0 +1,43 @@
+"""Shared test setup.
+
+pushup_reminder imports pywin32, win10toast, winsound and winreg (Windows
+only) and pystray (needs a display). Where those can't be imported, they are
+replaced with mocks so the platform-independent parts run anywhere.
+"""
+import sys
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+PLATFORM_MODULES = (
+    'win10toast', 'win32com', 'win32com.client', 'pythoncom',
+    'win32api', 'win32process', 'winsound', 'winreg', 'pystray',
+)
+
+for name in PLATFORM_MODULES:
+    try:
+        __import__(name)
+    except Exception:  # ImportError, or pystray failing without a display
+        sys.modules[name] = mock.MagicMock(name=name)
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+@pytest.fixture
+def home(tmp_path, monkeypatch):
+    """Point the app's ~/.pushup_reminder at a scratch directory"""
+    monkeypatch.setenv('HOME', str(tmp_path))
+    monkeypatch.setenv('USERPROFILE', str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture(autouse=True)
+def reset_logging():
+    """Undo setup_logging() from tests that go through main(), so later
+    warnings don't go to a console handler holding pytest's closed stream"""
+    yield
+    import pushup_reminder
+    pushup_reminder.stop_logging()
+    for handler in pushup_reminder.logger.handlers[:]:
+        pushup_reminder.logger.removeHandler(handler)
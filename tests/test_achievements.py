@@ -0,0 +1,28 @@
+import pytest
+
+import pushup_reminder as pr
+
+
+def test_metric_base_is_abstract():
+    with pytest.raises(TypeError):
+        pr.AchievementMetric()
+    assert not hasattr(pr.TotalMetric(), '__dict__')
+
+
+def test_reset_all_survives_achievement_rebuild(home):
+    stats = pr.Statistics()
+    stats.add_pushups(150)
+    assert 'total_100' in stats.achievements.unlocked
+
+    stats.reset_all()
+    (home / '.pushup_reminder' / 'achievements.json').unlink()
+    stats = pr.Statistics()
+    assert stats.achievements.unlocked == {}
+    assert stats.total_pushups == 0
+
+    # The watermark is also in achievements.json, so losing stats.json keeps it
+    stats.add_pushups(20)
+    (home / '.pushup_reminder' / 'stats.json').write_text('damaged')
+    stats = pr.Statistics()
+    assert stats.total_pushups == 20
+    assert list(stats.achievements.unlocked) == ['set_20']
@@ -0,0 +1,42 @@
+import gc
+
+import pushup_reminder as pr
+
+
+class FakeToplevel:
+    def __init__(self):
+        self.bindings = []
+
+    def bind(self, sequence, func, add=None):
+        self.bindings.append((sequence, func))
+
+
+class FakeLabel:
+    def __init__(self, toplevel):
+        self.toplevel = toplevel
+
+    def winfo_toplevel(self):
+        return self.toplevel
+
+
+def test_recreated_animators_share_one_map_binding():
+    top = FakeToplevel()
+    label = FakeLabel(top)
+    for _ in range(5):
+        animator = pr.FrameAnimator(label, ['frame'] * 3)
+    assert [seq for seq, _ in top.bindings] == ['<Map>']
+
+    del animator
+    gc.collect()
+    # Tk's binding doesn't keep replaced animators or their frames alive
+    assert len(pr.FrameAnimator._by_toplevel[top]) == 0
+
+
+def test_map_resumes_paused_animators():
+    top = FakeToplevel()
+    animator = pr.FrameAnimator(FakeLabel(top), ['frame'])
+    resumed = []
+    animator._resume = lambda: resumed.append(True)
+    _, on_map = top.bindings[0]
+    on_map(None)
+    assert resumed == [True]
@@ -0,0 +1,83 @@
+import hashlib
+import zlib
+
+import pytest
+
+import pushup_reminder as pr
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(pr.BackupService, 'CHUNK_SIZE', 1024)
+    root = tmp_path / 'data'
+    (root / 'history').mkdir(parents=True)
+    (root / 'stats.json').write_text('{"total_pushups": 100}')
+    (root / 'history' / '2024-01.jsonl').write_bytes(bytes(i % 251 for i in range(3000)))  # 3 chunks
+    (root / 'logs').mkdir()
+    (root / 'logs' / 'pushup_reminder.log').write_text('not backed up')
+    return root
+
+
+def digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def test_snapshots_share_unchanged_chunks(data_dir):
+    backups = pr.BackupService(data_dir)
+    first = backups.create_snapshot()
+    assert (first['files'], first['new_chunks']) == (2, 4)
+
+    log = data_dir / 'history' / '2024-01.jsonl'
+    with open(log, 'ab') as f:
+        f.write(b'appended set\n')
+    second = backups.create_snapshot()
+    # Only the log's last chunk changed; stats.json isn't even re-read
+    assert second['new_chunks'] == 1
+    assert second['reused_chunks'] == 1 + 2
+    assert len(list(backups.chunks_dir.glob('*/*'))) == 5
+    assert 'logs/pushup_reminder.log' not in backups.load_manifest(second['snapshot'])['files']
+
+
+def test_restore_rejects_tampered_chunk(data_dir):
+    backups = pr.BackupService(data_dir)
+    backups.create_snapshot()
+    stats_chunk = digest(b'{"total_pushups": 100}')
+    backups._chunk_path(stats_chunk).write_bytes(zlib.compress(b'{"total_pushups": 999999}'))
+    (data_dir / 'stats.json').write_text('{"total_pushups": 150}')
+
+    with pytest.raises(ValueError, match="corrupt"):
+        backups.restore()
+    # Live data untouched and nothing staged left behind
+    assert (data_dir / 'stats.json').read_text() == '{"total_pushups": 150}'
+    assert not list(data_dir.rglob('*.restore.tmp'))
+
+
+def test_restore_moves_files_missing_from_snapshot_aside(data_dir):
+    backups = pr.BackupService(data_dir)
+    backups.create_snapshot()
+    (data_dir / 'stats.json').write_text('{"total_pushups": 150}')
+    newer = data_dir / 'history' / '2024-02.jsonl'
+    newer.write_text('{"t":1706745600,"n":10}\n')
+
+    assert backups.restore() == 2
+    assert (data_dir / 'stats.json').read_text() == '{"total_pushups": 100}'
+    assert not newer.exists()
+    displaced = list((backups.backup_dir / 'displaced').glob('*/history/2024-02.jsonl'))
+    assert [p.read_text() for p in displaced] == ['{"t":1706745600,"n":10}\n']
+    assert (data_dir / 'logs' / 'pushup_reminder.log').exists()  # not a backed-up file
+
+
+def test_retention_drops_unreferenced_chunks(data_dir):
+    backups = pr.BackupService(data_dir, keep=1)
+    first = backups.create_snapshot()
+    old_stats = digest(b'{"total_pushups": 100}')
+    (data_dir / 'stats.json').write_text('{"total_pushups": 150}')
+    second = backups.create_snapshot()
+
+    assert backups.list_snapshots() == [second['snapshot']]
+    assert first['snapshot'] not in backups.list_snapshots()
+    assert not backups._chunk_path(old_stats).exists()
+    assert backups._chunk_path(digest(b'{"total_pushups": 150}')).exists()
+    # Chunks still referenced by the kept snapshot survive
+    log_chunks = backups.load_manifest(second['snapshot'])['files']['history/2024-01.jsonl']['chunks']
+    assert all(backups._chunk_path(c).exists() for c in log_chunks)
@@ -0,0 +1,9 @@
+import pushup_reminder as pr
+
+
+def test_level_four_only_when_goal_met():
+    level = pr.HistoryCalendar.level_for
+    assert level(0, 100) == 0
+    assert [level(t, 100) for t in (1, 33, 34, 66, 67, 75, 99)] == [1, 1, 2, 2, 3, 3, 3]
+    assert level(100, 100) == 4
+    assert level(250, 100) == 4
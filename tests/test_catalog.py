@@ -0,0 +1,20 @@
+import pushup_reminder as pr
+
+
+def test_catalog_cache_is_versioned(tmp_path):
+    cold = pr.ExerciseCatalog.load(cache_dir=tmp_path)
+    cached = list(tmp_path.glob('exercises-*.pickle'))
+    assert [p.name.split('-')[1] for p in cached] == [f'v{pr.ExerciseCatalog.CACHE_VERSION}']
+
+    warm = pr.ExerciseCatalog.load(cache_dir=tmp_path)
+    assert [e.key for e in warm.exercises] == [e.key for e in cold.exercises]
+    assert warm.by_id[pr.PUSHUPS_ID].key == 'pushups'
+
+
+def test_catalog_command_leaves_user_cache_alone(home, capsys):
+    user_cache = home / '.pushup_reminder' / 'cache'
+    pr.ExerciseCatalog.load(cache_dir=user_cache)
+    before = sorted(p.name for p in user_cache.iterdir())
+
+    assert pr.main(['catalog']) == 0
+    assert sorted(p.name for p in user_cache.iterdir()) == before
@@ -0,0 +1,85 @@
+import csv
+import io
+import json
+from datetime import datetime
+
+import pytest
+
+import pushup_reminder as pr
+
+SQUATS = 2
+
+
+def event(month, day, count, exercise=pr.PUSHUPS_ID, profile='default', hour=12):
+    return pr.WorkoutEvent(datetime(2023, month, day, hour).timestamp(), count, exercise, profile)
+
+
+@pytest.fixture
+def exporter(home):
+    stats = pr.Statistics()
+    stats.history.append_many([
+        event(10, 30, 10),
+        event(10, 31, 20),
+        event(10, 31, 15, SQUATS),
+        event(11, 2, 5),                      # same week as Oct 30-31
+        event(11, 2, 7, profile='alice'),
+        event(11, 6, 12),
+        event(12, 1, 9),
+    ])
+    return pr.StatisticsExporter(stats, chunk_size=2)
+
+
+def test_weeks_spanning_months_are_one_row(exporter):
+    rows = list(exporter.iter_rows(group='week', exercise='pushups', profile='default'))
+    assert [(r['period'], r['sets'], r['count']) for r in rows] == [
+        ('2023-10-30', 3, 35),
+        ('2023-11-06', 1, 12),
+        ('2023-11-27', 1, 9),
+    ]
+
+
+def test_days_are_grouped_per_exercise_and_profile(exporter):
+    rows = list(exporter.iter_rows(group='day'))
+    assert [(r['period'], r['exercise'], r['profile'], r['count']) for r in rows] == [
+        ('2023-10-30', 'pushups', 'default', 10),
+        ('2023-10-31', 'pushups', 'default', 20),
+        ('2023-10-31', 'squats', 'default', 15),
+        ('2023-11-02', 'pushups', 'alice', 7),
+        ('2023-11-02', 'pushups', 'default', 5),
+        ('2023-11-06', 'pushups', 'default', 12),
+        ('2023-12-01', 'pushups', 'default', 9),
+    ]
+
+
+def test_filters(exporter):
+    def totals(**filters):
+        return [r['count'] for r in exporter.iter_rows(**filters)]
+
+    assert totals(exercise='squats') == [15]
+    assert totals(profile='alice') == [7]
+    assert totals(start=datetime(2023, 11, 1), end=datetime(2023, 11, 6)) == [5, 7]
+    assert totals(start=datetime(2023, 11, 6)) == [12, 9]
+    with pytest.raises(ValueError, match="Unknown exercise"):
+        list(exporter.iter_rows(exercise='cartwheels'))
+
+
+def test_export_csv_and_jsonl(exporter):
+    out = io.StringIO()
+    progress = []
+    written = exporter.export(out, 'csv', group='week', profile='default',
+                              progress=lambda rows, fraction: progress.append((rows, fraction)))
+    rows = list(csv.DictReader(io.StringIO(out.getvalue())))
+    assert written == len(rows) == 4
+    assert list(rows[0]) == pr.StatisticsExporter.GROUPED_FIELDS
+    assert progress[-1] == (4, 1.0)
+    assert [rows for rows, _ in progress] == sorted(rows for rows, _ in progress)
+
+    out = io.StringIO()
+    assert exporter.export(out, 'jsonl', exercise='squats') == 1
+    assert json.loads(out.getvalue()) == {
+        'timestamp': '2023-10-31T12:00:00', 'exercise': 'squats', 'profile': 'default', 'count': 15}
+
+    with pytest.raises(ValueError):
+        exporter.export(io.StringIO(), 'xml')
+    with pytest.raises(ValueError):
+        exporter.export(io.StringIO(), group='month')
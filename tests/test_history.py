@@ -0,0 +1,75 @@
+import shutil
+from datetime import datetime
+
+import pytest
+
+import pushup_reminder as pr
+
+MONTH = '2023-11'
+
+
+def at(day, count):
+    return pr.WorkoutEvent(datetime(2023, 11, day, 12).timestamp(), count)
+
+
+@pytest.fixture
+def history(tmp_path):
+    history = pr.WorkoutHistory(tmp_path / 'history')
+    history.append_many([at(1, 10), at(2, 20), at(2, 5)])
+    return history
+
+
+def counts(history):
+    return sorted(e.count for e in history.iter_month(MONTH))
+
+
+def test_leftover_log_after_crash_is_not_counted_twice(history, tmp_path):
+    log = history._log_path(MONTH)
+    leftover = tmp_path / 'leftover.jsonl'
+    shutil.copy(log, leftover)
+    assert history.archive_completed_months()['months'] == [MONTH]
+    assert not log.exists()
+
+    # As if the process died after writing the segment but before the unlink
+    shutil.copy(leftover, log)
+    assert counts(history) == [5, 10, 20]
+    assert history.month_summary(MONTH)['total'] == 35
+    assert history.daily_totals() == {'2023-11-01': 10, '2023-11-02': 25}
+
+    # Archiving again folds nothing in twice
+    history.archive_completed_months()
+    assert not log.exists()
+    assert counts(history) == [5, 10, 20]
+
+
+def test_log_recreated_after_archive_is_read_in_full(history):
+    history.archive_completed_months()
+    history.append_many([at(3, 7), at(4, 8)])  # e.g. old sets arriving by sync
+
+    assert counts(history) == [5, 7, 8, 10, 20]
+    assert history.month_summary(MONTH)['days'] == {'01': 10, '02': 25, '03': 7, '04': 8}
+
+    history.archive_completed_months()
+    assert not history._log_path(MONTH).exists()
+    assert counts(history) == [5, 7, 8, 10, 20]
+
+
+def test_sets_appended_while_compressing_survive(history, monkeypatch):
+    write_segment = pr.WorkoutHistory._write_segment
+
+    def slow_write(self, *args, **kwargs):
+        self.append(at(5, 3))  # lands after log_bytes was taken
+        return write_segment(self, *args, **kwargs)
+
+    monkeypatch.setattr(pr.WorkoutHistory, '_write_segment', slow_write)
+    history.archive_completed_months()
+    monkeypatch.undo()
+
+    log = history._log_path(MONTH)
+    assert log.exists()  # kept: it has bytes the segment doesn't cover
+    assert counts(history) == [3, 5, 10, 20]
+    assert history.month_summary(MONTH)['total'] == 38
+
+    history.archive_completed_months()
+    assert not log.exists()
+    assert counts(history) == [3, 5, 10, 20]
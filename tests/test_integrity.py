@@ -0,0 +1,99 @@
+import json
+
+import pushup_reminder as pr
+
+
+def make_history(tmp_path, counts, when=1_700_000_000):
+    history = pr.WorkoutHistory(tmp_path / 'history')
+    for i, count in enumerate(counts):
+        history.append(pr.WorkoutEvent(when + i, count))
+    return history, next((tmp_path / 'history').glob('*.jsonl'))
+
+
+def rewrite_line(path, index, change):
+    lines = path.read_bytes().splitlines(keepends=True)
+    record = json.loads(lines[index])
+    change(record)
+    lines[index] = json.dumps(record, separators=(',', ':')).encode() + b'\n'
+    path.write_bytes(b''.join(lines))
+
+
+def test_stripped_checksum_is_corrupt_in_sealed_logs(tmp_path):
+    history, log = make_history(tmp_path, [10, 20])
+    assert pr.WorkoutHistory.log_is_sealed(log)
+
+    def tamper(record):
+        del record['c']
+        record['n'] = 500
+    rewrite_line(log, 2, tamper)
+
+    assert [e.count for e in history.iter_events()] == [10]
+    report = pr.IntegrityVerifier(tmp_path).verify_file(log)
+    assert len(report['bad']) == 1
+
+
+def test_logs_from_before_checksums_still_load(tmp_path):
+    (tmp_path / 'history').mkdir()
+    log = tmp_path / 'history' / '2023-11.jsonl'
+    log.write_text('{"t":1700000000,"n":10}\n{"t":1700000001,"n":5}\n')
+    history = pr.WorkoutHistory(tmp_path / 'history')
+    assert [e.count for e in history.iter_events()] == [10, 5]
+    assert pr.IntegrityVerifier(tmp_path).verify_file(log)['bad'] == []
+
+
+def test_segment_footer_needs_its_checksum(tmp_path):
+    history, log = make_history(tmp_path, [10, 20])
+    month = log.stem
+    history._write_segment(month, pr.EventColumns.from_events(history.iter_events()))
+    log.unlink()
+    segment = history._segment_path(month)
+    assert history.read_footer(segment)['sealed'] == 1
+
+    data = segment.read_bytes()
+    footer_len, magic = pr.WorkoutHistory.TRAILER.unpack(data[-pr.WorkoutHistory.TRAILER.size:])
+    start = len(data) - pr.WorkoutHistory.TRAILER.size - footer_len
+    footer = json.loads(data[start:start + footer_len])
+    del footer['c']
+    footer['total'] = 9999
+    footer_bytes = json.dumps(footer, separators=(',', ':')).encode()
+    segment.write_bytes(data[:start] + footer_bytes
+                        + pr.WorkoutHistory.TRAILER.pack(len(footer_bytes), magic))
+
+    assert pr.IntegrityVerifier(tmp_path).verify_file(segment)['bad'] == [0]
+
+
+def test_quarantine_moves_bad_lines_aside(tmp_path):
+    history, log = make_history(tmp_path, [10, 20, 30])
+    rewrite_line(log, 2, lambda record: record.update(n=999))  # checksum no longer matches
+
+    verifier = pr.IntegrityVerifier(tmp_path)
+    reports = verifier.startup_check()  # no shutdown marker: full check, then repair
+    assert [len(r['bad']) for r in reports] == [1]
+
+    assert [e.count for e in history.iter_events()] == [10, 30]
+    quarantined = list((tmp_path / 'quarantine').glob(f'{log.name}.*.bad'))
+    assert len(quarantined) == 1
+    assert json.loads(quarantined[0].read_text())['n'] == 999
+    assert verifier.verify_file(log)['bad'] == []
+
+
+def test_startup_check_resumes_from_clean_shutdown_offsets(tmp_path):
+    history, log = make_history(tmp_path, [10, 20])
+    verifier = pr.IntegrityVerifier(tmp_path)
+    verifier.mark_clean_shutdown()
+    assert pr.IntegrityVerifier(tmp_path).startup_check() == []  # nothing changed
+
+    verifier.mark_clean_shutdown()
+    verified_size = log.stat().st_size
+    history.append(pr.WorkoutEvent(1_700_000_100, 30))
+    with open(log, 'a') as f:
+        f.write('{"t":1700000200,"n":40}\n')  # no checksum in a sealed log
+
+    reports = pr.IntegrityVerifier(tmp_path).startup_check(repair=False)
+    assert [r['path'] for r in reports] == [log]
+    # Only the lines appended since the clean shutdown were read
+    assert reports[0]['blocks'] == 2
+    assert reports[0]['bad'] == [verified_size + len(log.read_bytes()[verified_size:].splitlines(True)[0])]
+
+    # The marker is consumed: after this (unclean) run everything is checked again
+    assert pr.IntegrityVerifier(tmp_path).startup_check(repair=False)[0]['blocks'] == 5
@@ -0,0 +1,98 @@
+import time
+from datetime import datetime
+
+import pushup_reminder as pr
+
+
+def event(profile, count, ago=0.0):
+    return pr.WorkoutEvent(time.time() - ago, count, pr.PUSHUPS_ID, profile)
+
+
+def test_ranks_share_ties():
+    index = pr.RankIndex()
+    for profile, score in (('a', 10), ('b', 30), ('c', 10), ('d', 5)):
+        index.add(profile, score)
+    assert index.top(4) == [(1, 'b', 30), (2, 'a', 10), (2, 'c', 10), (4, 'd', 5)]
+    index.add('d', 30)
+    assert index.rank_of('d') == 1 and index.rank_of('a') == 3
+
+
+def test_refresh_replays_only_new_history(tmp_path):
+    history = pr.WorkoutHistory(tmp_path / 'history')
+    history.append_many([event('alice', 20, 60), event('bob', 10, 50)])
+    board = pr.Leaderboard(history)
+    assert board.refresh() == 2
+
+    history.append(event('bob', 15))
+    board = pr.Leaderboard(history)
+    assert board.loaded
+    assert board.refresh() == 1
+    assert board.top('all') == [(1, 'bob', 25), (2, 'alice', 20)]
+
+
+def test_statistics_keep_attached_leaderboard_current(home):
+    stats = pr.Statistics('alice')
+    stats.leaderboard = pr.Leaderboard(stats.history)
+    stats.leaderboard.refresh()
+    stats.add_pushups(12)
+    synced = [event('bob', 30)]
+    stats.history.append_many(synced)  # SyncStore.apply writes synced sets to the history
+    stats.merge_remote(synced)
+    assert stats.leaderboard.top('today') == [(1, 'bob', 30), (2, 'alice', 12)]
+    # Saved with the stats, so a new instance has nothing to replay
+    assert pr.Leaderboard(stats.history).refresh() == 0
+
+
+def test_late_sets_with_older_timestamps_are_counted(tmp_path):
+    history = pr.WorkoutHistory(tmp_path / 'history')
+    history.append(event('alice', 20))
+    board = pr.Leaderboard(history)
+    board.refresh()
+
+    # Synced from a peer whose clock is behind, and a second set in the same second
+    history.append(event('bob', 15, ago=3600))
+    now = time.time()
+    history.append_many([pr.WorkoutEvent(now, 5, pr.PUSHUPS_ID, 'alice'),
+                         pr.WorkoutEvent(now, 5, pr.PUSHUPS_ID, 'alice')])
+    board = pr.Leaderboard(history)
+    assert board.refresh() == 3
+    assert board.top('all') == [(1, 'alice', 30), (2, 'bob', 15)]
+    assert pr.Leaderboard(history).refresh() == 0
+
+
+def old_month(day, profile, count):
+    return pr.WorkoutEvent(datetime(2023, 11, day, 12).timestamp(), count, pr.PUSHUPS_ID, profile)
+
+
+def test_archiving_a_counted_month_needs_no_rebuild(tmp_path):
+    history = pr.WorkoutHistory(tmp_path / 'history')
+    history.append_many([old_month(1, 'alice', 10), old_month(2, 'bob', 20)])
+    pr.Leaderboard(history).refresh()
+    history.archive_completed_months()
+
+    board = pr.Leaderboard(history)
+    assert board.refresh() == 0
+    assert board.top('all') == [(1, 'bob', 20), (2, 'alice', 10)]
+
+    # Old sets arriving later recreate the month's log; they are read from it
+    history.append(old_month(3, 'alice', 15))
+    board = pr.Leaderboard(history)
+    assert board.refresh() == 1
+    assert board.top('all') == [(1, 'alice', 25), (2, 'bob', 20)]
+
+    history.archive_completed_months()
+    board = pr.Leaderboard(history)
+    assert board.refresh() == 0
+    assert board.top('all') == [(1, 'alice', 25), (2, 'bob', 20)]
+
+
+def test_archived_before_tail_was_read_rebuilds(tmp_path):
+    history = pr.WorkoutHistory(tmp_path / 'history')
+    history.append(old_month(1, 'alice', 10))
+    pr.Leaderboard(history).refresh()
+    history.append(old_month(2, 'bob', 20))  # never read by the leaderboard
+    history.archive_completed_months()
+
+    board = pr.Leaderboard(history)
+    board.refresh()
+    assert board.top('all') == [(1, 'bob', 20), (2, 'alice', 10)]
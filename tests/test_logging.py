@@ -0,0 +1,86 @@
+import json
+import logging
+import sys
+
+import pushup_reminder as pr
+
+
+def record(created, lineno=10, name='pushup_reminder.sync', msg='sync failed'):
+    rec = logging.LogRecord(name, logging.WARNING, __file__, lineno, msg, None, None)
+    rec.created = created
+    return rec
+
+
+def test_sampling_filter_limits_each_call_site():
+    sampler = pr.SamplingFilter(burst=3, window=10.0)
+    passed = [sampler.filter(record(t)) for t in range(5)]
+    assert passed == [True, True, True, False, False]
+    # Another call site has its own budget
+    assert sampler.filter(record(4, lineno=20))
+
+    # The next window reports how many were dropped
+    first = record(11)
+    assert sampler.filter(first)
+    assert first.suppressed == 2
+    second = record(12)
+    assert sampler.filter(second)
+    assert not hasattr(second, 'suppressed')
+
+
+def test_queue_handler_renders_message_at_call_time():
+    handler = pr.LogQueueHandler(None)
+    items = ['a']
+    rec = logging.LogRecord('pushup_reminder', logging.ERROR, __file__, 1, "items: %s", (items,), None)
+    try:
+        raise RuntimeError("boom")
+    except RuntimeError:
+        rec.exc_info = sys.exc_info()
+    prepared = handler.prepare(rec)
+    items.append('b')  # the caller moves on
+
+    assert prepared is rec  # no copy
+    assert prepared.getMessage() == "items: ['a']"
+    assert prepared.args is None and prepared.exc_info is None
+    assert 'RuntimeError: boom' in prepared.exc_text
+
+
+def test_records_reach_the_json_log_file(tmp_path):
+    pr.setup_logging(tmp_path, console=False)
+    sync_log = pr.logger.getChild('sync')
+    try:
+        pr.set_log_levels('INFO', {'sound': 'ERROR'})
+        sync_log.info("synced %d events", 3)
+        pr.logger.getChild('sound').warning("hidden by the area level")
+        try:
+            1 / 0
+        except ZeroDivisionError:
+            pr.stats_log.exception("save failed")
+    finally:
+        pr.stop_logging()  # flushes the queue
+        pr.logger.getChild('sound').setLevel(logging.NOTSET)
+
+    entries = [json.loads(line) for line in (tmp_path / 'pushup_reminder.log').read_text().splitlines()]
+    assert [(e['logger'], e['level'], e['msg']) for e in entries] == [
+        ('pushup_reminder.sync', 'INFO', 'synced 3 events'),
+        ('pushup_reminder.stats', 'ERROR', 'save failed'),
+    ]
+    assert 'ZeroDivisionError' in entries[1]['exc']
+
+
+def test_suppressed_count_is_written(tmp_path):
+    def warn():
+        pr.sync_log.warning("peer unreachable")  # one call site
+
+    pr.setup_logging(tmp_path, console=False)
+    try:
+        for i in range(13):
+            warn()  # default burst of 10
+        sampler = next(f for f in pr.logger.handlers[0].filters if isinstance(f, pr.SamplingFilter))
+        for site in sampler.sites.values():
+            site[0] -= sampler.window  # start the next window
+        warn()
+    finally:
+        pr.stop_logging()
+    entries = [json.loads(line) for line in (tmp_path / 'pushup_reminder.log').read_text().splitlines()]
+    assert len(entries) == 11
+    assert entries[-1]['suppressed'] == 3
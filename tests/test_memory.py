@@ -0,0 +1,16 @@
+import pushup_reminder as pr
+
+
+def test_soak_reports_no_growth(home, capsys):
+    assert pr.main(['memory', 'soak', '--cycles', '300', '--warmup', '100']) == 0
+    out = capsys.readouterr().out
+    assert "OK: no memory growth" in out
+    assert "(400 reminders including warm-up)" in out
+
+    # The soak runs in its own scratch profile; only main()'s log lands here
+    profile = home / '.pushup_reminder'
+    assert sorted(p.name for p in profile.iterdir()) == ['logs']
+
+
+def test_log_dir_follows_home(home):
+    assert pr.default_log_dir() == home / '.pushup_reminder' / 'logs'
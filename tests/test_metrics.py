@@ -0,0 +1,54 @@
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+import pushup_reminder as pr
+
+
+@pytest.fixture
+def exporter(tmp_path):
+    exporter = pr.MetricsExporter(pr.METRICS, port=0, textfile=str(tmp_path / 'app.prom'))
+    exporter.start()
+    yield exporter
+    exporter.stop()
+
+
+def test_scrape_returns_exposition_text(exporter):
+    pr.scheduler_wakeups.inc()
+    pr.notification_dispatch_seconds.observe(0.002)
+
+    with urllib.request.urlopen(exporter.url, timeout=5) as response:
+        content_type = response.headers['Content-Type']
+        body = response.read().decode('utf-8')
+    assert content_type == 'text/plain; version=0.0.4; charset=utf-8'
+    lines = body.splitlines()
+    assert '# TYPE pushup_reminder_scheduler_wakeups_total counter' in lines
+    assert '# TYPE pushup_reminder_notification_dispatch_seconds histogram' in lines
+    wakeups = [l for l in lines if l.startswith('pushup_reminder_scheduler_wakeups_total ')]
+    assert len(wakeups) == 1 and float(wakeups[0].split()[1]) >= 1
+    assert any(l.startswith('pushup_reminder_notification_dispatch_seconds_bucket{le="+Inf"} ')
+               for l in lines)
+    assert any(l.startswith('process_resident_memory_bytes ') for l in lines)
+
+    with pytest.raises(urllib.error.HTTPError) as error:
+        urllib.request.urlopen(exporter.url.replace('/metrics', '/other'), timeout=5)
+    assert error.value.code == 404
+
+
+def test_textfile_matches_scrape(exporter):
+    deadline = time.monotonic() + 5
+    while not exporter.textfile.exists() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    text = exporter.textfile.read_text(encoding='utf-8')
+    assert '# TYPE pushup_reminder_scheduler_wakeups_total counter' in text.splitlines()
+
+
+def test_stop_returns_promptly():
+    exporter = pr.MetricsExporter(pr.METRICS, port=0)
+    exporter.start()
+    started = time.perf_counter()
+    exporter.stop()
+    assert time.perf_counter() - started < 1.0
+    assert exporter.threads == []
@@ -0,0 +1,103 @@
+from datetime import datetime
+
+import pytest
+
+import pushup_reminder as pr
+
+# 2024-01-01 is a Monday
+MON = datetime(2024, 1, 1)
+
+
+def at(day, hour, minute=0):
+    return datetime(2024, 1, day, hour, minute)
+
+
+@pytest.mark.parametrize('expression, field, expected', [
+    ('5,10/20 * * * *', 'minutes', [5, 10, 30, 50]),
+    ('*/15 * * * *', 'minutes', [0, 15, 30, 45]),
+    ('0 9-17/4 * * *', 'hours', [9, 13, 17]),
+    ('0 9-11,14 * * *', 'hours', [9, 10, 11, 14]),
+    ('0 0 * jan,jul-aug *', 'months', [1, 7, 8]),
+    ('0 0 * * mon-fri', 'weekdays', [0, 1, 2, 3, 4]),
+    ('0 0 * * 0', 'weekdays', [6]),
+    ('0 0 * * 7', 'weekdays', [6]),
+    ('0 0 * * sat,sun', 'weekdays', [5, 6]),
+])
+def test_cron_fields(expression, field, expected):
+    assert getattr(pr.CronRule(expression), field) == expected
+
+
+@pytest.mark.parametrize('expression', ['* * * *', '60 * * * *', '*/0 * * * *', '0 0 * * funday'])
+def test_cron_rejects_bad_rules(expression):
+    with pytest.raises(ValueError):
+        pr.CronRule(expression)
+
+
+def test_cron_next_after_jumps_fields():
+    rule = pr.CronRule('*/15 9-11 * * mon-fri')
+    assert rule.next_after(at(1, 9, 0)) == at(1, 9, 15)
+    assert rule.next_after(at(5, 11, 50)) == at(8, 9, 0)  # Friday evening -> Monday
+    # Day of month and weekday both restricted: either may match
+    assert pr.CronRule('0 12 13 * fri').next_after(MON) == at(5, 12)
+    assert pr.CronRule('0 0 1 mar *').next_after(datetime(2024, 3, 1)) == datetime(2025, 3, 1)
+
+
+def test_interval_mode_counts_from_last_fire():
+    schedule = pr.ReminderSchedule.compile("", 2700)
+    assert schedule.interval == 2700 and schedule.rules == []
+    assert schedule.next_fire(at(1, 8), at(1, 7, 30)) == at(1, 8, 15)
+    assert schedule.next_fire(at(1, 8)) == at(1, 8, 45)
+    assert schedule.next_fire(at(1, 8), at(1, 7)) == at(1, 8)  # overdue: fire now
+
+
+def test_cron_mode_has_no_default_interval():
+    schedule = pr.ReminderSchedule.compile("cron 0 12 * * *", 2700)
+    assert schedule.interval is None
+    assert schedule.next_fire(at(1, 8), at(1, 7, 59)) == at(1, 12)
+
+    mixed = pr.ReminderSchedule.compile("every 2h\ncron 30 9 * * *", 2700)
+    assert mixed.next_fire(at(1, 8), at(1, 8)) == at(1, 9, 30)
+    assert mixed.next_fire(at(1, 9, 30), at(1, 9, 30)) == at(1, 11, 30)
+
+
+def test_at_rules_skip_to_matching_days():
+    schedule = pr.ReminderSchedule.compile("at 09:00,12:30 weekdays", 2700)
+    assert schedule.next_fire(at(5, 13)) == at(8, 9)
+    assert schedule.next_fire(at(8, 9)) == at(8, 12, 30)
+
+
+def test_dnd_window_wrapping_midnight():
+    schedule = pr.ReminderSchedule.compile("every 30m\ndnd 22:00-07:00 daily", 2700)
+    assert schedule.exclusion_end(at(1, 12)) is None
+    assert schedule.exclusion_end(at(1, 23)) == at(2, 7)
+    assert schedule.exclusion_end(at(2, 3)) == at(2, 7)
+    # Interval reminders that land in the window fire when it ends
+    assert schedule.next_fire(at(1, 21, 45), at(1, 21, 45)) == at(2, 7)
+
+    hourly = pr.ReminderSchedule.compile("cron 0 * * * *\ndnd 22:00-07:00 daily", 2700)
+    assert hourly.next_fire(at(1, 21, 30)) == at(2, 7)
+
+
+def test_dnd_window_wrapping_end_of_week():
+    schedule = pr.ReminderSchedule.compile("every 1h\ndnd 22:00-07:00 sun", 2700)
+    assert schedule.exclusion_end(at(7, 23)) == at(8, 7)  # Sunday night -> Monday
+    assert schedule.exclusion_end(at(8, 3)) == at(8, 7)
+    assert schedule.next_fire(at(7, 21, 30), at(7, 21, 30)) == at(8, 7)
+
+    # A window ending at the week boundary runs on into Monday's first window
+    joined = pr.ReminderSchedule.compile("rest sun\ndnd 20:00-07:00 sat\ndnd 00:00-06:00 mon", 2700)
+    assert joined.exclusion_end(at(6, 21)) == at(8, 6)
+
+
+def test_rest_days():
+    schedule = pr.ReminderSchedule.compile("every 1h\nrest sat,sun", 2700)
+    assert schedule.exclusion_end(at(6, 12)) == at(8, 0)
+    assert schedule.next_fire(at(5, 23, 30), at(5, 23, 30)) == at(8, 0)
+
+    cron = pr.ReminderSchedule.compile("at 09:00 daily\nrest weekends", 2700)
+    assert cron.next_fire(at(5, 10)) == at(8, 9)
+
+
+def test_bad_schedule_line_is_reported():
+    with pytest.raises(ValueError, match="Line 2"):
+        pr.ReminderSchedule.compile("every 30m\nsometimes 10:00", 2700)
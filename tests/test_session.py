@@ -0,0 +1,113 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import pushup_reminder as pr
+
+
+class Notifier:
+    def __init__(self):
+        self.sent = []
+        self.reminder_pending = False
+
+    def notify(self, title, message):
+        self.sent.append(title)
+
+    def show_completion_dialog(self):
+        pass
+
+
+class Root:
+    def __init__(self):
+        self.scheduled = []
+
+    def after(self, delay, callback):
+        self.scheduled.append(callback)
+
+
+@pytest.fixture
+def restore(home):
+    """Run ModernPushupApp.restore_session against a saved checkpoint, without Tk"""
+    services = []
+
+    def run(state, policy='once'):
+        session = pr.SessionState()
+        if state is not None:
+            session.save(state)
+        settings = pr.AppSettings(catch_up_policy=policy)
+        notifier = Notifier()
+        service = pr.ReminderService(settings, notifier)
+        services.append(service)
+        app = SimpleNamespace(session=session, settings=settings, reminder_service=service,
+                              notification_service=notifier, root=Root(), resumed=[])
+
+        def set_reminder_running(running, resume=None):
+            app.resumed.append(resume)
+            service.resume(*resume)
+        app.set_reminder_running = set_reminder_running
+        pr.ModernPushupApp.restore_session(app)
+        return app
+
+    yield run
+    for service in services:
+        service.stop()
+
+
+def wait_for(condition, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.02)
+    return condition()
+
+
+def test_missed_reminder_fires_once_on_start(restore):
+    now = time.time()
+    app = restore({'running': True, 'last_reminder': now - 3 * 3600, 'next_deadline': now - 2 * 3600,
+                   'snoozed': False, 'pending_reminder': True})
+    (last, deadline, snoozed), = app.resumed
+    assert last == pytest.approx(now - 3 * 3600)
+    assert deadline == pytest.approx(now, abs=5)
+    assert wait_for(lambda: app.notification_service.sent)
+    assert len(app.notification_service.sent) == 1
+    # The catch-up reminder replaces the dialog that was open at shutdown
+    assert app.root.scheduled == []
+
+
+def test_skip_policy_waits_a_full_period(restore):
+    now = time.time()
+    app = restore({'running': True, 'last_reminder': now - 3 * 3600, 'next_deadline': now - 2 * 3600,
+                   'snoozed': False, 'pending_reminder': True}, policy='skip')
+    (last, deadline, _), = app.resumed
+    assert last == pytest.approx(now, abs=5) and deadline is None
+    service = app.reminder_service
+    assert wait_for(lambda: service.next_deadline is not None)
+    assert service.next_deadline == pytest.approx(last + service.get_interval(), abs=1)
+    assert app.notification_service.sent == []
+    assert app.root.scheduled == [app.notification_service.show_completion_dialog]
+
+
+def test_deadline_still_ahead_is_kept(restore):
+    now = time.time()
+    app = restore({'running': True, 'last_reminder': now - 600, 'next_deadline': now + 600,
+                   'snoozed': True})
+    (last, deadline, snoozed), = app.resumed
+    assert (last, deadline, snoozed) == (pytest.approx(now - 600), pytest.approx(now + 600), True)
+    assert app.notification_service.sent == []
+
+
+def test_stopped_session_only_reopens_pending_dialog(restore):
+    app = restore({'running': False, 'last_reminder': None, 'next_deadline': None,
+                   'snoozed': False, 'pending_reminder': True})
+    assert app.resumed == []
+    assert app.root.scheduled == [app.notification_service.show_completion_dialog]
+
+
+def test_missing_or_damaged_checkpoint_is_ignored(restore, home):
+    assert restore(None).resumed == []
+
+    path = home / '.pushup_reminder' / 'session.json'
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text('{"running": true, "next_deadline": 0}')  # checksum stripped
+    assert pr.SessionState().load() is None
+    assert restore(None).resumed == []
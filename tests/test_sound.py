@@ -0,0 +1,53 @@
+import struct
+import wave
+
+import pushup_reminder as pr
+
+
+def write_wav(path, frames=800, rate=8000):
+    with wave.open(str(path), 'wb') as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(rate)
+        f.writeframes(b'\x00\x01' * frames)
+
+
+def float_wav(frames=4, rate=8000) -> bytes:
+    """A mono 32-bit IEEE float WAV, which the wave module can't write"""
+    pcm = struct.pack(f'<{frames}f', *([0.5] * frames))
+    fmt = struct.pack('<HHIIHH', 3, 1, rate, rate * 4, 4, 32)
+    body = b'WAVE' + b'fmt ' + struct.pack('<I', len(fmt)) + fmt + b'data' + struct.pack('<I', len(pcm)) + pcm
+    return b'RIFF' + struct.pack('<I', len(body)) + body
+
+
+def test_null_backend_receives_every_cue(tmp_path):
+    write_wav(tmp_path / 'Default.wav')
+    write_wav(tmp_path / 'Guitar_up.wav')
+    backend = pr.NullSoundBackend()
+    engine = pr.SoundEngine(backend, sounds_dir=tmp_path)
+
+    for name in ('Default', pr.SoundEngine.NO_SOUND, 'Guitar_up', 'Default'):
+        engine.play(name)
+
+    assert backend.played == ['Default', 'Guitar_up', 'Default']
+    assert engine.latency_stats()['count'] == 3
+    # Decoded once and shared by every playback
+    assert engine.get('Default') is engine.get('Default')
+
+
+def test_buffer_decodes_format(tmp_path):
+    write_wav(tmp_path / 'Default.wav', frames=800, rate=8000)
+    buffer = pr.SoundEngine(pr.NullSoundBackend(), sounds_dir=tmp_path).get('Default')
+    assert (buffer.channels, buffer.sample_width, buffer.frame_rate) == (1, 2, 8000)
+    assert buffer.frames == 800
+    assert buffer.duration == 0.1
+
+
+def test_file_backend_keeps_float_format(tmp_path):
+    buffer = pr.SoundBuffer('float', float_wav())
+    backend = pr.WaveFileSoundBackend(tmp_path / 'out')
+    backend.play(buffer, 0.0, lambda *args: None)
+
+    written = (tmp_path / 'out' / '0001_float.wav').read_bytes()
+    assert written == buffer.data
+    assert pr.SoundBuffer('copy', written).frames == 4
@@ -0,0 +1,107 @@
+import socket
+import time
+import zlib
+
+import pytest
+
+import pushup_reminder as pr
+
+
+def event(count, ago=0.0, profile='default'):
+    return pr.WorkoutEvent(time.time() - ago, count, pr.PUSHUPS_ID, profile)
+
+
+def test_two_instances_sync_over_loopback(tmp_path):
+    laptop = pr.SyncStore(tmp_path / 'laptop', secret='s3cret')
+    desktop = pr.SyncStore(tmp_path / 'desktop', secret='s3cret')
+    laptop.record_local(event(10, 120))
+    laptop.record_local(event(15, 60))
+    desktop.record_local(event(20, 30))
+
+    received = []
+    server = pr.SyncServer(desktop, host='127.0.0.1', port=0, on_events=received.extend)
+    server.start()
+    try:
+        report = laptop.sync_with('127.0.0.1', server.port, timeout=5)
+        assert report['sent'] == 2
+        assert [e.count for e in report['received']] == [20]
+        assert laptop.vector() == desktop.vector()
+        assert sorted(e.count for e in desktop.history.iter_events()) == [10, 15]
+
+        # Nothing new: only the hellos and "done" markers travel
+        again = laptop.sync_with('127.0.0.1', server.port, timeout=5)
+        assert again['sent'] == 0 and again['received'] == []
+    finally:
+        server.stop()  # joins the serve thread, so on_events has run
+    assert sorted(e.count for e in received) == [10, 15]
+    assert laptop.bytes_sent == report['bytes_sent'] + again['bytes_sent']
+
+
+def test_wrong_secret_is_refused(tmp_path):
+    laptop = pr.SyncStore(tmp_path / 'laptop', secret='guess')
+    desktop = pr.SyncStore(tmp_path / 'desktop', secret='s3cret')
+    laptop.record_local(event(10))
+    desktop.record_local(event(20))
+
+    server = pr.SyncServer(desktop, host='127.0.0.1', port=0)
+    server.start()
+    try:
+        with pytest.raises((PermissionError, ConnectionError)):
+            laptop.sync_with('127.0.0.1', server.port, timeout=5)
+    finally:
+        server.stop()
+    assert laptop.device_id not in desktop.vector()
+    assert desktop.device_id not in laptop.vector()
+
+
+def test_sync_needs_a_secret(tmp_path):
+    store = pr.SyncStore(tmp_path / 'a')
+    left, right = socket.socketpair()
+    with left, right, pytest.raises(PermissionError):
+        store.sync(left, initiator=True)
+
+
+def test_decompression_is_bounded(tmp_path, monkeypatch):
+    store = pr.SyncStore(tmp_path / 'a', secret='s3cret')
+    monkeypatch.setattr(pr.SyncStore, 'MAX_FRAME', 64 * 1024)
+    bomb = zlib.compress(b' ' * (1024 * 1024), 9)
+    assert len(bomb) < store.MAX_FRAME
+    left, right = socket.socketpair()
+    with left, right:
+        left.sendall(store.FRAME.pack(len(bomb)) + bomb)
+        with pytest.raises(ValueError, match="too large"):
+            store._recv(right, {'bytes_received': 0})
+
+
+def test_malformed_records_are_dropped(tmp_path):
+    store = pr.SyncStore(tmp_path / 'a', secret='s3cret')
+    device = 'e' * 32
+    good = event(5).to_record()
+    records = [good, {'t': 'yesterday', 'n': 5}, {'t': 1.0, 'n': True}, ['t', 'n'],
+               dict(good, p=7), dict(good, n=8)]
+    assert [e.count for e in store.apply(device, 1, records)] == [5, 8]
+    # Dropped records still take up their sequence numbers
+    assert store.vector()[device] == 6
+    assert sorted(e.count for e in store.history.iter_events()) == [5, 8]
+    with pytest.raises(ValueError):
+        store.apply(device, '7', [good])
+
+
+def test_replayed_batch_is_ignored(tmp_path):
+    store = pr.SyncStore(tmp_path / 'a')
+    device = 'f' * 32
+    records = [event(5, 10).to_record(), event(6, 5).to_record()]
+    assert len(store.apply(device, 1, records)) == 2
+    assert store.apply(device, 1, records) == []
+    assert store.vector()[device] == 2
+
+
+def test_read_only_statistics_leave_sync_alone(home):
+    pr.Statistics().add_pushups(5)
+    assert not (home / '.pushup_reminder' / 'sync').exists()
+
+
+def test_merge_remote_counts_only_own_profile(home):
+    stats = pr.Statistics('alice')
+    stats.merge_remote([event(10, profile='alice'), event(30, profile='bob')])
+    assert (stats.today_pushups, stats.total_pushups) == (10, 10)